@@ -13,6 +13,7 @@ from agents import (
 
 from app.agent.agents.fund_manager.tools.tools import Tools
 from app.agent.models.models import TokenDataFetchInput, WorkflowContext
+from app.agent.utils.concurrent_fetch import fetch_with_timeout
 from app.agent.utils.custom_agent_hooks import CustomAgentHooks
 from app.agent.utils.token_output_schema import TokenOutputSchema
 from app.config.agent_lore import (
@@ -24,6 +25,7 @@ from app.config.agent_lore import (
     TRADING_STRATEGIST_INSTRUCTIONS,
     TRADING_STRATEGIST_NAME,
 )
+from app.core.config import settings
 from app.models.prompt_analysis import TechincalResponse, TokenResponse
 
 import asyncio
@@ -40,6 +42,14 @@ class SubAgents:
     def __init__(self) -> None:
         self.tools = Tools()
 
+    async def __fetch_sentiment(self, asset_symbol: str):
+        return await fetch_with_timeout(
+            "sentiment",
+            self.tools.fetch_sentiment_for_token,
+            settings.SENTIMENT_FETCH_TIMEOUT_SECONDS,
+            token_name_or_symbol=asset_symbol,
+        )
+
     def data_access_agent(self) -> Agent:
         """Creates and returns a data access agent that fetches asset metadata and sentiment in parallel.
 
@@ -48,11 +58,15 @@ class SubAgents:
         """
 
         @function_tool()
-        def __fetch_metadata_and_sentiment_in_parallel(
+        async def __fetch_metadata_and_sentiment_in_parallel(
             ctx: RunContextWrapper[WorkflowContext],
             token_data_fetch_input: TokenDataFetchInput,
         ) -> bool:
-            """Fetches asset metadata and sentiment data in parallel.
+            """Fetches asset metadata, sentiment and strategy data in parallel.
+
+            Sentiment starts immediately when a symbol is known; OHLCV starts as
+            soon as metadata has resolved the market. Each source has its own
+            timeout and a failed sentiment or strategy fetch is left empty.
 
             Args:
                 ctx: Run context wrapper
@@ -61,6 +75,7 @@ class SubAgents:
             Returns:
                 MetaDataAndSentiment: Combined metadata and sentiment data
             """
+            sentiment_task = None
             try:
                 # Validate input
                 if not (
@@ -71,10 +86,18 @@ class SubAgents:
                     print("No asset name or symbol provided")
                     return False
 
+                if token_data_fetch_input.asset_symbol:
+                    sentiment_task = asyncio.create_task(
+                        self.__fetch_sentiment(token_data_fetch_input.asset_symbol)
+                    )
+
                 # Fetch metadata
-                metadata = self.tools.fetch_token_metadata(
-                    asset_name=token_data_fetch_input.asset_name,
-                    asset_symbol=token_data_fetch_input.asset_symbol,
+                metadata = await fetch_with_timeout(
+                    "metadata",
+                    self.tools.fetch_token_metadata,
+                    settings.METADATA_FETCH_TIMEOUT_SECONDS,
+                    token_name=token_data_fetch_input.asset_name,
+                    token_symbol=token_data_fetch_input.asset_symbol,
                 )
 
                 if not metadata:
@@ -88,14 +111,22 @@ class SubAgents:
                 )
                 market = metadata.data.blockchains[0]
 
-                # Fetch sentiment and strategy synchronously
-                sentiment = self.tools.fetch_sentiment_for_token(
-                    asset_name_or_symbol=ctx.context.asset_symbol
+                # Fetch strategy alongside the sentiment already in flight
+                if sentiment_task is None:
+                    sentiment_task = asyncio.create_task(
+                        self.__fetch_sentiment(ctx.context.asset_symbol)
+                    )
+                strategy_task = asyncio.create_task(
+                    fetch_with_timeout(
+                        "ohlcv",
+                        self.tools.fetch_strategy_for_token,
+                        settings.OHLCV_FETCH_TIMEOUT_SECONDS,
+                        token_symbol=ctx.context.asset_symbol,
+                        blockchain=market,
+                    )
                 )
-
-                strategy = self.tools.fetch_strategy_for_token(
-                    ctx.context.asset_symbol,
-                    market,
+                sentiment, strategy = await asyncio.gather(
+                    sentiment_task, strategy_task
                 )
 
                 ctx.context.data = TechincalResponse(
@@ -108,6 +139,9 @@ class SubAgents:
                 ctx.context.data = None
                 print(f"Error fetching data: {str(e)}")
                 return False
+            finally:
+                if sentiment_task is not None and not sentiment_task.done():
+                    sentiment_task.cancel()
 
         def __filter_input_messages(
             handoff_message_data: HandoffInputData,
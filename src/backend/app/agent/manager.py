@@ -1,5 +1,5 @@
 import dataclasses
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, List, Optional
 import asyncio
 from agents import RunResult, Runner, gen_trace_id, trace
 from app.agent.agents.fund_manager.fund_manager import FundManager
@@ -12,6 +12,9 @@ from app.agent.models.models import (
     WebAgentResponse,
     WorkflowContext,
 )
+from app.core.config import settings
+from app.core.deadline import Deadline, deadline_scope
+from app.core.metrics import metrics
 from app.core.singleton import Singleton
 from app.models.prompt_analysis import TechincalResponse, TokenResponse
 from app.models.thread import ChatThread
@@ -22,6 +25,7 @@ from app.services.data_access.data_access_service import DataAccessService
 from rich.console import Console
 
 from app.services.user_service import UserService
+from app.services.user_thread_unit_of_work import UserThreadUnitOfWork
 
 
 class AgentManager(metaclass=Singleton):
@@ -36,8 +40,10 @@ class AgentManager(metaclass=Singleton):
     ) -> Optional[TokenResponse]:
         """Fetch metadata for a given token symbol."""
         try:
-            metadata = self.data_access_service.fetch_metadata(
-                token_symbol=asset_symbol, token_query=asset_name
+            metadata = await asyncio.to_thread(
+                self.data_access_service.fetch_metadata,
+                token_symbol=asset_symbol,
+                token_query=asset_name,
             )
             print("Metadata fetched successfully")
             return metadata
@@ -45,28 +51,78 @@ class AgentManager(metaclass=Singleton):
             print(f"Error fetching metadata: {str(e)}")
             return None
 
+    async def __run_optional_stage(
+        self,
+        name: str,
+        work: Callable[[], Awaitable[Any]],
+        min_budget: float,
+        deadline: Optional[Deadline],
+        degraded: List[str],
+    ) -> Any:
+        """Run an optional pipeline stage within the remaining request budget.
+
+        Returns None and records ``name`` in ``degraded`` when the stage is
+        skipped for lack of budget or does not finish in time.
+        """
+        if deadline is None:
+            return await work()
+        if not deadline.allows(min_budget + settings.DEADLINE_RESERVE_SECONDS):
+            print(f"Skipping {name}: {deadline.remaining():.1f}s left in budget")
+            degraded.append(name)
+            metrics.increment(f"agent.degraded.{name}")
+            return None
+        try:
+            return await asyncio.wait_for(
+                work(), timeout=deadline.timeout_for(settings.DEADLINE_RESERVE_SECONDS)
+            )
+        except asyncio.TimeoutError:
+            print(f"Stage {name} ran out of budget")
+            degraded.append(name)
+            metrics.increment(f"agent.degraded.{name}")
+            return None
+
     async def run(
-        self, query: str, wallet_address: str, thread_id: str, session_id: str
+        self,
+        query: str,
+        wallet_address: str,
+        thread_id: str,
+        session_id: str,
+        deadline: Optional[Deadline] = None,
+    ) -> DexxResponse:
+        """Run the agent pipeline for a given query.
+
+        When a ``deadline`` is given, optional stages (metadata, web report)
+        are skipped or cut short to keep the request within its budget and
+        listed in ``DexxResponse.degraded``.
+        """
+        # User and thread state is loaded once and written back in one
+        # transaction when the request finishes
+        async with UserThreadUnitOfWork(wallet_address, session_id) as uow:
+            thread_id = uow.open_thread(query, thread_id)
+            chat_thread: Optional[ChatThread] = uow.get_thread(thread_id)
+            last_response_id = chat_thread.last_response_id if chat_thread else None
+            return await self.__run_workflow(
+                query, wallet_address, thread_id, last_response_id, deadline, uow
+            )
+
+    async def __run_workflow(
+        self,
+        query: str,
+        wallet_address: str,
+        thread_id: str,
+        last_response_id: Optional[str],
+        deadline: Optional[Deadline],
+        uow: UserThreadUnitOfWork,
     ) -> DexxResponse:
-        """Run the agent pipeline for a given query."""
         result = None
         workflow_context = WorkflowContext(query=query, asset_symbol=None, data=None)
 
-        # Fix: await the async calls
-        user, thread_id = await self.user_service.handle_user_prompt(
-            wallet_address=wallet_address,
-            prompt=query,
-            thread_id=thread_id,
-            session_id=session_id,
-        )
-        chat_thread: ChatThread = await self.user_service.get_user_thread(
-            wallet_address=wallet_address, thread_id=thread_id
-        )
-        last_response_id = chat_thread.last_response_id if chat_thread else None
-
+        stage = "planning"
         try:
             trace_id = gen_trace_id()
-            with trace(f"Agent_Dexx_workflow_{wallet_address}", trace_id=trace_id):
+            with trace(
+                f"Agent_Dexx_workflow_{wallet_address}", trace_id=trace_id
+            ), deadline_scope(deadline):
                 # Print status updates
                 print("Starting financial research...")
                 print(
@@ -82,48 +138,68 @@ class AgentManager(metaclass=Singleton):
                     last_response_id=last_response_id,
                 )
 
-                # Run metadata fetching and web report generation in parallel
+                # Run metadata fetching and web report generation in parallel.
+                # Both are optional: when the deadline leaves too little budget
+                # they are skipped or cut short and recorded as degraded.
+                stage = "research"
+                degraded: List[str] = []
+                metadata_task = None
                 if research_plan.asset_symbol or research_plan.asset_name:
                     metadata_task = asyncio.create_task(
-                        self.__fetch_metadata(
-                            research_plan.asset_symbol, research_plan.asset_name
+                        self.__run_optional_stage(
+                            "metadata",
+                            lambda: self.__fetch_metadata(
+                                research_plan.asset_symbol, research_plan.asset_name
+                            ),
+                            min_budget=settings.METADATA_MIN_BUDGET_SECONDS,
+                            deadline=deadline,
+                            degraded=degraded,
                         )
                     )
-                    web_report_task = asyncio.create_task(
-                        self.__generate_web_report(
+                web_report_task = asyncio.create_task(
+                    self.__run_optional_stage(
+                        "web_report",
+                        lambda: self.__generate_web_report(
                             context=workflow_context,
                             plan=research_plan,
                             last_response_id=last_response_id,
-                        )
+                        ),
+                        min_budget=settings.WEB_AGENT_MIN_BUDGET_SECONDS,
+                        deadline=deadline,
+                        degraded=degraded,
                     )
+                )
+                tasks = [t for t in (metadata_task, web_report_task) if t]
+
+                # Wait for the tasks to complete; if either fails or the
+                # request is cancelled, stop the sibling instead of letting
+                # it run on in the background.
+                try:
+                    await asyncio.gather(*tasks)
+                except BaseException:
+                    for task in tasks:
+                        task.cancel()
+                    raise
+                metadata = metadata_task.result() if metadata_task else None
+                report_result = web_report_task.result()
 
-                    # Wait for both tasks to complete
-                    metadata, report_result = await asyncio.gather(
-                        metadata_task, web_report_task
+                # Update workflow context with metadata
+                if metadata:
+                    technicalResponse = TechincalResponse(
+                        metadata=metadata, sentiment=None, strategy=None
                     )
+                    workflow_context.data = technicalResponse.model_dump()
 
-                    # Update workflow context with metadata
-                    if metadata:
-                        technicalResponse = TechincalResponse(
-                            metadata=metadata, sentiment=None, strategy=None
-                        )
-                        workflow_context.data = technicalResponse.model_dump()
+                stage = "persisting"
+                if report_result is not None:
+                    print(report_result.final_output)
+                    webAgentResponse = report_result.final_output_as(WebAgentResponse)
+                    insight = webAgentResponse.model_dump()
+                    uow.record_response(thread_id, report_result.last_response_id)
                 else:
-                    # If no token symbol, just generate web report
-                    report_result = await self.__generate_web_report(
-                        context=workflow_context,
-                        plan=research_plan,
-                        last_response_id=last_response_id,
-                    )
+                    # Fall back to the research plan when the web report was skipped
+                    insight = {"report": research_plan.plan, "reference_links": []}
 
-                print(report_result.final_output)
-                webAgentResponse = report_result.final_output_as(WebAgentResponse)
-                # Fix: await the async call
-                await self.user_service.update_thread_response(
-                    wallet_address=wallet_address,
-                    thread_id=thread_id,
-                    response_id=report_result.last_response_id,
-                )
                 result = DexxResponse(
                     query=query,
                     metadata=(
@@ -131,18 +207,17 @@ class AgentManager(metaclass=Singleton):
                         if workflow_context.data
                         else None
                     ),
-                    insight=webAgentResponse.model_dump(),
+                    insight=insight,
                     thread_id=thread_id,
+                    degraded=degraded,
                 )
 
-                await self.user_service.add_message_to_thread(
-                    wallet_address=wallet_address,
-                    thread_id=thread_id,
-                    role="assistant",
-                    content=result.model_dump(),
-                )
+                uow.add_message(thread_id, "assistant", result.model_dump())
             return result
 
+        except asyncio.CancelledError:
+            metrics.increment(f"agent.cancelled.stage.{stage}")
+            raise
         except Exception as e:
             raise e
 
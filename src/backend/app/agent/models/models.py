@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from typing import List, Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.prompt_analysis import TechincalResponse, TokenResponse
 
@@ -47,3 +47,7 @@ class DexxResponse(BaseModel):
     metadata: Optional[TokenResponse]
     insight: dict
     thread_id: str
+    degraded: List[str] = Field(
+        default_factory=list,
+        description="Pipeline stages skipped or cut short to meet the deadline",
+    )
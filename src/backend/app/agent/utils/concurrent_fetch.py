@@ -0,0 +1,41 @@
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+
+from app.core.deadline import current_deadline
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_with_timeout(
+    source: str, fetch: Callable[..., Any], timeout: float, **kwargs
+) -> Optional[Any]:
+    """Run a blocking data-source call off the event loop with a timeout.
+
+    The timeout is further capped by the request deadline, if one is set.
+    Failures and timeouts are logged and yield None so callers can accept
+    partial results from the remaining sources.
+
+    Args:
+        source: Name of the data source, used for logs and metrics
+        fetch: Blocking callable performing the fetch
+        timeout: Maximum seconds to wait for this source
+        **kwargs: Arguments passed to ``fetch``
+
+    Returns:
+        The fetch result, or None if it failed or timed out
+    """
+    deadline = current_deadline()
+    if deadline is not None:
+        timeout = min(timeout, deadline.remaining())
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(fetch, **kwargs), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Timed out fetching {source} after {timeout:.1f}s")
+        metrics.increment(f"data_fetch.timeout.{source}")
+        return None
+    except Exception as e:
+        logger.warning(f"Error fetching {source}: {str(e)}")
+        metrics.increment(f"data_fetch.error.{source}")
+        return None
@@ -4,6 +4,7 @@ from typing import Dict, Optional, List
 import logging
 from dotenv import load_dotenv
 
+from app.core.config import settings
 from app.models.prompt_analysis import Sentiment
 
 load_dotenv()
@@ -52,7 +53,11 @@ class CryptoPanicClient:
             if filter_type:
                 params["filter"] = filter_type
 
-            response = requests.get(f"{self.BASE_URL}/posts/", params=params)
+            response = requests.get(
+                f"{self.BASE_URL}/posts/",
+                params=params,
+                timeout=settings.UPSTREAM_HTTP_TIMEOUT_SECONDS,
+            )
             response.raise_for_status()
 
             data = response.json()
@@ -1,23 +1,52 @@
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 import requests
 from app.core.config import settings
+from app.lib.json_stream import iter_json_array
 from app.models.api.routes import MobulaEndpoints
+from app.models.token_symbols import CryptocurrencySymbol_Mobula
+
+# Read size when streaming large responses
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class MetacoreClient:
 
     def __init__(self):
         self.url = f"{settings.MOBULA_PRODUCTION_API_ENDPOINT}/{MobulaEndpoints.REST_API}/{MobulaEndpoints.REST_API_VERSION}"
+        self.timeout = settings.UPSTREAM_HTTP_TIMEOUT_SECONDS
 
-    def get_all_cryptocurrencies(self):
+    def get_all_cryptocurrencies(self, fields: Optional[str] = None):
         url = f"{self.url}/{MobulaEndpoints.GET_ALL_CRYPTOCURRENCIES}"
-        response = requests.get(url)
+        params = {"fields": fields} if fields else None
+        response = requests.get(url, params=params, timeout=self.timeout)
         response.raise_for_status()
         return response.json()
 
+    def iter_all_cryptocurrencies(
+        self, fields: Optional[str] = None
+    ) -> Iterator[CryptocurrencySymbol_Mobula]:
+        """Stream Mobula's token list, one token at a time.
+
+        Unlike ``get_all_cryptocurrencies``, the payload is parsed as it
+        downloads, so memory use stays flat however long the list is.
+
+        Args:
+            fields: Extra fields to include, comma separated
+
+        Returns:
+            Iterator over the tokens, in the order Mobula lists them
+        """
+        url = f"{self.url}/{MobulaEndpoints.GET_ALL_CRYPTOCURRENCIES}"
+        params = {"fields": fields} if fields else None
+        with requests.get(url, params=params, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            for item in iter_json_array(chunks, "data"):
+                yield CryptocurrencySymbol_Mobula.model_validate(item)
+
     def get_metadata(self, query_string: Dict):
         url = f"{self.url}/{MobulaEndpoints.METADATA}"
-        response = requests.get(url=url, params=query_string)
+        response = requests.get(url=url, params=query_string, timeout=self.timeout)
         response.raise_for_status()
         return response.json()
 
@@ -58,12 +87,12 @@ class MetacoreClient:
         # if blockchain:
         #     params["blockchain"] = blockchain
             
-        response = requests.get(url=url, params=params)
+        response = requests.get(url=url, params=params, timeout=self.timeout)
         response.raise_for_status()
         return response.json()
 
     def get_latest_tokens(self):
         url = f"{self.url}/{MobulaEndpoints.LATEST_TOKENS}"
-        response = requests.get(url)
+        response = requests.get(url, timeout=self.timeout)
         response.raise_for_status()
         return response.json()
\ No newline at end of file
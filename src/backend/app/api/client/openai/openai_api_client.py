@@ -82,9 +82,10 @@ Provide following details only when asked
             tool_choice="auto"
         )
     
-    def generate_response(self, messages: List):
+    def generate_response(self, messages: List, tool_choice: str = "auto"):
         return self.client.responses.create(
             model="gpt-4o-mini",
             input=messages,
             tools=TOOLS,
+            tool_choice=tool_choice,
         )
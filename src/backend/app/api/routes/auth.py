@@ -95,7 +95,5 @@ async def revoke_session(session_id: str, token: dict = Depends(verify_auth)):
 @router.post("/sessions/revoke-all")
 async def revoke_all_sessions(token: dict = Depends(verify_auth)):
     """Revoke all sessions for current user"""
-    sessions = await auth_service.session_service.get_user_sessions(token["sub"])
-    for session in sessions:
-        await auth_service.session_service.invalidate_session(session["session_id"])
+    await auth_service.session_service.invalidate_user_sessions(token["sub"])
     return {"message": "All sessions revoked successfully"}
@@ -1,7 +1,16 @@
+import asyncio
 import dataclasses
 from typing import Optional
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from pydantic import BaseModel
 import logging
 import os
@@ -9,6 +18,15 @@ import json
 
 from app.agent.manager import AgentManager
 from app.agent.manager import AgentManager
+from app.core.cancellation import (
+    CancellationReason,
+    RequestCancelled,
+    run_cancellable,
+    watch_disconnect,
+)
+from app.core.config import settings
+from app.core.deadline import Deadline, deadline_scope
+from app.core.metrics import metrics
 from app.middleware.auth_middleware import verify_auth
 from app.models.prompt_analysis import PromptType, TokenResponse
 from app.models.response import ResponseType
@@ -19,6 +37,7 @@ from app.services.rate_limiter import RateLimiter
 from app.services.reasoning.reasoning_service import ReasoningService
 from app.services.reasoning.agent_response_service import AgentResponseService
 from app.services.thread_service import ThreadService
+from app.services.conversation_context_service import ConversationContextService
 from app.services.data_access.data_access_service import DataAccessService
 
 
@@ -27,6 +46,7 @@ reasoning_service = ReasoningService()
 insight_service = InsightService()
 agent_response_service = AgentResponseService()
 thread_service = ThreadService()
+conversation_context_service = ConversationContextService()
 prompt_processing_service = PromptProcessingServiceV2()
 data_access_service = DataAccessService()
 
@@ -41,12 +61,36 @@ def health_check():
     return {"status": True}
 
 
+@router.get("/metrics")
+def get_metrics(auth_data: dict = Depends(verify_auth)):
+    return metrics.snapshot()
+
+
+async def _read_websocket(
+    websocket: WebSocket, incoming: asyncio.Queue, disconnected: asyncio.Event
+) -> None:
+    """Pump client messages into ``incoming`` and flag the disconnect."""
+    try:
+        while True:
+            await incoming.put(await websocket.receive_text())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.set()
+        await incoming.put(None)
+
+
 @router.websocket("/ws/v4/process-prompt")
 async def websocket_process_promptv4(
     websocket: WebSocket,
     # auth_data: dict = Depends(verify_auth)
 ):
     await websocket.accept()
+    # Reading happens in its own task so a disconnect is noticed while the
+    # agent is still working and can cancel it.
+    incoming: asyncio.Queue = asyncio.Queue()
+    disconnected = asyncio.Event()
+    reader = asyncio.create_task(_read_websocket(websocket, incoming, disconnected))
     try:
         # user_wallet = auth_data["wallet_address"]
         # session_id = auth_data["session_id"]
@@ -65,7 +109,9 @@ async def websocket_process_promptv4(
         while True:
             try:
                 # Receive message from client
-                data = await websocket.receive_text()
+                data = await incoming.get()
+                if data is None:
+                    break
                 logging.info(f"Received data: {data}")
                 request_data = json.loads(data)
 
@@ -80,17 +126,29 @@ async def websocket_process_promptv4(
 
                 # Process the prompt
                 manager = AgentManager()
-                response = await manager.run(
-                    request_data["prompt"],
-                    user_wallet,
-                    request_data.get("thread_id"),
-                    session_id=session_id,
+                deadline = Deadline(settings.AGENT_REQUEST_TIMEOUT_SECONDS)
+                response = await run_cancellable(
+                    manager.run(
+                        request_data["prompt"],
+                        user_wallet,
+                        request_data.get("thread_id"),
+                        session_id=session_id,
+                        deadline=deadline,
+                    ),
+                    timeout=deadline.remaining(),
+                    cancel_event=disconnected,
                 )
 
                 # Send response back to client
                 # await websocket.send(response)
                 await websocket.send_json(response.model_dump())
 
+            except RequestCancelled as e:
+                if e.reason == CancellationReason.DISCONNECT:
+                    break
+                await websocket.send_json(
+                    {"type": "error", "message": "Request timed out"}
+                )
             except WebSocketDisconnect:
                 break
             except Exception as e:
@@ -98,10 +156,12 @@ async def websocket_process_promptv4(
 
     except Exception as e:
         await websocket.close(code=4000, reason=str(e))
+    finally:
+        reader.cancel()
 
 
 @router.post("/v4/process-prompt")
-async def process_promptv4(request: PromptRequest):
+async def process_promptv4(request: PromptRequest, http_request: Request):
     try:
         user_wallet = "0x1234"
         session_id = str(uuid.uuid4())
@@ -113,8 +173,29 @@ async def process_promptv4(request: PromptRequest):
         logging.info(f"User wallet: {user_wallet}")
         await RateLimiter().check_rate_limit(session_id, "api")
         manager = AgentManager()
-        return await manager.run(
-            request.prompt, user_wallet, request.thread_id, session_id=session_id
+        deadline = Deadline(settings.AGENT_REQUEST_TIMEOUT_SECONDS)
+        disconnected = asyncio.Event()
+        watcher = asyncio.create_task(watch_disconnect(http_request, disconnected))
+        try:
+            return await run_cancellable(
+                manager.run(
+                    request.prompt,
+                    user_wallet,
+                    request.thread_id,
+                    session_id=session_id,
+                    deadline=deadline,
+                ),
+                timeout=deadline.remaining(),
+                cancel_event=disconnected,
+            )
+        finally:
+            watcher.cancel()
+    except RequestCancelled as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT
+            if e.reason == CancellationReason.DEADLINE
+            else 499,
+            detail=str(e),
         )
     except Exception as e:
         raise e
@@ -135,24 +216,21 @@ async def process_promptv3(
         thread_id = request.thread_id
         logging.info(f"Thread ID: {thread_id}")
         if thread_id == None or thread_id.strip() == None:
-            thread_id = thread_service.create_thread(
+            thread_id = await thread_service.create_thread(
                 user_id=user_wallet, initial_message=request.prompt.strip()
             )
         else:
-            thread_service.add_message(
+            await thread_service.add_message(
                 thread_id=thread_id, role="user", content=request.prompt
             )
-        thread_messages = thread_service.get_thread_messages(thread_id=thread_id)
-        agent_response, thread_messages, asset_data = agent_response_service.respond(
-            thread_messages
+        thread_messages = await conversation_context_service.build_thread_context(
+            thread_id=thread_id
         )
-        thread_service.add_message(
-            thread_id=thread_id, role="assistant", content=agent_response.output_text
-        )
-        agent_response, thread_messages, asset_data = agent_response_service.respond(
-            thread_messages
-        )
-        thread_service.add_message(
+        with deadline_scope(Deadline(settings.AGENT_REQUEST_TIMEOUT_SECONDS)):
+            agent_response, thread_messages, asset_data = (
+                await agent_response_service.respond(thread_messages)
+            )
+        await thread_service.add_message(
             thread_id=thread_id, role="assistant", content=agent_response.output_text
         )
         metadata = None
@@ -193,7 +271,7 @@ async def process_promptv3(
             "thread_id": thread_id,
             "thread_id": thread_id,
         }
-        insight = insight_service.generate(error_response, request.prompt)
+        insight = await insight_service.generate(error_response, request.prompt)
         logging.error(f"Error processing prompt: {e}")
         logging.error(f"Stack trace: {traceback.format_exc()}")
 
@@ -226,7 +304,7 @@ async def process_promptv2(
             }
         logging.info(f"Processing the prompt")
         processed_prompt = prompt_processing_service.process(promptAnalysis)
-        insight = insight_service.generate_for_processed_prompt(
+        insight = await insight_service.generate_for_processed_prompt(
             processed_prompt=processed_prompt,
             auth_data=auth_data,
             session_id=auth_data["session_id"],
@@ -247,7 +325,7 @@ async def process_promptv2(
             "metadata": None,
             "data": None,
         }
-        insight = insight_service.generate(error_response, request.prompt)
+        insight = await insight_service.generate(error_response, request.prompt)
         logging.error(f"Error processing prompt: {e}")
         return {**error_response, "insight": insight}
 
@@ -256,7 +334,7 @@ async def process_promptv2(
 async def get_session_history(auth_data: dict = Depends(verify_auth)):
     """Get message history for current session"""
     message_service = MessageService()
-    messages = message_service.get_session_history(auth_data["session_id"])
+    messages = await message_service.get_session_history(auth_data["session_id"])
     return {"messages": messages}
 
 
@@ -264,7 +342,7 @@ async def get_session_history(auth_data: dict = Depends(verify_auth)):
 async def get_all_history(auth_data: dict = Depends(verify_auth)):
     """Get all message history for the wallet"""
     message_service = MessageService()
-    messages = message_service.get_all_wallet_messages(auth_data["wallet_address"])
+    messages = await message_service.get_all_wallet_messages(auth_data["wallet_address"])
     return {"sessions": messages}
 
 
@@ -272,7 +350,7 @@ async def get_all_history(auth_data: dict = Depends(verify_auth)):
 async def clear_session_history(auth_data: dict = Depends(verify_auth)):
     """Clear message history for current session"""
     message_service = MessageService()
-    message_service.clear_session_history(auth_data["session_id"])
+    await message_service.clear_session_history(auth_data["session_id"])
     return {"message": "Session history cleared"}
 
 
@@ -280,7 +358,7 @@ async def clear_session_history(auth_data: dict = Depends(verify_auth)):
 async def clear_all_history(auth_data: dict = Depends(verify_auth)):
     """Clear all message history for the wallet"""
     message_service = MessageService()
-    message_service.clear_wallet_history(auth_data["wallet_address"])
+    await message_service.clear_wallet_history(auth_data["wallet_address"])
     return {"message": "All message history cleared"}
 
 
@@ -1,6 +1,9 @@
 
-from fastapi import APIRouter, HTTPException
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
+from app.core.config import settings
 from app.services.thread_service import ThreadService
 
 
@@ -12,24 +15,57 @@ class ThreadUpdateRequest(BaseModel):
     thread_title: str
 
 @router.get("/user/threads")
-def get_user_threads():
-    return thread_service.get_user_threads(user_id='0x1234')
+async def get_user_threads(
+    limit: int = Query(settings.THREAD_LIST_PAGE_SIZE, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    return await thread_service.get_user_threads(
+        user_id='0x1234', limit=limit, cursor=cursor
+    )
+
+PageLimit = Query(
+    settings.THREAD_MESSAGES_PAGE_SIZE, ge=1, le=settings.THREAD_MESSAGES_MAX_PAGE_SIZE
+)
+PageCursor = Query(None, ge=0)
 
 @router.get("/thread")
-def get_thread_content(thread_id: str):
-    return thread_service.get_thread(thread_id=thread_id)
+async def get_thread_content(
+    thread_id: str,
+    limit: int = PageLimit,
+    cursor: Optional[int] = PageCursor,
+    order: Literal["desc", "asc"] = "desc",
+):
+    return await thread_service.get_thread_page(
+        thread_id=thread_id, limit=limit, cursor=cursor, newest_first=order == "desc"
+    )
 
 @router.get("/thread/messages")
-def get_thread_messages(thread_id: str):
-    return thread_service.get_thread_messages(thread_id=thread_id)
+async def get_thread_messages(
+    thread_id: str,
+    limit: int = PageLimit,
+    cursor: Optional[int] = PageCursor,
+    order: Literal["desc", "asc"] = "desc",
+):
+    page = await thread_service.get_thread_page(
+        thread_id=thread_id, limit=limit, cursor=cursor, newest_first=order == "desc"
+    )
+    if page is None:
+        return None
+    return {
+        "messages": [
+            {"role": m["role"], "content": m["content"]} for m in page["messages"]
+        ],
+        "total": page["total"],
+        "next_cursor": page["next_cursor"],
+    }
 
 @router.delete("/thread")
-def delete_thread(thread_id: str):
-    return thread_service.delete_thread(thread_id=thread_id)
+async def delete_thread(thread_id: str):
+    return await thread_service.delete_thread(thread_id=thread_id)
 
 @router.post("/thread/update/title")
-def update_thread_title(request: ThreadUpdateRequest):
+async def update_thread_title(request: ThreadUpdateRequest):
     if not request.thread_title.strip():
         raise HTTPException(status_code=400, detail="Thread title cannot be empty")
     thread_title_trunc = request.thread_title[:50] + "..."
-    return thread_service.update_thread_title(thread_id=request.thread_id, title=thread_title_trunc)
\ No newline at end of file
+    return await thread_service.update_thread_title(thread_id=request.thread_id, title=thread_title_trunc)
\ No newline at end of file
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Awaitable, Optional, TypeVar
+
+from starlette.requests import Request
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class CancellationReason:
+    DISCONNECT = "disconnect"
+    DEADLINE = "deadline"
+
+
+class RequestCancelled(Exception):
+    """Raised when request-scoped work is cancelled before it completes."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Request cancelled: {reason}")
+        self.reason = reason
+
+
+async def run_cancellable(
+    work: Awaitable[T],
+    timeout: Optional[float] = None,
+    cancel_event: Optional[asyncio.Event] = None,
+) -> T:
+    """Await ``work`` but cancel it on a deadline or when ``cancel_event`` is set.
+
+    Cancelling the task propagates ``CancelledError`` into the agent runner, so
+    in-flight LLM calls and child tasks stop instead of finishing for nobody.
+
+    Args:
+        work: Coroutine or awaitable to run
+        timeout: Seconds before the work is cancelled with reason ``deadline``
+        cancel_event: Event that cancels the work with reason ``disconnect``
+
+    Returns:
+        The result of ``work``
+
+    Raises:
+        RequestCancelled: If the work was cancelled before completing
+    """
+    task = asyncio.ensure_future(work)
+    waiters = {task}
+    cancel_waiter = None
+    if cancel_event is not None:
+        cancel_waiter = asyncio.ensure_future(cancel_event.wait())
+        waiters.add(cancel_waiter)
+
+    try:
+        done, _ = await asyncio.wait(
+            waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        if cancel_waiter is not None:
+            cancel_waiter.cancel()
+
+    if task in done:
+        return task.result()
+
+    reason = (
+        CancellationReason.DISCONNECT
+        if cancel_waiter is not None and cancel_waiter in done
+        else CancellationReason.DEADLINE
+    )
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.debug(f"Cancelled work raised while unwinding: {e}")
+
+    metrics.increment(f"requests.cancelled.{reason}")
+    logger.info(f"Cancelled in-flight request work ({reason})")
+    raise RequestCancelled(reason)
+
+
+async def watch_disconnect(
+    request: Request, cancel_event: asyncio.Event, poll_interval: float = 0.5
+) -> None:
+    """Set ``cancel_event`` once the HTTP client behind ``request`` goes away."""
+    while not cancel_event.is_set():
+        if await request.is_disconnected():
+            cancel_event.set()
+            return
+        await asyncio.sleep(poll_interval)
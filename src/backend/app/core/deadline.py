@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+from typing import Iterator, Optional
+
+
+class Deadline:
+    """Absolute latency budget for one request.
+
+    Stages ask how much time is left and skip or shorten optional work when
+    the remainder is too small, so the whole request stays within budget.
+    """
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, min_seconds: float) -> bool:
+        """Whether at least ``min_seconds`` of budget remain."""
+        return self.remaining() >= min_seconds
+
+    def timeout_for(self, reserve_seconds: float = 0.0) -> float:
+        """Timeout for a stage, keeping ``reserve_seconds`` for later stages."""
+        return max(0.0, self.remaining() - reserve_seconds)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the request being served, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Make ``deadline`` visible to everything called within the block.
+
+    Work started with ``asyncio.to_thread`` or ``asyncio.create_task`` copies
+    the context, so blocking data-access code sees the same deadline.
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
@@ -0,0 +1,42 @@
+from threading import Lock
+from typing import Dict
+
+from app.core.singleton import Singleton
+
+
+class Metrics(metaclass=Singleton):
+    """In-process counters and gauges for operational visibility.
+
+    Values are per worker; the authenticated ``/metrics`` route exposes a
+    snapshot.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase a counter by ``value``."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def get(self, name: str) -> float:
+        """Return the current value of a counter or gauge (0 if unset)."""
+        with self._lock:
+            if name in self._gauges:
+                return self._gauges[name]
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return a copy of all counters and gauges."""
+        with self._lock:
+            return {"counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+
+metrics = Metrics()
@@ -17,6 +17,8 @@ logging.basicConfig(
 )
 
 from app.api.client.openai.openai_api_client import OpenAiAPIClient
+from app.core.config import settings
+from app.lib.tokens import fit_messages_to_budget
 from app.core.nlp.parser.keyword_mappings import KeywordMappings
 
 
@@ -95,7 +97,9 @@ class LLMPromptAnalyzer:
         chat_history_str = ""
         if chat_history:
             chat_history_str = "\nPrevious conversation:\n"
-            for msg in chat_history[-5:]:  # Use last 5 messages for context
+            for msg in fit_messages_to_budget(
+                chat_history, settings.HISTORY_WINDOW_TOKEN_BUDGET
+            ):
                 chat_history_str += f"{msg['role'].title()}: {msg['content']}\n"
 
         return f"""You are a Web3 prompt analyzer. Your task is to analyze user queries about cryptocurrencies and blockchain.
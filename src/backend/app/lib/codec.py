@@ -0,0 +1,65 @@
+import json
+import zlib
+from typing import Any, Optional, Union
+
+import msgpack
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Encoded records start with a NUL byte, which never begins a JSON document,
+# followed by the format version and the compression used for the payload
+MARKER = 0x00
+FORMAT_VERSION = 1
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+COMPRESSION_ZLIB = 2
+
+
+def encode_record(value: Any) -> bytes:
+    """Encode a JSON-compatible value for storage.
+
+    Values are packed with msgpack; payloads above
+    ``STORAGE_COMPRESSION_THRESHOLD_BYTES`` are compressed with zstd when it
+    is installed and zlib otherwise.
+    """
+    payload = msgpack.packb(value, use_bin_type=True)
+    compression = COMPRESSION_NONE
+    if len(payload) > settings.STORAGE_COMPRESSION_THRESHOLD_BYTES:
+        if zstandard is not None:
+            payload = zstandard.ZstdCompressor().compress(payload)
+            compression = COMPRESSION_ZSTD
+        else:
+            payload = zlib.compress(payload)
+            compression = COMPRESSION_ZLIB
+    return bytes((MARKER, FORMAT_VERSION, compression)) + payload
+
+
+def decode_record(data: Optional[Union[bytes, str]]) -> Any:
+    """Decode a stored record, accepting the legacy JSON format too.
+
+    Returns:
+        The decoded value, or None if ``data`` is None
+    """
+    if data is None:
+        return None
+    if isinstance(data, str) or not data or data[0] != MARKER:
+        return json.loads(data)
+
+    version, compression = data[1], data[2]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported record format version: {version}")
+    payload = data[3:]
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this record")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif compression == COMPRESSION_ZLIB:
+        payload = zlib.decompress(payload)
+    elif compression != COMPRESSION_NONE:
+        raise ValueError(f"Unknown record compression: {compression}")
+    return msgpack.unpackb(payload, raw=False)
@@ -0,0 +1,109 @@
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Characters that may continue a number decoded at the end of the buffer
+NUMBER_TAIL = re.compile(r"[0-9eE.+-]*")
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """Yield the items of the array under ``key`` in a streamed JSON object.
+
+    Items are decoded as soon as their bytes have arrived and only the item
+    being decoded is buffered, so memory use does not grow with the size of
+    the array. Other keys of the object are decoded and discarded.
+
+    Args:
+        chunks: UTF-8 encoded JSON, in chunks of any size
+        key: Top-level key holding the array
+
+    Raises:
+        json.JSONDecodeError: If the document is malformed, truncated or has
+            no array under ``key``
+    """
+    reader = _JSONStreamReader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.fail(f"Expecting key {key!r}")
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name == key:
+            reader.expect("[")
+            if reader.peek() == "]":
+                return
+            while True:
+                yield reader.value()
+                if reader.expect(",]") == "]":
+                    return
+        reader.value()
+        if reader.expect(",}") == "}":
+            reader.fail(f"Expecting key {key!r}")
+
+
+class _JSONStreamReader:
+    """Decodes consecutive JSON tokens from a stream of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it."""
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                self.fail("Unexpected end of JSON stream")
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of ``chars``."""
+        char = self.peek()
+        if char not in chars:
+            self.fail(f"Expecting one of {chars!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if NUMBER_TAIL.fullmatch(self._buffer, end) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def fail(self, message: str) -> None:
+        raise json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping what has been consumed.
+
+        Returns:
+            False once the stream is exhausted
+        """
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buffer += self._text.decode(chunk)
+                return True
+        self._buffer += self._text.decode(b"", final=True)
+        self._eof = True
+        return False
@@ -0,0 +1,138 @@
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.lib.codec import decode_record, encode_record
+
+# File layout: header, then one index entry per key sorted by key bytes, then
+# the keys and encoded values the entries point to. Offsets are absolute.
+MAGIC = b"DXCATLG1"
+HEADER = struct.Struct("<8sI")  # magic, entry count
+ENTRY = struct.Struct("<QIQI")  # key offset, key length, value offset, value length
+
+
+def write_catalog(path: str, records: Dict[str, Any]) -> None:
+    """Write ``records`` as a catalog file, replacing ``path`` atomically.
+
+    Readers that have the previous file mapped keep reading it until they
+    notice the new one, so a refresh never exposes a partial catalog.
+    """
+    items = sorted((key.encode(), encode_record(value)) for key, value in records.items())
+    index_size = HEADER.size + ENTRY.size * len(items)
+
+    entries = []
+    blob = bytearray()
+    for key, value in items:
+        key_offset = index_size + len(blob)
+        blob += key
+        entries.append(ENTRY.pack(key_offset, len(key), index_size + len(blob), len(value)))
+        blob += value
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(items)))
+        f.writelines(entries)
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SharedCatalog:
+    """Read-only key/value table memory-mapped from a catalog file.
+
+    Every worker maps the same file, so the data lives once in the OS page
+    cache however many workers there are; lookups binary-search the mapped
+    index and decode only the value asked for. The file is checked at most
+    every ``check_interval`` seconds and remapped when it has been replaced.
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._map: Optional[mmap.mmap] = None
+        self._count = 0
+        self._identity: Optional[Tuple[int, int]] = None
+        self._checked_at = float("-inf")
+
+    @property
+    def available(self) -> bool:
+        """Whether a catalog file has been loaded."""
+        self._maybe_reload()
+        return self._map is not None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored for ``key``, or None."""
+        self._maybe_reload()
+        index = self._find(key.encode())
+        return None if index is None else self._value(index)
+
+    def __contains__(self, key: str) -> bool:
+        self._maybe_reload()
+        return self._find(key.encode()) is not None
+
+    def __len__(self) -> int:
+        self._maybe_reload()
+        return self._count
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over all records in key order."""
+        self._maybe_reload()
+        data = self._map
+        for i in range(self._count):
+            key_offset, key_length, _, _ = ENTRY.unpack_from(data, HEADER.size + i * ENTRY.size)
+            yield data[key_offset : key_offset + key_length].decode(), self._value(i, data)
+
+    def _find(self, key: bytes) -> Optional[int]:
+        data = self._map
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, _, _ = ENTRY.unpack_from(
+                data, HEADER.size + middle * ENTRY.size
+            )
+            current = data[key_offset : key_offset + key_length]
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def _value(self, index: int, data: Optional[mmap.mmap] = None) -> Any:
+        data = data if data is not None else self._map
+        _, _, value_offset, value_length = ENTRY.unpack_from(
+            data, HEADER.size + index * ENTRY.size
+        )
+        return decode_record(data[value_offset : value_offset + value_length])
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        if identity != self._identity:
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            data.close()
+            raise ValueError(f"{self.path} is not a catalog file")
+        # The previous mapping is released once no reader references it
+        self._map, self._count = data, count
+        self._identity = (stat.st_ino, stat.st_mtime_ns)
@@ -0,0 +1,69 @@
+from functools import lru_cache
+import json
+import logging
+from typing import Any, Dict, List
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+# Approximate characters per token when no tokenizer is available
+CHARS_PER_TOKEN = 4
+# Fixed per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logging.warning(f"Falling back to approximate token counts: {e}")
+        return None
+
+
+def content_to_text(content: Any) -> str:
+    """Render message content (text or structured) as plain text."""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, default=str)
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in ``text``, exactly with tiktoken or approximately without."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def count_message_tokens(message: Dict) -> int:
+    """Count tokens a chat message contributes to a prompt."""
+    return (
+        MESSAGE_OVERHEAD_TOKENS
+        + count_tokens(message.get("role", ""))
+        + count_tokens(content_to_text(message.get("content", "")))
+    )
+
+
+def fit_messages_to_budget(messages: List[Dict], token_budget: int) -> List[Dict]:
+    """Return the newest messages that fit in ``token_budget``, oldest first.
+
+    The newest message is always kept, even if it alone exceeds the budget,
+    so the current prompt is never dropped.
+    """
+    window: List[Dict] = []
+    used = 0
+    for message in reversed(messages):
+        tokens = count_message_tokens(message)
+        if window and used + tokens > token_budget:
+            break
+        window.append(message)
+        used += tokens
+    window.reverse()
+    return window
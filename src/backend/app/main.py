@@ -1,5 +1,7 @@
+import asyncio
 import os
 import multiprocessing
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes.process import router as process_router
@@ -8,6 +10,15 @@ from app.api.routes.threads import router as thread_router
 import logging
 from app.lib.config.logging_config import setup_logging
 from app.middleware import auth_middleware
+from app.services.cache_invalidation_bus import CacheInvalidationBus
+from app.core.config import settings
+from app.services.data_access.postgres_connection_manager import (
+    PostgresConnectionManager,
+)
+from app.services.data_access.redis_connection_manager import RedisConnectionManager
+from app.services.data_access.token_catalog import TokenCatalog
+from app.services.thread_service import ThreadService
+from app.services.write_behind_queue import WriteBehindQueue
 
 
 def print_startup_banner():
@@ -34,7 +45,66 @@ def print_startup_banner():
     logger.info("\033[34m🚀 Server initialization in progress...\033[0m")
 
 
-app = FastAPI()
+async def archive_idle_threads_periodically():
+    """Archive idle thread history in batches until cancelled."""
+    thread_service = ThreadService()
+    while True:
+        try:
+            # Keep going while full batches are found, then wait
+            while (
+                await thread_service.archive_idle_threads()
+                >= settings.THREAD_ARCHIVE_BATCH_SIZE
+            ):
+                pass
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Thread archiving failed: {str(e)}")
+        await asyncio.sleep(settings.THREAD_ARCHIVE_INTERVAL_SECONDS)
+
+
+async def refresh_token_catalog_periodically():
+    """Keep the shared token catalog fresh until cancelled."""
+    token_catalog = TokenCatalog()
+    while True:
+        try:
+            await token_catalog.refresh()
+            delay = settings.TOKEN_CATALOG_REFRESH_SECONDS / 4
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Token catalog refresh failed: {str(e)}")
+            delay = 60
+        await asyncio.sleep(delay)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    redis_manager = RedisConnectionManager()
+    if not await redis_manager.health_check():
+        logging.getLogger(__name__).warning("Redis is not reachable at startup")
+    write_behind = WriteBehindQueue()
+    if settings.WRITE_BEHIND_ENABLED:
+        write_behind.start()
+    invalidation_listener = None
+    if settings.CACHE_INVALIDATION_ENABLED:
+        invalidation_listener = asyncio.create_task(CacheInvalidationBus().run())
+    archiver = None
+    if settings.THREAD_ARCHIVE_ENABLED:
+        archiver = asyncio.create_task(archive_idle_threads_periodically())
+    TokenCatalog().load()
+    catalog_refresher = None
+    if settings.TOKEN_CATALOG_REFRESH_ENABLED:
+        catalog_refresher = asyncio.create_task(refresh_token_catalog_periodically())
+    yield
+    if archiver is not None:
+        archiver.cancel()
+    if catalog_refresher is not None:
+        catalog_refresher.cancel()
+    if invalidation_listener is not None:
+        invalidation_listener.cancel()
+    await write_behind.close(settings.WRITE_BEHIND_SHUTDOWN_TIMEOUT_SECONDS)
+    await PostgresConnectionManager().close()
+    await redis_manager.close()
+
+
+app = FastAPI(lifespan=lifespan)
 setup_logging()
 print_startup_banner()
 logger = logging.getLogger(__name__)
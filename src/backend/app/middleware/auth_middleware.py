@@ -25,7 +25,7 @@ async def verify_auth(request: Request, token: str = Depends(security)) -> dict:
 
         # Verify session exists and is active
         session_service = SessionService()
-        session = await session_service.get_session(session_id)
+        session = await session_service.get_cached_session(session_id)
 
         if not session:
             raise HTTPException(
@@ -44,8 +44,8 @@ async def verify_auth(request: Request, token: str = Depends(security)) -> dict:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token mismatch"
             )
 
-        # Update session activity
-        await session_service.update_session_activity(session_id)
+        # Update session activity (debounced)
+        await session_service.record_activity(session_id, session)
 
         return {"wallet_address": payload["sub"], "session_id": session_id}
 
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -6,6 +6,10 @@ class CryptocurrencySymbol_Mobula(BaseModel):
     id: int
     name: str
     symbol: str
+    # Only returned when requested through the ``fields`` parameter
+    contracts: List[str] = []
+    blockchains: List[str] = []
+    market_cap: Optional[float] = None
 
 
 class GetAllCryptocurrencies_Mobula_Data(BaseModel):
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.singleton import Singleton
+from app.services.data_access.redis_connection_manager import get_redis
+
+
+class LocalCache:
+    """In-process cache kept coherent across workers by the invalidation bus.
+
+    Entries live for ``ttl`` seconds while the bus is listening, since any
+    change elsewhere evicts them, and for ``fallback_ttl`` otherwise. Entries
+    are versioned: take ``version()`` before reading the source of truth and
+    pass it to ``set``, and a value read before a concurrent invalidation of
+    its key is not cached.
+
+    Create instances with ``CacheInvalidationBus().cache``.
+    """
+
+    def __init__(
+        self,
+        bus: "CacheInvalidationBus",
+        namespace: str,
+        ttl: float,
+        fallback_ttl: float,
+        max_entries: int,
+    ):
+        self.bus = bus
+        self.namespace = namespace
+        self.ttl = ttl
+        self.fallback_ttl = fallback_ttl
+        self.max_entries = max_entries
+        # key -> (value, monotonic time the entry expires)
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._version = 0
+        # key -> version at which it was last invalidated
+        self._invalidated: Dict[str, int] = {}
+        # Version of the last clear; older loads are not cached
+        self._cleared_at = 0
+
+    def version(self) -> int:
+        """Current version, to be passed to ``set`` after loading a value."""
+        return self._version
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[0]
+
+    def set(self, key: str, value: Any, version: Optional[int] = None) -> bool:
+        """Cache a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            version: ``version()`` taken before ``value`` was loaded
+
+        Returns:
+            False if the key was invalidated since ``version`` and nothing
+            was cached
+        """
+        if version is not None and (
+            version < self._cleared_at or self._invalidated.get(key, -1) > version
+        ):
+            return False
+        now = time.monotonic()
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            self._entries = {k: v for k, v in self._entries.items() if v[1] > now}
+            if len(self._entries) >= self.max_entries:
+                # Drop the oldest entry
+                del self._entries[next(iter(self._entries))]
+        ttl = self.ttl if self.bus.listening else self.fallback_ttl
+        self._entries[key] = (value, now + ttl)
+        return True
+
+    def replace(self, key: str, value: Any) -> None:
+        """Update a value this worker wrote itself, if it is cached."""
+        if self.get(key) is not None:
+            self.set(key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def evict(self, *keys: str) -> None:
+        """Drop keys from this worker's cache only."""
+        self._version += 1
+        if len(self._invalidated) + len(keys) > self.max_entries:
+            # Forget old tombstones; loads in flight are not cached
+            self._invalidated = {}
+            self._cleared_at = self._version
+        for key in keys:
+            self._entries.pop(key, None)
+            self._invalidated[key] = self._version
+
+    def clear(self) -> None:
+        """Drop every entry, and any load in flight."""
+        self._version += 1
+        self._entries = {}
+        self._invalidated = {}
+        self._cleared_at = self._version
+
+
+class CacheInvalidationBus(metaclass=Singleton):
+    """Broadcasts in-process cache invalidations to every worker.
+
+    ``invalidate`` evicts keys locally and publishes them on
+    ``CACHE_INVALIDATION_CHANNEL``; ``run`` (started by the app lifespan)
+    listens and evicts keys invalidated by other workers. Pub/sub delivery
+    is at most once, so whenever the listener connects or loses its
+    connection every cache is cleared, and while it is down entries fall
+    back to their short TTL. No entry outlives ``CACHE_MAX_STALENESS_SECONDS``
+    either way.
+    """
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.channel = settings.CACHE_INVALIDATION_CHANNEL
+        self.worker_id = uuid.uuid4().hex
+        self._caches: Dict[str, LocalCache] = {}
+        self._listening = False
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def listening(self) -> bool:
+        """Whether invalidations from other workers are being received."""
+        return self._listening
+
+    def cache(
+        self,
+        namespace: str,
+        fallback_ttl: float,
+        ttl: float = settings.CACHE_MAX_STALENESS_SECONDS,
+        max_entries: int = 10000,
+    ) -> LocalCache:
+        """Create (or return) the local cache for ``namespace``.
+
+        Args:
+            namespace: Name invalidations for this cache are published under
+            fallback_ttl: Entry lifetime while the bus is not listening
+            ttl: Entry lifetime while it is, capped at the max staleness
+            max_entries: Entries kept before the oldest are dropped
+        """
+        if namespace not in self._caches:
+            self._caches[namespace] = LocalCache(
+                self,
+                namespace,
+                ttl=min(ttl, settings.CACHE_MAX_STALENESS_SECONDS),
+                fallback_ttl=min(fallback_ttl, ttl),
+                max_entries=max_entries,
+            )
+        return self._caches[namespace]
+
+    async def invalidate(self, namespace: str, *keys: str) -> None:
+        """Evict keys from ``namespace`` in this worker and all others."""
+        if not keys:
+            return
+        cache = self._caches.get(namespace)
+        if cache is not None:
+            cache.evict(*keys)
+        message = json.dumps({"origin": self.worker_id, "namespace": namespace, "keys": keys})
+        try:
+            await self.redis.publish(self.channel, message)
+        except redis.RedisError as e:
+            # Other workers fall back to their entries expiring
+            metrics.increment("cache_invalidation.publish_failed")
+            self.logger.warning(f"Failed to publish cache invalidation: {str(e)}")
+
+    async def run(self, poll_interval: float = 1.0) -> None:
+        """Receive invalidations from other workers until cancelled."""
+        backoff = 0.0
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                # Anything cached before now may have missed invalidations
+                self._clear_all()
+                self._listening = True
+                backoff = 0.0
+                while True:
+                    # Poll rather than block, so the pool's socket timeout
+                    # does not drop an idle subscription
+                    message = await pubsub.get_message(timeout=poll_interval)
+                    if message is not None:
+                        self._receive(message["data"])
+            except redis.RedisError as e:
+                metrics.increment("cache_invalidation.disconnects")
+                self.logger.warning(f"Cache invalidation listener disconnected: {str(e)}")
+            finally:
+                if self._listening:
+                    self._listening = False
+                    self._clear_all()
+                await pubsub.aclose()
+            backoff = min(max(backoff * 2, 0.5), 30.0)
+            await asyncio.sleep(backoff)
+
+    def _receive(self, data: str) -> None:
+        try:
+            message = json.loads(data)
+        except ValueError:
+            self.logger.warning(f"Ignoring malformed cache invalidation: {data!r}")
+            return
+        if message.get("origin") == self.worker_id:
+            return
+        cache = self._caches.get(message.get("namespace"))
+        if cache is not None:
+            cache.evict(*message.get("keys", []))
+            metrics.increment(f"cache_invalidation.received.{cache.namespace}")
+
+    def _clear_all(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+from app.api.client.openai.openai_api_client import OpenAiAPIClient
+from app.core.config import settings
+from app.core.singleton import Singleton
+from app.lib.tokens import (
+    content_to_text,
+    count_message_tokens,
+    count_tokens,
+    fit_messages_to_budget,
+)
+from app.services.thread_service import ThreadService
+
+
+class ConversationContextService(metaclass=Singleton):
+    """Assembles thread history for the model within a token budget.
+
+    Recent messages are sent verbatim. Older ones are folded into a rolling
+    summary stored next to the thread, so prompt size stays flat as the
+    thread grows instead of resending the whole history every turn.
+    """
+
+    def __init__(self):
+        self.thread_service = ThreadService()
+        self.client = OpenAiAPIClient(os.getenv("OPENAI_API_KEY"))
+        self.token_budget = settings.CONTEXT_TOKEN_BUDGET
+        self.summary_token_budget = settings.CONTEXT_SUMMARY_TOKEN_BUDGET
+        self.logger = logging.getLogger(__name__)
+
+    async def build_thread_context(self, thread_id: str) -> Optional[List[Dict]]:
+        """Build the model input for a thread.
+
+        Args:
+            thread_id: The thread ID
+
+        Returns:
+            Summary message (if any) followed by the newest messages that fit
+            the budget, or None if the thread does not exist
+        """
+        summary = await self.thread_service.get_thread_summary(thread_id)
+        summary_text = summary["text"] if summary else ""
+        summarized_count = summary["message_count"] if summary else 0
+
+        # Summarized messages are not read at all, so the cost of a turn
+        # does not grow with the length of the thread
+        recent = await self.thread_service.get_thread_messages(
+            thread_id=thread_id, start=summarized_count
+        )
+        if recent is None:
+            return None
+
+        budget = self.token_budget - count_tokens(summary_text)
+        if self._count(recent) > budget and len(recent) > 1:
+            # Fold the oldest messages into the summary until the remainder
+            # fits in half the budget, so re-summarizing happens every few
+            # turns rather than on every turn.
+            keep = fit_messages_to_budget(recent, budget // 2)
+            overflow = recent[: len(recent) - len(keep)]
+            summary_text = await self._summarize(summary_text, overflow)
+            summarized_count += len(overflow)
+            await self.thread_service.set_thread_summary(
+                thread_id, summary_text, summarized_count
+            )
+            recent = keep
+
+        context = fit_messages_to_budget(
+            recent, self.token_budget - count_tokens(summary_text)
+        )
+        if summary_text:
+            context.insert(0, self._summary_message(summary_text))
+        return context
+
+    def _summary_message(self, summary_text: str) -> Dict:
+        return {
+            "role": "system",
+            "content": f"Summary of the earlier conversation: {summary_text}",
+        }
+
+    def _count(self, messages: List[Dict]) -> int:
+        return sum(count_message_tokens(message) for message in messages)
+
+    async def _summarize(self, previous_summary: str, messages: List[Dict]) -> str:
+        """Fold ``messages`` into ``previous_summary`` with the LLM.
+
+        Falls back to a truncated transcript if the model call fails.
+        """
+        transcript = "\n".join(
+            f"{m['role'].title()}: {content_to_text(m['content'])}" for m in messages
+        )
+        prompt = f"""Update the running summary of a conversation between a user and Dexx, a crypto analytics assistant.
+Keep tokens, chains, contract addresses, figures and user preferences that later turns may refer to.
+Reply with the updated summary only, in at most {self.summary_token_budget} tokens.
+
+Current summary:
+{previous_summary or "(none)"}
+
+New messages:
+{transcript}
+"""
+        response = await asyncio.to_thread(
+            self.client.query, prompt, max_tokens=self.summary_token_budget
+        )
+        content = getattr(response, "content", None)
+        if content:
+            return content.strip()
+
+        self.logger.warning(f"Summarization failed, truncating instead: {response}")
+        return self._truncate(f"{previous_summary}\n{transcript}".strip())
+
+    def _truncate(self, text: str) -> str:
+        """Keep the tail of ``text`` within the summary budget."""
+        while text and count_tokens(text) > self.summary_token_budget:
+            text = text[len(text) // 4 :]
+        return text
@@ -2,6 +2,7 @@ from typing import Optional, Dict, List
 import logging
 from app.api.client.cryptopanic.cryptopanic_client import CryptoPanicClient
 from app.api.client.mobula.metacore_client import MetacoreClient
+from app.core.metrics import metrics
 from app.models.prompt_analysis import Sentiment, TokenResponse
 from app.services.technical_analysis.technical_analysis_service import (
     TechnicalAnalysisService,
@@ -10,6 +11,7 @@ import time
 from fastapi import HTTPException
 from typing import Optional
 from app.models.response import ResponseType
+from app.services.data_access.token_catalog import TokenCatalog
 
 
 class DataAccessService:
@@ -34,6 +36,7 @@ class DataAccessService:
     def __init__(self):
         """Initialize the service with Mobula client."""
         self.mobula_client = MetacoreClient()
+        self.token_catalog = TokenCatalog()
         self.technical_analysis = TechnicalAnalysisService()
         self.crypto_panic_client = CryptoPanicClient()
         self.logger = logging.getLogger(__name__)
@@ -73,6 +76,13 @@ class DataAccessService:
     ) -> Optional[TokenResponse]:
         """Fetch token metadata from Mobula API.
 
+        Unless a contract address is given, the token is first resolved in
+        the local ``TokenCatalog`` and fetched by its Mobula ID, trying a
+        fuzzy match on ``token_query`` when there is no exact one; Mobula's
+        own search is only used for tokens the catalog cannot resolve.
+        Symbols are never fuzzy matched, as a symbol close to another is
+        usually a different token (ETHW is not ETH).
+
         Args:
             token_query: General search query for token
             contract_address: Specific contract address to search for
@@ -89,9 +99,25 @@ class DataAccessService:
             f"Fetching metadata with params: token_query={token_query}, contract={contract_address}, chain={chain}, symbol={token_symbol}"
         )
 
-        query_string = self._build_query_string(
-            token_query, contract_address, chain, token_symbol
-        )
+        token = None
+        if not contract_address:
+            token = self.token_catalog.resolve(
+                symbol=token_symbol, name=token_query, chain=chain
+            )
+            resolution = "local"
+            if not token and token_query:
+                # Misspelled names are matched before falling back to Mobula
+                matches = self.token_catalog.search(token_query, limit=1, chain=chain)
+                token = matches[0] if matches else None
+                resolution = "fuzzy"
+        if token:
+            query_string = {"id": token["id"]}
+            metrics.increment(f"token_resolution.{resolution}")
+        else:
+            query_string = self._build_query_string(
+                token_query, contract_address, chain, token_symbol
+            )
+            metrics.increment("token_resolution.remote")
         self.logger.debug(f"Built query string: {query_string}")
 
         if not query_string:
@@ -122,8 +148,14 @@ class DataAccessService:
             metadata = TokenResponse.model_validate(raw_metadata)
 
             if metadata.data:
-                # Validate that the returned token matches what we requested
-                requested_symbol = token_symbol or token_query
+                # Validate that the returned token matches what we requested;
+                # a fuzzy match must still have the symbol asked for, if any
+                if token and resolution == "local":
+                    requested_symbol = token["symbol"]
+                elif token:
+                    requested_symbol = token_symbol or token["symbol"]
+                else:
+                    requested_symbol = token_symbol or token_query
                 if (
                     requested_symbol
                     and metadata.data.symbol.upper() != requested_symbol.upper()
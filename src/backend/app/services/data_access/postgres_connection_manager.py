@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from typing import Optional
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.singleton import Singleton
+
+
+class PostgresConnectionManager(metaclass=Singleton):
+    """Owns the asyncpg connection pool for ``DATABASE_URL``.
+
+    The pool is created on first use, so workers that never touch Postgres
+    do not open connections to it.
+    """
+
+    def __init__(self):
+        self._pool: Optional[asyncpg.Pool] = None
+        self._lock = asyncio.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    async def get_pool(self) -> asyncpg.Pool:
+        """Return the shared pool, creating it on first use."""
+        if self._pool is None:
+            async with self._lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        dsn=settings.DATABASE_URL,
+                        min_size=settings.POSTGRES_POOL_MIN_SIZE,
+                        max_size=settings.POSTGRES_POOL_MAX_SIZE,
+                        command_timeout=settings.POSTGRES_COMMAND_TIMEOUT_SECONDS,
+                    )
+        return self._pool
+
+    async def close(self) -> None:
+        """Close the pool (on worker shutdown)."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
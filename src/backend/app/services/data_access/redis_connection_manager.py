@@ -0,0 +1,91 @@
+import logging
+from typing import Dict, Optional
+
+import fakeredis
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.singleton import Singleton
+
+STORAGE_BACKENDS = ("redis", "memory")
+
+
+class RedisConnectionManager(metaclass=Singleton):
+    """Owns the async Redis connection pools shared by all storage services.
+
+    One pool exists per worker process (and per ``decode_responses`` mode), so
+    the number of connections is bounded by ``REDIS_MAX_CONNECTIONS_PER_WORKER``
+    instead of growing with every service that talks to Redis.
+
+    With ``STORAGE_BACKEND=memory`` clients are backed by an in-process
+    fakeredis server instead, so the whole request pipeline can run and be
+    profiled with no external services. Data lives in the worker process and
+    is lost when it exits; run a single worker in this mode.
+    """
+
+    def __init__(self):
+        if settings.STORAGE_BACKEND not in STORAGE_BACKENDS:
+            raise ValueError(
+                f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}, "
+                f"expected one of {', '.join(STORAGE_BACKENDS)}"
+            )
+        self.backend = settings.STORAGE_BACKEND
+        self._pools: Dict[bool, redis.BlockingConnectionPool] = {}
+        self._memory_server: Optional[fakeredis.FakeServer] = None
+        self.logger = logging.getLogger(__name__)
+
+    def _get_pool(self, decode_responses: bool) -> redis.BlockingConnectionPool:
+        if decode_responses not in self._pools:
+            self._pools[decode_responses] = redis.BlockingConnectionPool(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                username=settings.REDIS_UNAME,
+                password=settings.REDIS_PWD,
+                decode_responses=decode_responses,
+                max_connections=settings.REDIS_MAX_CONNECTIONS_PER_WORKER,
+                timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+                retry_on_timeout=True,
+            )
+        return self._pools[decode_responses]
+
+    def get_client(self, decode_responses: bool = True) -> redis.Redis:
+        """Return a client backed by the shared pool.
+
+        Args:
+            decode_responses: Return ``str`` instead of ``bytes`` values
+
+        Returns:
+            An async Redis client; cheap to create, connections are pooled
+        """
+        if self.backend == "memory":
+            if self._memory_server is None:
+                self._memory_server = fakeredis.FakeServer()
+            return fakeredis.aioredis.FakeRedis(
+                server=self._memory_server, decode_responses=decode_responses
+            )
+        return redis.Redis(connection_pool=self._get_pool(decode_responses))
+
+    async def health_check(self) -> bool:
+        """Ping Redis through the shared pool."""
+        try:
+            return bool(await self.get_client().ping())
+        except redis.RedisError as e:
+            self.logger.error(f"Redis health check failed: {str(e)}")
+            return False
+
+    async def close(self) -> None:
+        """Disconnect every pooled connection (on worker shutdown).
+
+        The pools themselves are kept: services hold clients bound to them,
+        and a disconnected pool simply reconnects on next use.
+        """
+        for pool in self._pools.values():
+            await pool.disconnect()
+
+
+def get_redis(decode_responses: bool = True) -> redis.Redis:
+    """Shortcut for ``RedisConnectionManager().get_client()``."""
+    return RedisConnectionManager().get_client(decode_responses=decode_responses)
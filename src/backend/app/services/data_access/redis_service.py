@@ -1,21 +1,16 @@
-import json
 from typing import TypeVar, Generic, Optional
 from pydantic import BaseModel
-from redis import Redis
-from app.core.config import settings
+from app.lib.codec import decode_record, encode_record
+from app.services.data_access.redis_connection_manager import get_redis
 
 T = TypeVar("T", bound=BaseModel)
 
 
 class RedisService(Generic[T]):
     def __init__(self, model_class: type[T]):
-        self.redis_client = Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            username=settings.REDIS_UNAME,
-            password=settings.REDIS_PWD,
-            decode_responses=True,
-        )
+        self.redis_client = get_redis()
+        # Records are stored encoded, so they are read back as bytes
+        self.binary_client = get_redis(decode_responses=False)
         self.model_class = model_class
         self.prefix = model_class.__name__.lower()
 
@@ -23,32 +18,38 @@ class RedisService(Generic[T]):
         """Generate Redis key with model prefix"""
         return f"{self.prefix}:{id}"
 
+    def encode(self, data: T) -> bytes:
+        """Serialize a record for storage"""
+        return encode_record(data.model_dump(mode="json"))
+
+    def decode(self, raw: bytes) -> T:
+        """Deserialize a stored record (compact or legacy JSON)"""
+        return self.model_class.model_validate(decode_record(raw))
+
     async def create(self, id: str, data: T) -> None:
         """Create a new record"""
         key = self._get_key(id)
-        json_data = data.model_dump_json()
-        self.redis_client.set(key, json_data)
+        await self.redis_client.set(key, self.encode(data))
 
     async def get(self, id: str) -> Optional[T]:
         """Retrieve a record by ID"""
         key = self._get_key(id)
-        data = self.redis_client.get(key)
+        data = await self.binary_client.get(key)
         if not data:
             return None
-        return self.model_class.model_validate_json(data)
+        return self.decode(data)
 
     async def update(self, id: str, data: T) -> None:
         """Update an existing record"""
         key = self._get_key(id)
-        json_data = data.model_dump_json()
-        self.redis_client.set(key, json_data)
+        await self.redis_client.set(key, self.encode(data))
 
     async def delete(self, id: str) -> bool:
         """Delete a record by ID"""
         key = self._get_key(id)
-        return bool(self.redis_client.delete(key))
+        return bool(await self.redis_client.delete(key))
 
     async def exists(self, id: str) -> bool:
         """Check if a record exists"""
         key = self._get_key(id)
-        return bool(self.redis_client.exists(key))
+        return bool(await self.redis_client.exists(key))
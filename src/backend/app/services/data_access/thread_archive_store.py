@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from app.core.singleton import Singleton
+from app.services.data_access.postgres_connection_manager import (
+    PostgresConnectionManager,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived_threads (
+    thread_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    payload BYTEA NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archived_threads_user_id_idx ON archived_threads (user_id);
+"""
+
+UPSERT_THREAD = """
+INSERT INTO archived_threads (thread_id, user_id, updated_at, payload)
+VALUES ($1, $2, $3, $4)
+ON CONFLICT (thread_id) DO UPDATE
+SET user_id = EXCLUDED.user_id,
+    updated_at = EXCLUDED.updated_at,
+    payload = EXCLUDED.payload,
+    archived_at = now()
+"""
+
+
+class ThreadArchiveStore(metaclass=Singleton):
+    """Cold storage for idle thread history in Postgres.
+
+    Each archived thread is one row holding its encoded messages and summary;
+    ThreadService decides what to archive and restores rows to Redis.
+    """
+
+    def __init__(self):
+        self.connection_manager = PostgresConnectionManager()
+        self._schema_ready = False
+
+    async def _pool(self):
+        pool = await self.connection_manager.get_pool()
+        if not self._schema_ready:
+            async with pool.acquire() as connection:
+                await connection.execute(SCHEMA)
+            self._schema_ready = True
+        return pool
+
+    async def save_threads(self, rows: List[Tuple[str, str, datetime, bytes]]) -> None:
+        """Upsert archived threads in one batch.
+
+        Args:
+            rows: ``(thread_id, user_id, updated_at, payload)`` tuples
+        """
+        if not rows:
+            return
+        pool = await self._pool()
+        async with pool.acquire() as connection:
+            await connection.executemany(UPSERT_THREAD, rows)
+
+    async def load_thread(self, thread_id: str) -> Optional[bytes]:
+        """Return the archived payload of a thread, if any."""
+        pool = await self._pool()
+        return await pool.fetchval(
+            "SELECT payload FROM archived_threads WHERE thread_id = $1", thread_id
+        )
+
+    async def delete_thread(self, thread_id: str) -> None:
+        """Drop a thread's archived copy."""
+        pool = await self._pool()
+        await pool.execute("DELETE FROM archived_threads WHERE thread_id = $1", thread_id)
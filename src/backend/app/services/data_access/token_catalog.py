@@ -0,0 +1,309 @@
+import asyncio
+import fcntl
+import logging
+import math
+import os
+import re
+import time
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.api.client.mobula.metacore_client import MetacoreClient
+from app.core.config import settings
+from app.core.singleton import Singleton
+from app.lib.shared_catalog import SharedCatalog, write_catalog
+from app.models.token_symbols import CryptocurrencySymbol_Mobula
+
+# Extra fields requested from Mobula's token list
+CATALOG_FIELDS = "contracts,blockchains,market_cap"
+
+# Fuzzy search: tokens kept per trigram (largest market caps first), minimum
+# trigram similarity for a match (higher against symbols, which are short
+# and often differ from another token's by one character), and how much
+# market cap outweighs similarity when ranking matches
+FUZZY_MAX_POSTINGS = 256
+FUZZY_MIN_SIMILARITY = 0.5
+FUZZY_MIN_SYMBOL_SIMILARITY = 0.8
+FUZZY_MARKET_CAP_WEIGHT = 0.05
+# Tokens loaded to narrow fuzzy matches down to a chain
+FUZZY_MAX_CANDIDATES = 20
+
+
+def normalize_token_name(text: str) -> str:
+    """Lowercase, drop a leading ``$`` and collapse whitespace."""
+    return re.sub(r"\s+", " ", text.strip().lstrip("$").lower()).strip()
+
+
+def token_aliases(name: str, symbol: str) -> Set[str]:
+    """Names a token is commonly referred to by, besides its symbol."""
+    name = normalize_token_name(name)
+    symbol = normalize_token_name(symbol)
+    aliases = {name, name.replace(" ", ""), f"{name} token", f"{symbol} token"}
+    return {alias for alias in aliases if alias}
+
+
+def fuzzy_term(text: str) -> str:
+    """Form of a name or symbol compared by fuzzy search: letters and digits only."""
+    return re.sub(r"[\W_]+", "", normalize_token_name(text))
+
+
+def trigrams(term: str) -> Set[str]:
+    """Trigrams of ``term``, padded so its start and end weigh more."""
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def encode_posting(token_id: int, market_cap: float, term_index: int, trigram_count: int) -> int:
+    """Pack a trigram index entry into an integer.
+
+    A trigram's entries are stored as one array of these, and matches are
+    ranked from them without loading the tokens.
+
+    Bits from high to low: token id, market cap magnitude (tenths of a
+    decade, 8 bits), term (0 = name, 1 = symbol, 1 bit) and the term's
+    trigram count (8 bits).
+    """
+    magnitude = min(int(math.log10(1 + max(market_cap, 0)) * 10), 0xFF)
+    return token_id << 17 | magnitude << 9 | term_index << 8 | min(trigram_count, 0xFF)
+
+
+class TokenCatalog(metaclass=Singleton):
+    """Index of Mobula's token list, shared read-only by all workers on a host.
+
+    Tokens are indexed by symbol and by name aliases, and carry their Mobula
+    ID and contract address per chain, so most token references in a prompt
+    resolve locally instead of through Mobula's search.
+
+    Misspelled references are matched by ``search`` through a trigram index
+    over names and symbols.
+
+    The index is a file at ``TOKEN_CATALOG_PATH`` memory-mapped by every
+    worker (see ``SharedCatalog``), so it loads in milliseconds and memory
+    stays flat as workers are added. ``refresh`` rebuilds it when older than
+    ``TOKEN_CATALOG_REFRESH_SECONDS``; a file lock ensures only one process
+    fetches from Mobula, and the others pick up the new file when it is
+    swapped in.
+    """
+
+    def __init__(self):
+        self.path = settings.TOKEN_CATALOG_PATH
+        self.max_age = settings.TOKEN_CATALOG_REFRESH_SECONDS
+        self.catalog = SharedCatalog(self.path)
+        self.mobula_client = MetacoreClient()
+        self.logger = logging.getLogger(__name__)
+
+    def load(self) -> bool:
+        """Map the catalog file, if one has been built.
+
+        Returns:
+            True if the catalog is available
+        """
+        start = time.perf_counter()
+        available = self.catalog.available
+        if available:
+            self.logger.info(
+                f"Token catalog loaded with {len(self.catalog)} entries in "
+                f"{(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+        return available
+
+    def get_token(self, token_id: int) -> Optional[Dict]:
+        """Token by Mobula ID, as ``{"id", "name", "symbol", "contracts", "market_cap"}``.
+
+        ``contracts`` maps each chain the token is deployed on to its address.
+        """
+        return self.catalog.get(f"token:{token_id}")
+
+    def get(self, symbol: str) -> List[Dict]:
+        """Tokens listed under ``symbol`` (case-insensitive).
+
+        Returns:
+            List of tokens as returned by ``get_token``, empty if the symbol
+            is unknown or the catalog has not been built yet
+        """
+        return self._tokens(self.catalog.get(f"symbol:{normalize_token_name(symbol).upper()}"))
+
+    def find_by_name(self, name: str) -> List[Dict]:
+        """Tokens whose name or a common variation of it is ``name``."""
+        return self._tokens(self.catalog.get(f"alias:{normalize_token_name(name)}"))
+
+    def resolve(
+        self,
+        symbol: Optional[str] = None,
+        name: Optional[str] = None,
+        chain: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """Resolve a token reference to a single catalog entry.
+
+        The symbol is tried first, then the name; either may hold the other
+        (models often put a name in the symbol field and vice versa). When
+        several tokens match, the name and chain narrow them down, and the
+        one with the largest market cap is picked among those left (popular
+        symbols are shared by clones and scams).
+
+        Returns:
+            The token, or None if it is unknown
+        """
+        for text, lookup in (
+            (symbol, self.get),
+            (name, self.find_by_name),
+            (symbol, self.find_by_name),
+            (name, self.get),
+        ):
+            if not text:
+                continue
+            candidates = lookup(text)
+            if candidates:
+                return self._pick(candidates, name, chain)
+        return None
+
+    def search(self, text: str, limit: int = 5, chain: Optional[str] = None) -> List[Dict]:
+        """Tokens whose name or symbol is similar to ``text``, best match first.
+
+        Matches are ranked by trigram similarity, boosted by market cap, so
+        a misspelling resolves to the well-known token rather than an
+        obscure one that happens to be spelled that way.
+
+        Args:
+            text: Possibly misspelled token name or symbol
+            limit: Maximum number of tokens to return
+            chain: Prefer tokens deployed on this chain
+
+        Returns:
+            Matching tokens, empty if none is similar enough
+        """
+        term = fuzzy_term(text)
+        if not term:
+            return []
+        query = trigrams(term)
+        # Trigrams shared between the query and each indexed term
+        hits: Counter = Counter()
+        for trigram in query:
+            postings = self.catalog.get(f"trigram:{trigram}")
+            if postings:
+                hits.update(array("Q", postings))
+
+        # A term shares at most all of its trigrams, so fewer shared trigrams
+        # than this can never reach the minimum similarity
+        size = len(query)
+        min_shared = FUZZY_MIN_SIMILARITY * size / (2 - FUZZY_MIN_SIMILARITY)
+        ranks: Dict[int, float] = {}
+        for posting, shared in hits.items():
+            if shared < min_shared:
+                continue
+            # Dice coefficient of the two trigram sets
+            similarity = 2 * shared / (size + (posting & 0xFF))
+            symbol_term = posting >> 8 & 1
+            if similarity < (FUZZY_MIN_SYMBOL_SIMILARITY if symbol_term else FUZZY_MIN_SIMILARITY):
+                continue
+            token_id = posting >> 17
+            magnitude = (posting >> 9 & 0xFF) / 10
+            rank = similarity + FUZZY_MARKET_CAP_WEIGHT * magnitude
+            if rank > ranks.get(token_id, 0):
+                ranks[token_id] = rank
+
+        token_ids = sorted(ranks, key=ranks.get, reverse=True)
+        if not chain:
+            return self._tokens(token_ids[:limit])
+        tokens = self._tokens(token_ids[:FUZZY_MAX_CANDIDATES])
+        return (self._on_chain(tokens, chain) or tokens)[:limit]
+
+    def _pick(self, candidates: List[Dict], name: Optional[str], chain: Optional[str]) -> Optional[Dict]:
+        if len(candidates) > 1 and name:
+            normalized = normalize_token_name(name)
+            named = [
+                token
+                for token in candidates
+                if normalized in token_aliases(token["name"], token["symbol"])
+            ]
+            candidates = named or candidates
+        if len(candidates) > 1 and chain:
+            candidates = self._on_chain(candidates, chain) or candidates
+        return max(candidates, key=lambda token: token.get("market_cap") or 0, default=None)
+
+    def _on_chain(self, tokens: List[Dict], chain: str) -> List[Dict]:
+        return [
+            token for token in tokens if chain.lower() in (c.lower() for c in token["contracts"])
+        ]
+
+    def _tokens(self, token_ids: Optional[List[int]]) -> List[Dict]:
+        tokens = (self.get_token(token_id) for token_id in token_ids or [])
+        return [token for token in tokens if token]
+
+    def is_stale(self) -> bool:
+        try:
+            return time.time() - os.path.getmtime(self.path) > self.max_age
+        except FileNotFoundError:
+            return True
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Rebuild the catalog from Mobula if it is stale.
+
+        Args:
+            force: Rebuild even if the catalog is fresh
+
+        Returns:
+            True if this process rebuilt the catalog, False if it was fresh
+            or another process is rebuilding it
+        """
+        if not force and not self.is_stale():
+            return False
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                # Another process may have finished a rebuild meanwhile
+                if not force and not self.is_stale():
+                    return False
+                # Tokens are indexed as they stream in, so the payload is
+                # never held in memory as a whole
+                tokens = self.mobula_client.iter_all_cryptocurrencies(fields=CATALOG_FIELDS)
+                records, count = await asyncio.to_thread(self._build_records, tokens)
+                await asyncio.to_thread(write_catalog, self.path, records)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        self.logger.info(f"Token catalog rebuilt with {count} tokens")
+        return True
+
+    def _build_records(self, tokens: Iterable[CryptocurrencySymbol_Mobula]):
+        records = {}
+        postings: Dict[str, List[int]] = {}
+        count = 0
+        for token in tokens:
+            count += 1
+            contracts = {}
+            for blockchain, address in zip(token.blockchains, token.contracts):
+                contracts.setdefault(blockchain, address)
+            records[f"token:{token.id}"] = {
+                "id": token.id,
+                "name": token.name,
+                "symbol": token.symbol,
+                "contracts": contracts,
+                "market_cap": token.market_cap,
+            }
+            symbol_key = f"symbol:{normalize_token_name(token.symbol).upper()}"
+            records.setdefault(symbol_key, []).append(token.id)
+            for alias in token_aliases(token.name, token.symbol):
+                records.setdefault(f"alias:{alias}", []).append(token.id)
+
+            terms = [fuzzy_term(token.name), fuzzy_term(token.symbol)]
+            for term_index, term in enumerate(terms):
+                if not term or (term_index and term == terms[0]):
+                    continue
+                term_trigrams = trigrams(term)
+                for trigram in term_trigrams:
+                    postings.setdefault(trigram, []).append(
+                        encode_posting(
+                            token.id, token.market_cap or 0, term_index, len(term_trigrams)
+                        )
+                    )
+
+        for trigram, entries in postings.items():
+            # Common trigrams keep only the tokens most likely to be meant
+            entries.sort(key=lambda posting: posting >> 9 & 0xFF, reverse=True)
+            records[f"trigram:{trigram}"] = array("Q", entries[:FUZZY_MAX_POSTINGS]).tobytes()
+        return records, count
@@ -1,24 +1,51 @@
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
-import redis
+from redis.exceptions import WatchError
 from app.core.singleton import Singleton
 from app.core.config import settings
+from app.lib.codec import decode_record, encode_record
+from app.lib.tokens import fit_messages_to_budget
+from app.services.data_access.redis_connection_manager import get_redis
+
+
+# Token context fields kept per session, updated from message metadata
+CONTEXT_FIELDS = {
+    "last_token": "token_symbol",
+    "last_chain": "chain",
+    "last_contract_address": "contract_address",
+    "last_token_name": "token_name",
+    "last_action": "action",
+}
 
 
 class MessageService(metaclass=Singleton):
+    """Stores per-session chat messages and token context in Redis.
+
+    Messages live in an append-only list trimmed server-side to the last
+    ``max_context_messages``; the session's token context and bookkeeping
+    live in a small hash. Saving a message is one O(1) pipelined round trip
+    and concurrent saves cannot overwrite each other.
+    """
+
     def __init__(self):
-        self.redis = redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            username=settings.REDIS_UNAME,
-            password=settings.REDIS_PWD,
-            decode_responses=True,
-        )
+        self.redis = get_redis()
+        # Messages are stored encoded, so they are read back as bytes
+        self.binary_redis = get_redis(decode_responses=False)
         self.max_context_messages = 20
-        self.context_window = 5
+        self.history_token_budget = settings.HISTORY_WINDOW_TOKEN_BUDGET
+
+    def _messages_key(self, session_id: str) -> str:
+        return f"messages:session:{session_id}:messages"
 
-    def save_message(
+    def _context_key(self, session_id: str) -> str:
+        return f"messages:session:{session_id}:context"
+
+    def _legacy_key(self, session_id: str) -> str:
+        # Whole-session JSON blob written by earlier versions
+        return f"messages:session:{session_id}"
+
+    async def save_message(
         self,
         wallet_address: str,
         session_id: str,
@@ -34,82 +61,55 @@ class MessageService(metaclass=Singleton):
             "session_id": session_id,
         }
 
-        # Save to session-specific history
-        session_key = f"messages:session:{session_id}"
-        session_data = self._get_session_data(session_key)
-        
-        # Update session data
-        if not session_data:
-            session_data = {
-                "wallet_address": wallet_address,
-                "session_id": session_id,
-                "messages": [],
-                "last_updated": datetime.now().isoformat(),
-                "context": {
-                    "last_token": None,
-                    "last_chain": None,
-                    "last_contract_address": None,
-                    "last_token_name": None,
-                    "last_action": None
-                }
-            }
-
+        session_fields = {
+            "wallet_address": wallet_address,
+            "session_id": session_id,
+            "last_updated": message["timestamp"],
+        }
         # Update context if metadata contains token info
         if metadata and any(key in metadata for key in ["token_symbol", "contract_address", "chain"]):
-            session_data["context"].update({
-                "last_token": metadata.get("token_symbol"),
-                "last_chain": metadata.get("chain"),
-                "last_contract_address": metadata.get("contract_address"),
-                "last_token_name": metadata.get("token_name"),
-                "last_action": metadata.get("action")
-            })
-
-        # Add new message
-        session_data["messages"].append(message)
-        session_data["last_updated"] = datetime.now().isoformat()
-
-        # Maintain max context size
-        if len(session_data["messages"]) > self.max_context_messages:
-            session_data["messages"] = session_data["messages"][-self.max_context_messages:]
-
-        # Save updated session data
-        self.redis.set(session_key, json.dumps(session_data))
-
-        # Also maintain a list of sessions for this wallet
-        self.redis.sadd(f"wallet:sessions:{wallet_address}", session_id)
+            session_fields.update(
+                {field: metadata.get(key) or "" for field, key in CONTEXT_FIELDS.items()}
+            )
+
+        messages_key = self._messages_key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(messages_key, encode_record(message))
+            pipe.ltrim(messages_key, -self.max_context_messages, -1)
+            pipe.hset(self._context_key(session_id), mapping=session_fields)
+            # Also maintain a list of sessions for this wallet
+            pipe.sadd(f"wallet:sessions:{wallet_address}", session_id)
+            await pipe.execute()
 
         return message
 
-    def get_session_history(self, session_id: str) -> List[Dict]:
+    async def get_session_history(self, session_id: str) -> List[Dict]:
         """Get message history for a specific session"""
-        session_data = self._get_session_data(f"messages:session:{session_id}")
-        return session_data.get("messages", []) if session_data else []
+        messages, _ = await self._get_session_data(session_id)
+        return messages
 
-    def get_session_context(self, session_id: str) -> Dict:
+    async def get_session_context(self, session_id: str) -> Dict:
         """Get the current context for a session"""
-        session_data = self._get_session_data(f"messages:session:{session_id}")
-        return session_data.get("context", {}) if session_data else {}
+        _, context = await self._get_session_data(session_id)
+        return context
 
-    def get_wallet_sessions(self, wallet_address: str) -> List[str]:
+    async def get_wallet_sessions(self, wallet_address: str) -> List[str]:
         """Get all sessions for a wallet"""
-        return list(self.redis.smembers(f"wallet:sessions:{wallet_address}"))
+        return list(await self.redis.smembers(f"wallet:sessions:{wallet_address}"))
 
-    def get_all_wallet_messages(self, wallet_address: str) -> Dict[str, List[Dict]]:
+    async def get_all_wallet_messages(self, wallet_address: str) -> Dict[str, List[Dict]]:
         """Get all messages across all sessions for a wallet"""
-        sessions = self.get_wallet_sessions(wallet_address)
+        sessions = await self.get_wallet_sessions(wallet_address)
         return {
-            session_id: self.get_session_history(session_id) for session_id in sessions
+            session_id: await self.get_session_history(session_id) for session_id in sessions
         }
 
-    def format_for_chatgpt(self, session_id: str) -> List[Dict[str, str]]:
+    async def format_for_chatgpt(self, session_id: str) -> List[Dict[str, str]]:
         """Format messages for ChatGPT context with improved context handling"""
-        session_data = self._get_session_data(f"messages:session:{session_id}")
-        if not session_data:
+        messages, context = await self._get_session_data(session_id)
+        if not messages and not context:
             return []
 
-        messages = session_data["messages"]
-        context = session_data["context"]
-        
         # Create context message if we have token context
         if context.get("last_token"):
             context_message = {
@@ -120,7 +120,7 @@ class MessageService(metaclass=Singleton):
 
         # Format messages for ChatGPT
         formatted_messages = []
-        for msg in messages[-self.context_window:]:  # Use context window for immediate context
+        for msg in fit_messages_to_budget(messages, self.history_token_budget):
             formatted_msg = {
                 "role": msg["role"],
                 "content": msg["content"]
@@ -145,18 +145,82 @@ class MessageService(metaclass=Singleton):
             parts.append(f"Action: {metadata['action']}")
         return ", ".join(parts)
 
-    def _get_session_data(self, key: str) -> Optional[Dict]:
-        """Helper method to get session data from Redis"""
-        data = self.redis.get(key)
-        return json.loads(data) if data else None
+    async def _get_session_data(self, session_id: str) -> Tuple[List[Dict], Dict]:
+        """Read a session's messages and token context in one round trip.
+
+        Sessions still stored as a legacy JSON blob are migrated on first read.
+        """
+        async with self.binary_redis.pipeline(transaction=False) as pipe:
+            pipe.lrange(self._messages_key(session_id), 0, -1)
+            pipe.hgetall(self._context_key(session_id))
+            pipe.get(self._legacy_key(session_id))
+            raw_messages, raw_fields, legacy = await pipe.execute()
+
+        messages = [decode_record(message) for message in raw_messages]
+        session_fields = {key.decode(): value.decode() for key, value in raw_fields.items()}
+        if legacy:
+            legacy_data = json.loads(legacy)
+            await self._migrate_legacy_session(session_id, legacy_data)
+            messages = (legacy_data.get("messages", []) + messages)[-self.max_context_messages:]
+            session_fields = {
+                **{k: v for k, v in legacy_data.get("context", {}).items() if v},
+                **session_fields,
+            }
 
-    def clear_session_history(self, session_id: str):
+        if not session_fields:
+            return messages, {}
+        context = {field: session_fields.get(field) or None for field in CONTEXT_FIELDS}
+        return messages, context
+
+    async def _migrate_legacy_session(self, session_id: str, legacy_data: Dict) -> None:
+        """Move a legacy blob into the message list and context hash.
+
+        Legacy messages are older than anything appended since, so they go to
+        the front of the list. Context fields already written are kept. The
+        blob is watched so concurrent readers migrate it only once.
+        """
+        legacy_key = self._legacy_key(session_id)
+        messages_key = self._messages_key(session_id)
+        context_key = self._context_key(session_id)
+        legacy_fields = {
+            k: v
+            for k, v in {
+                **legacy_data.get("context", {}),
+                "wallet_address": legacy_data.get("wallet_address"),
+                "session_id": session_id,
+                "last_updated": legacy_data.get("last_updated"),
+            }.items()
+            if v
+        }
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(legacy_key)
+                if not await pipe.exists(legacy_key):
+                    return
+                pipe.multi()
+                legacy_messages = [encode_record(m) for m in legacy_data.get("messages", [])]
+                if legacy_messages:
+                    pipe.lpush(messages_key, *reversed(legacy_messages))
+                    pipe.ltrim(messages_key, -self.max_context_messages, -1)
+                for field, value in legacy_fields.items():
+                    pipe.hsetnx(context_key, field, value)
+                pipe.delete(legacy_key)
+                await pipe.execute()
+            except WatchError:
+                # Another request migrated this session first
+                pass
+
+    async def clear_session_history(self, session_id: str):
         """Clear message history for a specific session"""
-        self.redis.delete(f"messages:session:{session_id}")
+        await self.redis.delete(
+            self._messages_key(session_id),
+            self._context_key(session_id),
+            self._legacy_key(session_id),
+        )
 
-    def clear_wallet_history(self, wallet_address: str):
+    async def clear_wallet_history(self, wallet_address: str):
         """Clear all message history for a wallet"""
-        sessions = self.get_wallet_sessions(wallet_address)
+        sessions = await self.get_wallet_sessions(wallet_address)
         for session_id in sessions:
-            self.clear_session_history(session_id)
-        self.redis.delete(f"wallet:sessions:{wallet_address}")
+            await self.clear_session_history(session_id)
+        await self.redis.delete(f"wallet:sessions:{wallet_address}")
@@ -1,5 +1,8 @@
 import logging
 from concurrent import futures
+from typing import Optional
+from app.core.config import settings
+from app.core.deadline import current_deadline
 from app.models.prompt_analysis import TokenResponse
 from app.services.data_access.data_access_service import DataAccessService
 from app.services.technical_analysis.technical_analysis_service import TechnicalAnalysisService
@@ -13,31 +16,71 @@ class DataProcessingService:
     def fetch_token_data_and_process(self, token_symbol: str):
         metadata = self.data_access_service.fetch_metadata(token_symbol=token_symbol)
         blockchain = self.identify_blockchain(metadata)
-        
-        with futures.ThreadPoolExecutor() as executor:
-            ohlcv_future = executor.submit(
+        degraded = []
+
+        # Not a context manager: on a deadline we return without waiting for
+        # the stragglers, whose HTTP calls are bounded by their own timeouts.
+        executor = futures.ThreadPoolExecutor()
+        try:
+            ohlcv_future = self._submit_optional(
+                executor,
+                "ohlcv",
+                settings.OHLCV_MIN_BUDGET_SECONDS,
+                degraded,
                 self.data_access_service.fetch_ohlcv_data,
                 token_symbol=token_symbol,
-                blockchain=blockchain
+                blockchain=blockchain,
             )
-            sentiment_future = executor.submit(
+            sentiment_future = self._submit_optional(
+                executor,
+                "sentiment",
+                settings.SENTIMENT_MIN_BUDGET_SECONDS,
+                degraded,
                 self.data_access_service.fetch_sentiment_for_token,
-                token_symbol=token_symbol
+                token_symbol=token_symbol,
             )
-            
+
             # Get results
-            ohlcv_data = ohlcv_future.result()
-            sentiments = sentiment_future.result()
-        
+            ohlcv_data = self._optional_result(ohlcv_future, "ohlcv", degraded)
+            sentiments = self._optional_result(sentiment_future, "sentiment", degraded)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
         # Calculate indicators from OHLCV data
         # indicators = self.technical_analysis_service.calculate_indicators(ohlcv_data)
 
         return {
             "metadata": metadata.model_dump() if metadata else None,
-            "indicators": ohlcv_data["indicators"],
-            "sentiments": sentiments
+            "indicators": ohlcv_data["indicators"] if ohlcv_data else None,
+            "sentiments": sentiments,
+            "degraded": degraded,
         }
-    
+
+    def _submit_optional(
+        self, executor, name: str, min_budget: float, degraded: list, fn, **kwargs
+    ) -> Optional[futures.Future]:
+        """Submit an optional fetch unless the request deadline is too close."""
+        deadline = current_deadline()
+        if deadline and not deadline.allows(min_budget):
+            self.logger.info(f"Skipping {name}: {deadline.remaining():.1f}s left")
+            degraded.append(name)
+            return None
+        return executor.submit(fn, **kwargs)
+
+    def _optional_result(
+        self, future: Optional[futures.Future], name: str, degraded: list
+    ):
+        """Wait for an optional fetch for at most the remaining budget."""
+        if future is None:
+            return None
+        deadline = current_deadline()
+        try:
+            return future.result(timeout=deadline.remaining() if deadline else None)
+        except futures.TimeoutError:
+            self.logger.warning(f"{name} fetch ran out of budget")
+            degraded.append(name)
+            return None
+
     @property
     def blockchain_priority(self) -> list:
         """Priority order for blockchains from highest to lowest."""
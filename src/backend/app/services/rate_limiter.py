@@ -1,41 +1,98 @@
-from datetime import datetime
-import redis.asyncio as redis
+import time
+import uuid
+from typing import Dict, Tuple
 from fastapi import HTTPException, status
 from app.core.config import settings
 from app.core.singleton import Singleton
+from app.services.data_access.redis_connection_manager import get_redis
+
+# Sliding-window check in one atomic round trip. Drops entries older than the
+# window and grants up to ARGV[4] requests while the window has room, adding
+# one entry per granted request. Returns the number granted.
+# KEYS[1]: window key; ARGV: now, period, limit, requested, member prefix
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - period)
+local granted = math.min(
+    tonumber(ARGV[4]), tonumber(ARGV[3]) - redis.call('ZCARD', KEYS[1])
+)
+if granted <= 0 then
+    return 0
+end
+for i = 1, granted do
+    redis.call('ZADD', KEYS[1], now, ARGV[5] .. ':' .. i)
+end
+redis.call('EXPIRE', KEYS[1], math.ceil(period))
+return granted
+"""
+
+# Local quota entries kept before expired ones are swept
+MAX_LOCAL_QUOTAS = 10000
 
 
 class RateLimiter(metaclass=Singleton):
+    """Sliding-window rate limits shared by all workers through Redis.
+
+    With ``RATE_LIMIT_LOCAL_CHUNK_SIZE`` set, each worker reserves quota from
+    the shared window in chunks and serves checks from the reservation
+    in-process until it runs out or the window moves on. The global limit
+    still holds because every reserved request occupies a window slot; the
+    trade-off is that unused reservations count until they age out.
+    """
+
     def __init__(self):
-        self.redis = redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            username=settings.REDIS_UNAME,
-            password=settings.REDIS_PWD,
-            decode_responses=True,
-        )
+        self.redis = get_redis()
         self.rate_limits = {
             "auth": {"calls": 5, "period": 60},  # 5 calls per minute
             "api": {"calls": 100, "period": 60},  # 100 calls per minute
         }
+        self.local_chunk_size = settings.RATE_LIMIT_LOCAL_CHUNK_SIZE
+        # key -> (requests left in the reservation, time it expires)
+        self._local_quota: Dict[str, Tuple[int, float]] = {}
+        self._sliding_window_script = self.redis.register_script(SLIDING_WINDOW_SCRIPT)
 
     async def check_rate_limit(self, wallet_address: str, action_type: str):
         """Check if user has exceeded rate limit"""
         key = f"rate_limit:{action_type}:{wallet_address}"
-        current_time = datetime.now().timestamp()
         limit = self.rate_limits[action_type]
+        current_time = time.time()
 
-        # Clean old records
-        await self.redis.zremrangebyscore(key, 0, current_time - limit["period"])
+        # Small limits are not worth chunking: a reservation would starve
+        # other workers of most of the window
+        chunk_size = min(self.local_chunk_size, limit["calls"] // 10)
+        if chunk_size > 1:
+            remaining, expires_at = self._local_quota.get(key, (0, 0.0))
+            if remaining > 0 and current_time < expires_at:
+                self._local_quota[key] = (remaining - 1, expires_at)
+                return
+        else:
+            chunk_size = 1
 
-        # Check current count
-        count = await self.redis.zcard(key)
-        if count >= limit["calls"]:
+        granted = await self._sliding_window_script(
+            keys=[key],
+            args=[
+                current_time,
+                limit["period"],
+                limit["calls"],
+                chunk_size,
+                uuid.uuid4().hex,
+            ],
+        )
+        if not granted:
+            self._local_quota.pop(key, None)
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Rate limit exceeded",
             )
 
-        # Add new request
-        await self.redis.zadd(key, {str(current_time): current_time})
-        await self.redis.expire(key, limit["period"])
+        if chunk_size > 1:
+            self._store_local_quota(key, granted - 1, current_time + limit["period"])
+
+    def _store_local_quota(self, key: str, remaining: int, expires_at: float) -> None:
+        if len(self._local_quota) >= MAX_LOCAL_QUOTAS:
+            now = time.time()
+            self._local_quota = {
+                k: v for k, v in self._local_quota.items() if v[1] > now and v[0] > 0
+            }
+        self._local_quota[key] = (remaining, expires_at)
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -5,11 +6,15 @@ from typing import Dict, List
 from dotenv import load_dotenv
 
 from app.api.client.openai.openai_api_client import OpenAiAPIClient
-from openai.types.responses import Response
+from openai.types.responses import ResponseFunctionToolCall
 from app.services.data_access.data_access_service import DataAccessService
 from app.services.processing.data_processing_service import DataProcessingService
 from app.services.technical_analysis.technical_analysis_service import TechnicalAnalysisService
-from app.services.reasoning.constants import ASSETS, FUNCTION_CALL_TYPE
+from app.services.reasoning.constants import (
+    FUNCTION_CALL_OUTPUT,
+    FUNCTION_CALL_TYPE,
+    MAX_TOOL_ITERATIONS,
+)
 from app.services.reasoning.tools_service import ToolsService
 load_dotenv()
 
@@ -22,17 +27,69 @@ class AgentResponseService:
         self.tools_service = ToolsService()
         self.logger = logging.getLogger(__name__)
     
-    def respond(self, messages: List):
-        tool_response = self.client.generate_tool_response(messages=messages)
-        return self.process_tools(tool_response, messages)
+    async def respond(self, messages: List):
+        """Run the tool-calling loop for a conversation.
 
-    def process_tools(self, tool_response: Response, messages: List):
-        result = None
-        final_response = None
-        for response_output_item in tool_response.output:
-            result = self.tools_service.process_tools(response_output_item, messages)
-        final_response = self.client.generate_response(messages)
-        return final_response, messages, result
-                
+        Every function call requested in one model turn is executed
+        concurrently, then a single follow-up generation sees all results,
+        along with the other items (messages, reasoning) of that turn.
+        After ``MAX_TOOL_ITERATIONS`` tool turns a final answer is forced.
 
-    
+        Returns:
+            The final model response, the extended messages and the last
+            asset data returned by a tool (if any)
+        """
+        asset_data = None
+        response = await asyncio.to_thread(
+            self.client.generate_tool_response, messages=messages
+        )
+        for _ in range(MAX_TOOL_ITERATIONS):
+            function_calls = [
+                item for item in response.output if item.type == FUNCTION_CALL_TYPE
+            ]
+            if not function_calls:
+                return response, messages, asset_data
+            messages.extend(
+                item for item in response.output if item.type != FUNCTION_CALL_TYPE
+            )
+            results = await self.process_tools(function_calls, messages)
+            asset_data = next(
+                (result for result in reversed(results) if result is not None),
+                asset_data,
+            )
+            response = await asyncio.to_thread(
+                self.client.generate_tool_response, messages=messages
+            )
+        self.logger.warning("Tool iteration limit reached, forcing a final answer")
+        response = await asyncio.to_thread(
+            self.client.generate_response, messages, tool_choice="none"
+        )
+        return response, messages, asset_data
+
+    async def process_tools(
+        self, function_calls: List[ResponseFunctionToolCall], messages: List
+    ) -> List:
+        """Execute function calls concurrently and append their outputs in order."""
+        results = await asyncio.gather(
+            *(
+                asyncio.to_thread(self.tools_service.run_tool, function_call)
+                for function_call in function_calls
+            ),
+            return_exceptions=True,
+        )
+        for function_call, result in zip(function_calls, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Error processing tool {function_call.name}: {result}")
+                output = {"error": str(result)}
+                result = None
+            else:
+                output = result
+            messages.append(function_call)
+            messages.append(
+                {
+                    "type": FUNCTION_CALL_OUTPUT,
+                    "call_id": function_call.call_id,
+                    "output": json.dumps(output),
+                }
+            )
+        return [None if isinstance(r, Exception) else r for r in results]
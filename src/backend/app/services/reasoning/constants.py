@@ -6,4 +6,8 @@ Constants for the reasoning service.
 FUNCTION_CALL_TYPE = 'function_call' 
 ASSETS = 'assets'
 WEB_SEARCH_CALL = 'web_search_call'
-MESSAGE = 'message'
\ No newline at end of file
+MESSAGE = 'message'
+FUNCTION_CALL_OUTPUT = 'function_call_output'
+
+# Upper bound on model turns that may request tools before a final answer is forced
+MAX_TOOL_ITERATIONS = 3
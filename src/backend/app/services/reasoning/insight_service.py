@@ -4,6 +4,8 @@ from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 from app.api.client.openai.openai_api_client import OpenAiAPIClient
 from app.api.client.cryptopanic.cryptopanic_client import CryptoPanicClient
+from app.core.config import settings
+from app.lib.tokens import fit_messages_to_budget
 from app.models.prompt_analysis import ProcessedPrompt
 from app.models.response import ResponseType
 from app.services.message_service import MessageService
@@ -21,7 +23,7 @@ class InsightService:
         self.cryptopanic_client = CryptoPanicClient()
         self.logger = logging.getLogger(__name__)
 
-    def generate(
+    async def generate(
         self,
         response_data: Dict,
         user_prompt: str,
@@ -31,15 +33,15 @@ class InsightService:
         try:
             self.logger.info(f"Generating insight for prompt: {user_prompt[:50]}...")
             # Save user message with metadata
-            self._save_user_message(
+            await self._save_user_message(
                 wallet_address, session_id, user_prompt, response_data
             )
 
             # Get conversation history and context
             conversation_history = []
             if session_id:
-                conversation_history = self.message_service.format_for_chatgpt(session_id)
-                session_context = self.message_service.get_session_context(session_id)
+                conversation_history = await self.message_service.format_for_chatgpt(session_id)
+                session_context = await self.message_service.get_session_context(session_id)
                 self.logger.debug(f"Retrieved {len(conversation_history)} messages from history")
             else:
                 session_context = {}
@@ -60,7 +62,7 @@ class InsightService:
             )
 
             # Save assistant message
-            self._save_assistant_message(wallet_address, session_id, insight.content)
+            await self._save_assistant_message(wallet_address, session_id, insight.content)
             self.logger.info("Successfully generated and saved insight")
             return insight
         except Exception as e:
@@ -128,7 +130,7 @@ class InsightService:
     def _add_context_to_prompt(self, base_prompt: str, messages: list) -> str:
         """Add conversation history to the prompt"""
         context = "\n\nPrevious conversation:\n"
-        for msg in messages[-5:]:  # Use last 5 messages for context
+        for msg in fit_messages_to_budget(messages, settings.HISTORY_WINDOW_TOKEN_BUDGET):
             context += f"{msg['role'].title()}: {msg['content']}\n"
 
         return f"{context}\nNow, based on this context and the current query:\n{base_prompt}"
@@ -291,13 +293,13 @@ class InsightService:
         Please rephrase your query to focus on one of these aspects.
         """
 
-    def _save_user_message(
+    async def _save_user_message(
         self, wallet_address: str, session_id: str, content: str, metadata: Dict = {}
     ):
         try:
             if wallet_address and session_id:
                 self.logger.debug(f"Saving user message for session {session_id}")
-                self.message_service.save_message(
+                await self.message_service.save_message(
                     wallet_address=wallet_address,
                     session_id=session_id,
                     content=content,
@@ -311,13 +313,13 @@ class InsightService:
             self.logger.error(f"Error saving user message: {str(e)}", exc_info=True)
             raise
 
-    def _save_assistant_message(
+    async def _save_assistant_message(
         self, wallet_address: str, session_id: str, content: str
     ):
         try:
             if wallet_address and session_id:
                 self.logger.debug(f"Saving assistant message for session {session_id}")
-                self.message_service.save_message(
+                await self.message_service.save_message(
                     wallet_address=wallet_address,
                     session_id=session_id,
                     content=content,
@@ -337,12 +339,12 @@ class InsightService:
         except Exception as e:
             return self._generate_error_prompt(str(e))
 
-    def generate_for_processed_prompt(
+    async def generate_for_processed_prompt(
         self, processed_prompt: ProcessedPrompt, session_id: str, auth_data: Dict = {}
     ):
         try:
             self.logger.info(f"Processing prompt for session {session_id}")
-            past_messages = self.message_service.get_session_history(session_id=session_id)
+            past_messages = await self.message_service.get_session_history(session_id=session_id)
             self.logger.debug(f"Retrieved {len(past_messages)} messages from history")
 
             metadata = processed_prompt.metadata
@@ -522,7 +524,7 @@ Note: This analysis is based on 7 days of historical data and should be verified
             )
             
             self.logger.debug("Saving assistant message")
-            self._save_assistant_message(
+            await self._save_assistant_message(
                 auth_data.get("wallet_address"),
                 session_id=session_id,
                 content=insight.content,
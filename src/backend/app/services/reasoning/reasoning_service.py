@@ -33,8 +33,8 @@ class ReasoningService:
     async def analyze(self, prompt: str, session_id: str) -> PromptAnalysis:
         try:
             # Get current session context and history
-            session_context = self.message_service.get_session_context(session_id)
-            session_history = self.message_service.get_session_history(session_id)
+            session_context = await self.message_service.get_session_context(session_id)
+            session_history = await self.message_service.get_session_history(session_id)
             
             # Extract contract address and chain from prompt
             contract_address, chain = extract_contract_address(prompt)
@@ -76,7 +76,7 @@ class ReasoningService:
                 )
 
             # Save message with metadata
-            self.message_service.save_message(
+            await self.message_service.save_message(
                 wallet_address="unknown",  # Use real wallet if available
                 session_id=session_id,
                 content=prompt,
@@ -1,8 +1,10 @@
+import contextvars
 import json
 import logging
+from concurrent import futures
 from typing import List
 from app.services.processing.data_processing_service import DataProcessingService
-from app.services.reasoning.constants import ASSETS, FUNCTION_CALL_TYPE, MESSAGE, WEB_SEARCH_CALL
+from app.services.reasoning.constants import ASSETS
 
 from openai.types.responses import ResponseOutputItem
 
@@ -17,33 +19,14 @@ class ToolsService:
                 "fetch_latest_tokens": self.get_latest_tokens
             }
     
-    def process_tools(self, tool_response_output_item: ResponseOutputItem, messages: List):
-        result = None
-        if tool_response_output_item.type == FUNCTION_CALL_TYPE:
-            tool_method = self.__get_tools()[tool_response_output_item.name]
-            try:    
-                arguments = json.loads(tool_response_output_item.arguments)
-                if not arguments or ASSETS not in arguments:
-                    result = tool_method()
-                else:
-                    result = tool_method(arguments[ASSETS])
-                messages.append(tool_response_output_item)
-                messages.append({           
-                    "type": "function_call_output",
-                    "call_id": tool_response_output_item.call_id,
-                    "output": json.dumps(result)
-                })
-            except Exception as e:
-                self.logger.error(f"Error processing tool {tool_response_output_item.name}: {e}")
-                return None
-        elif tool_response_output_item.type == MESSAGE:
-            messages.append({
-                "role": 'assistant',
-                "content": tool_response_output_item.content[0].text
-            })
-            # result = tool_response_output_item.content[0].text
-        return result
-    
+    def run_tool(self, tool_response_output_item: ResponseOutputItem):
+        """Execute a single function call and return its raw result."""
+        tool_method = self.__get_tools()[tool_response_output_item.name]
+        arguments = json.loads(tool_response_output_item.arguments)
+        if not arguments or ASSETS not in arguments:
+            return tool_method()
+        return tool_method(arguments[ASSETS])
+
     def get_latest_tokens(self):
         return self.data_processing_service.fetch_latest_tokens()
 
@@ -69,4 +52,12 @@ class ToolsService:
                 self.logger.error(f"Error fetching data for {asset}: {e}")
                 return {"asset": asset, "data": default_response}
 
-        return [get_single_token_data(asset) for asset in assets]
\ No newline at end of file
+        # Each asset is independent, so fetch them side by side. Worker threads
+        # get a copy of the caller's context to keep the request deadline.
+        context = contextvars.copy_context()
+
+        def get_single_token_data_in_context(asset):
+            return context.copy().run(get_single_token_data, asset)
+
+        with futures.ThreadPoolExecutor(max_workers=len(assets)) as executor:
+            return list(executor.map(get_single_token_data_in_context, assets))
\ No newline at end of file
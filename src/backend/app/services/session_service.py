@@ -1,23 +1,54 @@
 from datetime import datetime, timedelta
 import logging
-from typing import Optional, Dict, Any
-import json
+import time
+from typing import Optional, Dict, Any, List
 import redis.asyncio as redis
 
 from app.core.config import settings
 from app.core.singleton import Singleton
+from app.lib.codec import decode_record, encode_record
+from app.services.cache_invalidation_bus import CacheInvalidationBus
+from app.services.data_access.redis_connection_manager import get_redis
 
 
 class SessionService(metaclass=Singleton):
+    """Stores wallet sessions in Redis.
+
+    Each wallet's sessions are indexed in a sorted set scored by expiry time,
+    so expired entries are pruned by score instead of accumulating, and
+    session data is read back with a single MGET.
+
+    Validated sessions are cached in-process and ``last_active`` is written
+    at most once per ``SESSION_ACTIVITY_DEBOUNCE_SECONDS``, so most
+    authenticated requests do not touch Redis. Invalidating a session evicts
+    it from every worker's cache through the ``CacheInvalidationBus``; while
+    the bus is not listening, cached sessions expire after
+    ``SESSION_CACHE_TTL_SECONDS``.
+    """
+
+    # Cached entries kept before expired ones are swept
+    MAX_CACHED_SESSIONS = 10000
+
     def __init__(self):
-        self.redis = redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            username=settings.REDIS_UNAME,
-            password=settings.REDIS_PWD,
-            decode_responses=True,
-        )
+        self.redis = get_redis()
+        # Session records are stored encoded, so they are read back as bytes
+        self.binary_redis = get_redis(decode_responses=False)
         self.session_expire_days = 7
+        self.activity_debounce = settings.SESSION_ACTIVITY_DEBOUNCE_SECONDS
+        self.invalidation_bus = CacheInvalidationBus()
+        self._cache = self.invalidation_bus.cache(
+            "sessions",
+            fallback_ttl=settings.SESSION_CACHE_TTL_SECONDS,
+            max_entries=self.MAX_CACHED_SESSIONS,
+        )
+        # session_id -> monotonic time last_active was last written
+        self._last_activity_write: Dict[str, float] = {}
+
+    def _index_key(self, wallet_address: str) -> str:
+        return f"sessions:{wallet_address}"
+
+    def _expires_at(self) -> float:
+        return time.time() + timedelta(days=self.session_expire_days).total_seconds()
 
     async def create_session(
         self, user_wallet: str, token: str, device_info: Dict[str, Any]
@@ -28,12 +59,18 @@ class SessionService(metaclass=Singleton):
 
             session_data = self._build_session_data(user_wallet, token, device_info)
 
-            async with self.redis.pipeline() as pipe:
-                await pipe.setex(
+            index_key = self._index_key(user_wallet)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.setex(
                     session_id,
                     timedelta(days=self.session_expire_days),
-                    json.dumps(session_data),
-                ).sadd(user_wallet, session_id).execute()
+                    encode_record(session_data),
+                )
+                pipe.zadd(index_key, {session_id: self._expires_at()})
+                pipe.zremrangebyscore(index_key, "-inf", time.time())
+                # The index outlives its sessions by at most one lifetime
+                pipe.expire(index_key, timedelta(days=self.session_expire_days))
+                await pipe.execute()
 
             return session_id
         except redis.RedisError as e:
@@ -42,40 +79,144 @@ class SessionService(metaclass=Singleton):
 
     async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session data by session ID"""
-        session_data = await self.redis.get(session_id)
+        session_data = await self.binary_redis.get(session_id)
         if not session_data:
             return None
-        return json.loads(session_data)
+        return decode_record(session_data)
+
+    async def get_cached_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session data, served from the in-process cache while fresh"""
+        cached = self._cache.get(session_id)
+        if cached is not None:
+            return cached
 
-    async def update_session_activity(self, session_id: str):
-        """Update last active timestamp of session"""
+        version = self._cache.version()
         session_data = await self.get_session(session_id)
         if session_data:
-            session_data["last_active"] = datetime.now().isoformat()
-            await self.redis.setex(
-                session_id,
-                timedelta(days=self.session_expire_days),
-                json.dumps(session_data),
-            )
+            self._cache.set(session_id, session_data, version)
+        return session_data
+
+    async def record_activity(
+        self, session_id: str, session_data: Optional[Dict[str, Any]] = None
+    ):
+        """Update ``last_active``, at most once per debounce interval"""
+        now = time.monotonic()
+        if now - self._last_activity_write.get(session_id, float("-inf")) < self.activity_debounce:
+            return
+        if len(self._last_activity_write) >= self.MAX_CACHED_SESSIONS:
+            self._last_activity_write = {
+                k: v
+                for k, v in self._last_activity_write.items()
+                if now - v < self.activity_debounce
+            }
+        self._last_activity_write[session_id] = now
+        await self.update_session_activity(session_id, session_data)
+
+    async def update_session_activity(
+        self, session_id: str, session_data: Optional[Dict[str, Any]] = None
+    ):
+        """Update last active timestamp of session.
+
+        Args:
+            session_id: The session ID
+            session_data: Current session data, if already loaded
+        """
+        if session_data is None:
+            session_data = await self.get_session(session_id)
+        if session_data:
+            session_data = {**session_data, "last_active": datetime.now().isoformat()}
+            index_key = self._index_key(session_data["wallet_address"])
+            async with self.redis.pipeline(transaction=True) as pipe:
+                # XX so a session invalidated meanwhile is not resurrected
+                pipe.set(
+                    session_id,
+                    encode_record(session_data),
+                    ex=timedelta(days=self.session_expire_days),
+                    xx=True,
+                )
+                pipe.zadd(index_key, {session_id: self._expires_at()}, xx=True)
+                pipe.expire(index_key, timedelta(days=self.session_expire_days))
+                stored, _, _ = await pipe.execute()
+            if stored:
+                self._cache.replace(session_id, session_data)
+
+    async def _evict(self, *session_ids: str) -> None:
+        for session_id in session_ids:
+            self._last_activity_write.pop(session_id, None)
+        await self.invalidation_bus.invalidate("sessions", *session_ids)
 
     async def invalidate_session(self, session_id: str):
         """Invalidate a specific session"""
         session_data = await self.get_session(session_id)
         if session_data:
             wallet_address = session_data["wallet_address"]
-            await self.redis.srem(wallet_address, session_id)
-            await self.redis.delete(session_id)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(self._index_key(wallet_address), session_id)
+                pipe.delete(session_id)
+                await pipe.execute()
+        await self._evict(session_id)
+
+    async def invalidate_user_sessions(self, wallet_address: str) -> int:
+        """Invalidate every session of a user.
+
+        Returns:
+            Number of live sessions removed
+        """
+        session_ids = await self._get_live_session_ids(wallet_address)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if session_ids:
+                pipe.delete(*session_ids)
+            pipe.delete(self._index_key(wallet_address))
+            results = await pipe.execute()
+        await self._evict(*session_ids)
+        return results[0] if session_ids else 0
+
+    async def get_user_sessions(self, wallet_address: str) -> List[Dict[str, Any]]:
+        """Get all active sessions for a user, including their ``session_id``"""
+        session_ids = await self._get_live_session_ids(wallet_address)
+        if not session_ids:
+            return []
 
-    async def get_user_sessions(self, wallet_address: str) -> list:
-        """Get all active sessions for a user"""
-        session_ids = await self.redis.smembers(wallet_address)
         sessions = []
-        for session_id in session_ids:
-            session_data = await self.get_session(session_id)
+        dead_ids = []
+        for session_id, session_data in zip(
+            session_ids, await self.binary_redis.mget(session_ids)
+        ):
             if session_data:
-                sessions.append(session_data)
+                sessions.append({**decode_record(session_data), "session_id": session_id})
+            else:
+                dead_ids.append(session_id)
+
+        if dead_ids:
+            # Deleted without going through invalidate_session
+            await self.redis.zrem(self._index_key(wallet_address), *dead_ids)
         return sessions
 
+    async def _get_live_session_ids(self, wallet_address: str) -> List[str]:
+        """Prune expired index entries and return the remaining session IDs.
+
+        Sessions indexed in the legacy per-wallet set are moved to the sorted
+        set on first read.
+        """
+        index_key = self._index_key(wallet_address)
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(index_key, "-inf", now)
+            pipe.zrangebyscore(index_key, now, "+inf")
+            pipe.smembers(wallet_address)
+            _, session_ids, legacy_ids = await pipe.execute()
+
+        if legacy_ids:
+            # Their expiry is unknown; the MGET in get_user_sessions drops
+            # entries whose session has already expired
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zadd(index_key, {sid: self._expires_at() for sid in legacy_ids}, nx=True)
+                pipe.expire(index_key, timedelta(days=self.session_expire_days))
+                pipe.delete(wallet_address)
+                await pipe.execute()
+            session_ids = list(dict.fromkeys([*session_ids, *legacy_ids]))
+        return session_ids
+
     def _build_session_data(
         self, user_wallet: str, token: str, device_info: Dict[str, Any]
     ) -> Dict:
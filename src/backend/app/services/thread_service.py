@@ -1,11 +1,161 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
 import json
+import logging
+import time
 import uuid
-from datetime import datetime
-import redis
+from datetime import datetime, timezone
+from redis.exceptions import WatchError
 from app.config.agent_lore import SYSTEM_PROMPT
 from app.core.config import settings
 from app.core.singleton import Singleton
+from app.lib.codec import decode_record, encode_record
+from app.services.data_access.redis_connection_manager import get_redis
+from app.services.data_access.thread_archive_store import ThreadArchiveStore
+
+# All threads ordered by last activity (updated_at, or the time an archived
+# thread was read back), used to find idle threads to archive
+ACTIVITY_INDEX_KEY = "threads:by_updated"
+
+# Message content fields holding large values that repeat across turns (the
+# token metadata of a DexxResponse). They are stored once per distinct value
+# under its content hash and referenced from messages by that hash.
+SNAPSHOT_FIELDS = ("metadata",)
+
+# Number of live threads referencing each snapshot key. Each thread lists the
+# snapshots it references in thread:{id}:snapshots; a snapshot is deleted
+# when the last thread referencing it is deleted or archived.
+SNAPSHOT_REFS_KEY = "snapshots:refs"
+
+# Lua releasing the snapshots referenced by the thread hash KEYS[1]
+RELEASE_SNAPSHOTS = """
+for _, snapshot in ipairs(redis.call('SMEMBERS', KEYS[1] .. ':snapshots')) do
+    if redis.call('HINCRBY', 'snapshots:refs', snapshot, -1) <= 0 then
+        redis.call('HDEL', 'snapshots:refs', snapshot)
+        redis.call('DEL', snapshot)
+    end
+end
+redis.call('DEL', KEYS[1] .. ':snapshots')
+"""
+
+# Creates a thread, its initial message and its index entries, unless the
+# thread exists already, so replaying it is harmless. KEYS[1] is the thread
+# hash; ARGV is the thread ID, user ID, created_at, its score, the title and
+# the encoded initial message ('' for none). Returns 0 if the thread exists.
+CREATE_THREAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+local message_count = 0
+if ARGV[6] ~= '' then
+    redis.call('RPUSH', KEYS[1] .. ':messages', ARGV[6])
+    message_count = 1
+end
+redis.call('HSET', KEYS[1], 'id', ARGV[1], 'user_id', ARGV[2], 'created_at', ARGV[3],
+    'updated_at', ARGV[3], 'title', ARGV[5], 'message_count', message_count)
+redis.call('SADD', 'user:' .. ARGV[2] .. ':threads', ARGV[1])
+redis.call('ZADD', 'user:' .. ARGV[2] .. ':threads:by_updated', ARGV[4], ARGV[1])
+redis.call('ZADD', 'threads:by_updated', ARGV[4], ARGV[1])
+return 1
+"""
+
+# Appends a message, updates thread metadata and moves the thread to the top
+# of its owner's updated_at index in one round trip. KEYS[1] is the thread
+# hash; ARGV is the thread ID, encoded message, updated_at, its score, the
+# message ID and how long to remember it. Any further KEYS are snapshots the
+# message references, written from ARGV[7] onwards and counted as referenced
+# by the thread.
+# Returns 0 without writing if the thread's history is archived. A message
+# ID seen before is not appended again, so retried writes are idempotent;
+# pass '' for messages that are never retried. Seen IDs are kept in the
+# thread's :applied set, which expires once the thread's appends stop.
+ADD_MESSAGE_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'archived') == '1' then
+    return 0
+end
+if ARGV[5] ~= '' then
+    if redis.call('SADD', KEYS[1] .. ':applied', ARGV[5]) == 0 then
+        return 1
+    end
+    redis.call('EXPIRE', KEYS[1] .. ':applied', ARGV[6])
+end
+for i = 2, #KEYS do
+    redis.call('SET', KEYS[i], ARGV[i + 5])
+    if redis.call('SADD', KEYS[1] .. ':snapshots', KEYS[i]) == 1 then
+        redis.call('HINCRBY', 'snapshots:refs', KEYS[i], 1)
+    end
+end
+redis.call('RPUSH', KEYS[1] .. ':messages', ARGV[2])
+redis.call('HINCRBY', KEYS[1], 'message_count', 1)
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[3])
+redis.call('ZADD', 'threads:by_updated', ARGV[4], ARGV[1])
+local user_id = redis.call('HGET', KEYS[1], 'user_id')
+if user_id then
+    redis.call('ZADD', 'user:' .. user_id .. ':threads:by_updated', ARGV[4], ARGV[1])
+end
+return 1
+"""
+
+# Removes a thread, its messages and summary, and unlinks it from its owner in
+# one round trip, deleting snapshots no other thread references. KEYS[1] is
+# the thread hash; the other keys derive from it. Returns 0 if not found, 2 if
+# its history was archived and 1 otherwise.
+DELETE_THREAD_SCRIPT = (
+    """
+local user_id = redis.call('HGET', KEYS[1], 'user_id')
+if not user_id then
+    return 0
+end
+"""
+    + RELEASE_SNAPSHOTS
+    + """
+local archived = redis.call('HGET', KEYS[1], 'archived') == '1'
+redis.call('SREM', 'user:' .. user_id .. ':threads', ARGV[1])
+redis.call('ZREM', 'user:' .. user_id .. ':threads:by_updated', ARGV[1])
+redis.call('ZREM', 'threads:by_updated', ARGV[1])
+redis.call('DEL', KEYS[1], KEYS[1] .. ':messages', KEYS[1] .. ':summary', KEYS[1] .. ':applied')
+if archived then
+    return 2
+end
+return 1
+"""
+)
+
+# Drops an archived thread's history from Redis, keeping its metadata hash
+# flagged as archived, and releases its snapshots (the archive has copies).
+# Skipped if the thread changed since it was copied. KEYS[1] is the thread
+# hash; ARGV is the thread ID and the copied updated_at.
+EVICT_THREAD_SCRIPT = (
+    """
+if redis.call('HGET', KEYS[1], 'updated_at') ~= ARGV[2] then
+    return 0
+end
+"""
+    + RELEASE_SNAPSHOTS
+    + """
+redis.call('DEL', KEYS[1] .. ':messages', KEYS[1] .. ':summary')
+redis.call('HSET', KEYS[1], 'archived', '1')
+redis.call('ZREM', 'threads:by_updated', ARGV[1])
+return 1
+"""
+)
+
+# Messages per RPUSH when restoring an archived thread
+REHYDRATE_CHUNK_SIZE = 500
+
+
+def _snapshot_key(digest: str) -> str:
+    return f"snapshot:{digest}"
+
+
+def _utc_now() -> str:
+    """Current time in the naive UTC ISO format stored in threads."""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _updated_score(timestamp: str) -> float:
+    """Sort score for an ``updated_at`` value (naive UTC ISO format)."""
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
 
 
 class ThreadService(metaclass=Singleton):
@@ -15,19 +165,44 @@ class ThreadService(metaclass=Singleton):
     - Creating and managing chat threads per user
     - Storing and retrieving chat messages
     - Managing thread metadata (title, creation time, etc.)
+
+    Each write is a single MULTI/EXEC pipeline or Lua script, so a logical
+    thread operation costs one atomic round trip.
+
+    Threads idle for ``THREAD_ARCHIVE_IDLE_SECONDS`` have their messages and
+    summary moved to Postgres by ``archive_idle_threads``; the small metadata
+    hash stays in Redis (flagged ``archived``) so listings are unaffected.
+    Reading or appending to an archived thread restores it first.
+
+    Values of ``SNAPSHOT_FIELDS`` in message content are stored once under
+    ``snapshot:{sha256}`` and resolved when messages are read, so repeated
+    token metadata costs one copy however often it appears. Snapshots are
+    shared between threads and kept while a live thread references them;
+    archived threads carry copies of theirs.
     """
 
     def __init__(self):
         """Initialize Redis connection."""
-        self.redis = redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            username=settings.REDIS_UNAME,
-            password=settings.REDIS_PWD,
-            decode_responses=True,
-        )
-
-    def create_thread(self, user_id: str, initial_message: Optional[str] = None) -> str:
+        self.redis = get_redis()
+        # Messages are stored encoded, so they are read back as bytes
+        self.binary_redis = get_redis(decode_responses=False)
+        self._create_thread_script = self.redis.register_script(CREATE_THREAD_SCRIPT)
+        self._add_message_script = self.redis.register_script(ADD_MESSAGE_SCRIPT)
+        self._delete_thread_script = self.redis.register_script(DELETE_THREAD_SCRIPT)
+        self._evict_thread_script = self.redis.register_script(EVICT_THREAD_SCRIPT)
+        self.archive_store = ThreadArchiveStore()
+        self.logger = logging.getLogger(__name__)
+
+    def _threads_index_key(self, user_id: str) -> str:
+        # User's threads ordered by updated_at; the plain set is kept for
+        # compatibility and to backfill the index
+        return f"user:{user_id}:threads:by_updated"
+
+    def _threads_indexed_key(self, user_id: str) -> str:
+        # Set once the user's threads from before the index have been added
+        return f"user:{user_id}:threads:indexed"
+
+    async def create_thread(self, user_id: str, initial_message: Optional[str] = None) -> str:
         """Create a new thread for a user.
 
         Args:
@@ -38,28 +213,30 @@ class ThreadService(metaclass=Singleton):
             The newly created thread ID
         """
         thread_id = str(uuid.uuid4())
-        thread_data = {
-            "id": thread_id,
-            "user_id": user_id,
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat(),
-            "title": initial_message[:50] + "..." if initial_message else "New Chat",
-            "message_count": 0,
-        }
-
-        # Store thread metadata
-        self.redis.hset(f"thread:{thread_id}", mapping=thread_data)
-
-        # Add thread to user's thread list
-        self.redis.sadd(f"user:{user_id}:threads", thread_id)
+        await self.queue_create_thread(self.redis, thread_id, user_id, initial_message)
+        return thread_id
 
-        # Store initial message if provided
-        if initial_message:
-            self.add_message(thread_id, "user", initial_message)
+    def queue_create_thread(
+        self, client, thread_id: str, user_id: str, initial_message: Optional[str] = None
+    ):
+        """Run (or, given a pipeline, queue) the script creating a thread.
 
-        return thread_id
+        Does nothing if the thread already exists, so it is safe to retry.
+        """
+        now = _utc_now()
+        title = initial_message[:50] + "..." if initial_message else "New Chat"
+        message = (
+            self._encode_message(thread_id, "user", initial_message, now)
+            if initial_message
+            else b""
+        )
+        return self._create_thread_script(
+            keys=[f"thread:{thread_id}"],
+            args=[thread_id, user_id, now, _updated_score(now), title, message],
+            client=client,
+        )
 
-    def add_message(self, thread_id: str, role: str, content: str) -> None:
+    async def add_message(self, thread_id: str, role: str, content: str) -> None:
         """Add a message to a thread.
 
         Args:
@@ -67,63 +244,324 @@ class ThreadService(metaclass=Singleton):
             role: The role of the message sender ('user' or 'assistant')
             content: The message content
         """
+        while not await self.queue_add_message(self.redis, thread_id, role, content):
+            # Restore the archived history first so the message lands after it
+            await self._rehydrate(thread_id)
+
+    def queue_add_message(
+        self,
+        client,
+        thread_id: str,
+        role: str,
+        content: str,
+        message_id: Optional[str] = None,
+    ):
+        """Run (or, given a pipeline, queue) the script appending a message.
+
+        The script result is 0 if the thread is archived and nothing was
+        written; callers queuing on a pipeline should then fall back to
+        ``add_message``, which restores the thread first.
+
+        Given a ``message_id``, the message is appended at most once however
+        often the write is retried (within ``WRITE_BEHIND_DEDUPE_TTL_SECONDS``
+        of the thread's last append).
+        """
+        now = _utc_now()
+        content, refs, snapshots = self._extract_snapshots(content)
+        return self._add_message_script(
+            keys=[f"thread:{thread_id}", *map(_snapshot_key, snapshots)],
+            args=[
+                thread_id,
+                self._encode_message(thread_id, role, content, now, refs, message_id),
+                now,
+                _updated_score(now),
+                message_id or "",
+                settings.WRITE_BEHIND_DEDUPE_TTL_SECONDS,
+                *snapshots.values(),
+            ],
+            client=client,
+        )
+
+    def _extract_snapshots(self, content: Any) -> Tuple[Any, Dict[str, str], Dict[str, bytes]]:
+        """Move ``SNAPSHOT_FIELDS`` values out of a message's content.
+
+        Returns:
+            The content with those fields set to None, the content hash of
+            each moved field, and the encoded value for each hash
+        """
+        if not isinstance(content, dict):
+            return content, {}, {}
+        refs = {}
+        snapshots = {}
+        for field in SNAPSHOT_FIELDS:
+            value = content.get(field)
+            if not value:
+                continue
+            canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+            digest = hashlib.sha256(canonical.encode()).hexdigest()
+            refs[field] = digest
+            snapshots[digest] = encode_record(value)
+            content = {**content, field: None}
+        return content, refs, snapshots
+
+    async def _resolve_snapshots(self, messages: List[Dict]) -> None:
+        """Put snapshot values back into decoded messages, in place."""
+        digests = list(
+            {digest for message in messages for digest in message.get("snapshots", {}).values()}
+        )
+        values = {}
+        if digests:
+            async with self.binary_redis.pipeline(transaction=False) as pipe:
+                for digest in digests:
+                    pipe.get(_snapshot_key(digest))
+                results = await pipe.execute()
+            values = {
+                digest: decode_record(raw)
+                for digest, raw in zip(digests, results)
+                if raw is not None
+            }
+            if len(values) < len(digests):
+                self.logger.warning(f"{len(digests) - len(values)} message snapshots missing")
+
+        for message in messages:
+            for field, digest in message.pop("snapshots", {}).items():
+                message["content"][field] = values.get(digest)
+
+    def _encode_message(
+        self,
+        thread_id: str,
+        role: str,
+        content: Any,
+        timestamp: str,
+        snapshot_refs: Optional[Dict[str, str]] = None,
+        message_id: Optional[str] = None,
+    ) -> bytes:
+        # thread_id is implied by the list the message lives in, and the ID is
+        # stored as raw UUID bytes; _decode_message restores both
         message = {
-            "id": str(uuid.uuid4()),
-            "thread_id": thread_id,
+            "id": (uuid.UUID(message_id) if message_id else uuid.uuid4()).bytes,
             "role": role,
             "content": content,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp,
         }
+        if snapshot_refs:
+            message["snapshots"] = snapshot_refs
+        return encode_record(message)
 
-        # Store message
-        self.redis.rpush(f"thread:{thread_id}:messages", json.dumps(message))
+    def _decode_message(self, thread_id: str, raw: bytes) -> Dict:
+        message = decode_record(raw)
+        if isinstance(message.get("id"), bytes):
+            message["id"] = str(uuid.UUID(bytes=message["id"]))
+        message.setdefault("thread_id", thread_id)
+        return message
 
-        # Update thread metadata
-        self.redis.hincrby(f"thread:{thread_id}", "message_count", 1)
-        self.redis.hset(
-            f"thread:{thread_id}", "updated_at", datetime.utcnow().isoformat()
-        )
+    def _decode_hash(self, data: Dict[bytes, bytes]) -> Dict[str, str]:
+        return {key.decode(): value.decode() for key, value in data.items()}
 
-    def get_thread(self, thread_id: str) -> Optional[Dict]:
+    async def get_thread(self, thread_id: str, start: int = 0) -> Optional[Dict]:
         """Get thread metadata and messages.
 
         Args:
             thread_id: The thread ID
+            start: Position of the first message to read; earlier messages
+                are neither read nor decoded
 
         Returns:
             Dictionary containing thread metadata and messages, or None if not found
         """
-        # Get thread metadata
-        thread_data = self.redis.hgetall(f"thread:{thread_id}")
+        # Get thread metadata and messages together
+        async with self.binary_redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(f"thread:{thread_id}")
+            pipe.lrange(f"thread:{thread_id}:messages", start, -1)
+            thread_data, messages = await pipe.execute()
         if not thread_data:
             return None
 
-        # Get messages
-        messages = self.redis.lrange(f"thread:{thread_id}:messages", 0, -1)
-        thread_data["messages"] = [json.loads(msg) for msg in messages]
+        thread_data = self._decode_hash(thread_data)
+        if thread_data.get("archived") == "1":
+            await self._rehydrate(thread_id)
+            return await self.get_thread(thread_id, start)
+        thread_data["messages"] = [self._decode_message(thread_id, msg) for msg in messages]
+        await self._resolve_snapshots(thread_data["messages"])
 
         return thread_data
 
-    def get_user_threads(self, user_id: str) -> List[Dict]:
-        """Get all threads for a user.
+    async def get_thread_page(
+        self,
+        thread_id: str,
+        limit: int,
+        cursor: Optional[int] = None,
+        newest_first: bool = True,
+    ) -> Optional[Dict]:
+        """Get thread metadata and one window of its messages.
+
+        Only the requested window is read and decoded, so a long thread costs
+        the same to open as a short one. Cursors are positions in the
+        append-only message list, so pages stay stable as messages are added.
+
+        Args:
+            thread_id: The thread ID
+            limit: Maximum number of messages to return
+            cursor: ``next_cursor`` from the previous page, or None for the
+                first page
+            newest_first: Page from the newest message backwards (default) or
+                from the oldest forwards
+
+        Returns:
+            Thread metadata with ``messages`` (the window, in page order),
+            ``total`` (message count from thread metadata) and ``next_cursor``
+            (None on the last page), or None if the thread is not found
+        """
+        if newest_first:
+            start = -limit if cursor is None else max(0, cursor - limit)
+            end = -1 if cursor is None else cursor - 1
+        else:
+            start = cursor or 0
+            end = start + limit - 1
+
+        async with self.binary_redis.pipeline(transaction=True) as pipe:
+            pipe.hgetall(f"thread:{thread_id}")
+            # A newest-first cursor of 0 means the oldest page was returned
+            if not (newest_first and cursor == 0):
+                pipe.lrange(f"thread:{thread_id}:messages", start, end)
+            results = await pipe.execute()
+        if not results[0]:
+            return None
+
+        thread_data = self._decode_hash(results[0])
+        if thread_data.get("archived") == "1":
+            await self._rehydrate(thread_id)
+            return await self.get_thread_page(thread_id, limit, cursor, newest_first)
+        messages = (
+            [self._decode_message(thread_id, msg) for msg in results[1]]
+            if len(results) > 1
+            else []
+        )
+        await self._resolve_snapshots(messages)
+        total = int(thread_data.get("message_count", 0))
+        if newest_first:
+            first_index = total - len(messages) if cursor is None else start
+            messages.reverse()
+            next_cursor = first_index if first_index > 0 and messages else None
+        else:
+            next_index = start + len(messages)
+            next_cursor = next_index if next_index < total else None
+
+        thread_data["messages"] = messages
+        thread_data["total"] = total
+        thread_data["next_cursor"] = next_cursor
+        return thread_data
+
+    async def get_user_threads(
+        self,
+        user_id: str,
+        limit: int = settings.THREAD_LIST_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """Get one page of a user's threads, most recently updated first.
+
+        Reads the page of IDs from the user's ``updated_at`` index and their
+        metadata in one pipeline, so the cost does not grow with the number
+        of threads. The cursor holds the last thread's score and ID, so
+        threads updated at the same time are not skipped between pages.
 
         Args:
             user_id: The user ID
+            limit: Maximum number of threads to return
+            cursor: ``next_cursor`` from the previous page, or None for the
+                first page
+
+        Returns:
+            Dictionary with ``threads`` (metadata dictionaries) and
+            ``next_cursor`` (None on the last page)
+        """
+        index_key = self._threads_index_key(user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if cursor is None:
+                pipe.exists(self._threads_indexed_key(user_id))
+            self._queue_index_page(pipe, index_key, cursor, limit)
+            results = await pipe.execute()
+        # Threads created since the index exists are in it already, but older
+        # ones have to be added even when the index is not empty
+        if cursor is None and not results[0] and await self._backfill_threads_index(user_id):
+            async with self.redis.pipeline(transaction=False) as pipe:
+                self._queue_index_page(pipe, index_key, cursor, limit)
+                results = await pipe.execute()
+        entries = self._index_page(results, cursor, limit)
+        if not entries:
+            return {"threads": [], "next_cursor": None}
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for thread_id, _ in entries:
+                pipe.hgetall(f"thread:{thread_id}")
+            results = await pipe.execute()
+
+        threads = [thread_data for thread_data in results if thread_data]
+        stale = [thread_id for (thread_id, _), data in zip(entries, results) if not data]
+        if stale:
+            await self.redis.zrem(index_key, *stale)
+
+        next_cursor = None
+        if len(entries) == limit:
+            last_id, last_score = entries[-1]
+            next_cursor = f"{last_score!r}:{last_id}"
+        return {"threads": threads, "next_cursor": next_cursor}
+
+    def _queue_index_page(self, pipe, index_key: str, cursor: Optional[str], limit: int) -> None:
+        """Queue the reads of a page of ``index_key`` after ``cursor``.
+
+        Index entries with the same score are ordered by thread ID, so the
+        page continues with the cursor's ties of lower ID, then lower scores.
+        """
+        if cursor is None:
+            pipe.zrevrangebyscore(index_key, "+inf", "-inf", start=0, num=limit, withscores=True)
+            return
+        score, _, _ = cursor.partition(":")
+        pipe.zrevrangebyscore(index_key, score, score, withscores=True)
+        pipe.zrevrangebyscore(
+            index_key, f"({score}", "-inf", start=0, num=limit, withscores=True
+        )
+
+    def _index_page(self, results: List, cursor: Optional[str], limit: int) -> List:
+        """Entries of the page queued by ``_queue_index_page``."""
+        if cursor is None:
+            return results[-1]
+        _, _, last_id = cursor.partition(":")
+        ties, lower = results[-2:]
+        return ([entry for entry in ties if entry[0] < last_id] + lower)[:limit]
+
+    async def _backfill_threads_index(self, user_id: str) -> bool:
+        """Add threads created before the ``updated_at`` index existed to it.
+
+        Runs once per user: the done flag is set when the user has threads,
+        and users without any only ever get indexed threads.
 
         Returns:
-            List of thread metadata dictionaries
+            True if the user has threads that were (re)indexed
         """
-        thread_ids = self.redis.smembers(f"user:{user_id}:threads")
-        threads = []
+        thread_ids = list(await self.redis.smembers(f"user:{user_id}:threads"))
+        if not thread_ids:
+            return False
 
-        for thread_id in thread_ids:
-            thread_data = self.redis.hgetall(f"thread:{thread_id}")
-            if thread_data:
-                threads.append(thread_data)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for thread_id in thread_ids:
+                pipe.hget(f"thread:{thread_id}", "updated_at")
+            updated = await pipe.execute()
 
-        return threads
+        scores = {
+            thread_id: _updated_score(updated_at)
+            for thread_id, updated_at in zip(thread_ids, updated)
+            if updated_at
+        }
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if scores:
+                # NX keeps newer scores written by concurrent add_message calls
+                pipe.zadd(self._threads_index_key(user_id), scores, nx=True)
+            pipe.set(self._threads_indexed_key(user_id), 1)
+            await pipe.execute()
+        return True
 
-    def delete_thread(self, thread_id: str) -> bool:
+    async def delete_thread(self, thread_id: str) -> bool:
         """Delete a thread and all its messages.
 
         Args:
@@ -132,21 +570,182 @@ class ThreadService(metaclass=Singleton):
         Returns:
             True if thread was deleted, False if not found
         """
-        # Get thread metadata to find user_id
-        thread_data = self.redis.hgetall(f"thread:{thread_id}")
-        if not thread_data:
-            return False
+        deleted = await self._delete_thread_script(
+            keys=[f"thread:{thread_id}"], args=[thread_id]
+        )
+        # Rehydrated threads keep their archived copy until deleted here
+        if deleted == 2 or (deleted and settings.THREAD_ARCHIVE_ENABLED):
+            await self.archive_store.delete_thread(thread_id)
+        return bool(deleted)
+
+    async def archive_idle_threads(
+        self,
+        idle_seconds: float = settings.THREAD_ARCHIVE_IDLE_SECONDS,
+        batch_size: int = settings.THREAD_ARCHIVE_BATCH_SIZE,
+    ) -> int:
+        """Move the history of threads idle for ``idle_seconds`` to Postgres.
+
+        Copies one batch of the least recently updated threads to the archive
+        store in bulk, then evicts their messages and summary from Redis.
+        A thread updated while being copied is left in Redis.
 
-        # Remove thread from user's thread list
-        self.redis.srem(f"user:{thread_data['user_id']}:threads", thread_id)
+        Args:
+            idle_seconds: Minimum time since a thread's last update
+            batch_size: Maximum number of threads to archive
 
-        # Delete thread metadata and messages
-        self.redis.delete(f"thread:{thread_id}")
-        self.redis.delete(f"thread:{thread_id}:messages")
+        Returns:
+            Number of threads archived
+        """
+        thread_ids = await self.redis.zrangebyscore(
+            ACTIVITY_INDEX_KEY, "-inf", time.time() - idle_seconds, start=0, num=batch_size
+        )
+        if not thread_ids:
+            return 0
+
+        async with self.binary_redis.pipeline(transaction=False) as pipe:
+            for thread_id in thread_ids:
+                pipe.hgetall(f"thread:{thread_id}")
+                pipe.lrange(f"thread:{thread_id}:messages", 0, -1)
+                pipe.hgetall(f"thread:{thread_id}:summary")
+            results = await pipe.execute()
+
+        archives = {}
+        stale = []
+        for i, thread_id in enumerate(thread_ids):
+            raw_thread, messages, raw_summary = results[3 * i : 3 * i + 3]
+            thread_data = self._decode_hash(raw_thread)
+            # Legacy threads without updated_at cannot be evicted safely, so
+            # they stay in Redis
+            if (
+                not thread_data
+                or thread_data.get("archived") == "1"
+                or not thread_data.get("updated_at")
+            ):
+                stale.append(thread_id)
+                continue
+            digests = {
+                digest
+                for raw in messages
+                for digest in (decode_record(raw).get("snapshots") or {}).values()
+            }
+            archives[thread_id] = (thread_data, messages, self._decode_hash(raw_summary), digests)
+        if stale:
+            await self.redis.zrem(ACTIVITY_INDEX_KEY, *stale)
+
+        # Archived threads keep copies of their snapshots, which are deleted
+        # from Redis once no live thread references them
+        snapshots = await self._load_snapshots(
+            digest for *_, digests in archives.values() for digest in digests
+        )
 
-        return True
+        rows = []
+        copied_updated_at = {}
+        for thread_id, (thread_data, messages, summary, digests) in archives.items():
+            thread_snapshots = {
+                digest: snapshots[digest] for digest in digests if digest in snapshots
+            }
+            payload = encode_record(
+                {"messages": messages, "summary": summary, "snapshots": thread_snapshots}
+            )
+            updated_at = datetime.fromisoformat(thread_data["updated_at"]).replace(
+                tzinfo=timezone.utc
+            )
+            rows.append((thread_id, thread_data.get("user_id", ""), updated_at, payload))
+            copied_updated_at[thread_id] = thread_data["updated_at"]
+
+        await self.archive_store.save_threads(rows)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for thread_id, updated_at in copied_updated_at.items():
+                await self._evict_thread_script(
+                    keys=[f"thread:{thread_id}"], args=[thread_id, updated_at], client=pipe
+                )
+            evicted = await pipe.execute() if rows else []
+        return sum(1 for result in evicted if result)
+
+    async def _load_snapshots(self, digests) -> Dict[str, bytes]:
+        """Read encoded snapshots by content hash, skipping missing ones."""
+        digests = list(set(digests))
+        if not digests:
+            return {}
+        values = await self.binary_redis.mget([_snapshot_key(digest) for digest in digests])
+        return {digest: raw for digest, raw in zip(digests, values) if raw is not None}
+
+    async def _rehydrate(self, thread_id: str) -> None:
+        """Restore an archived thread's messages and summary to Redis."""
+        payload = await self.archive_store.load_thread(thread_id)
+        archive = decode_record(payload) if payload else None
+        if archive is None:
+            self.logger.warning(f"No archived history for thread {thread_id}")
+            archive = {"messages": [], "summary": {}}
+
+        thread_key = f"thread:{thread_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(thread_key)
+                    if await pipe.hget(thread_key, "archived") != "1":
+                        # Restored by a concurrent request
+                        return
+                    pipe.multi()
+                    pipe.delete(f"{thread_key}:messages", f"{thread_key}:summary")
+                    messages = archive["messages"]
+                    for i in range(0, len(messages), REHYDRATE_CHUNK_SIZE):
+                        pipe.rpush(
+                            f"{thread_key}:messages", *messages[i : i + REHYDRATE_CHUNK_SIZE]
+                        )
+                    if archive["summary"]:
+                        pipe.hset(f"{thread_key}:summary", mapping=archive["summary"])
+                    # The thread released its snapshots when it was archived
+                    for digest, raw in archive.get("snapshots", {}).items():
+                        pipe.set(_snapshot_key(digest), raw)
+                        pipe.sadd(f"{thread_key}:snapshots", _snapshot_key(digest))
+                        pipe.hincrby(SNAPSHOT_REFS_KEY, _snapshot_key(digest), 1)
+                    pipe.hdel(thread_key, "archived")
+                    # Scored by the time it was read back, not its updated_at,
+                    # so it stays in Redis for a full idle period again
+                    pipe.zadd(ACTIVITY_INDEX_KEY, {thread_id: time.time()})
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    async def backfill_activity_index(self, batch_size: int = 500) -> int:
+        """Add threads created before the activity index existed to it.
 
-    def update_thread_title(self, thread_id: str, title: str) -> bool:
+        Returns:
+            Number of threads added
+        """
+        added = 0
+        batch: List[str] = []
+
+        async def index_batch(keys: List[str]) -> int:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.hmget(key, "updated_at", "archived")
+                results = await pipe.execute()
+            scores = {
+                key.split(":", 1)[1]: _updated_score(updated_at)
+                for key, (updated_at, archived) in zip(keys, results)
+                if updated_at and archived != "1"
+            }
+            if not scores:
+                return 0
+            return await self.redis.zadd(ACTIVITY_INDEX_KEY, scores, nx=True)
+
+        async for key in self.redis.scan_iter(match="thread:*", count=batch_size):
+            # Only thread hashes, not thread:{id}:messages or :summary
+            if key.count(":") != 1:
+                continue
+            batch.append(key)
+            if len(batch) >= batch_size:
+                added += await index_batch(batch)
+                batch = []
+        if batch:
+            added += await index_batch(batch)
+        return added
+
+    async def update_thread_title(self, thread_id: str, title: str) -> bool:
         """Update a thread's title.
 
         Args:
@@ -156,20 +755,44 @@ class ThreadService(metaclass=Singleton):
         Returns:
             True if title was updated, False if thread not found
         """
-        if not self.redis.exists(f"thread:{thread_id}"):
+        if not await self.redis.exists(f"thread:{thread_id}"):
             return False
 
-        self.redis.hset(f"thread:{thread_id}", "title", title)
+        await self.redis.hset(f"thread:{thread_id}", "title", title)
         return True
 
-    def get_thread_messages(self, thread_id: str) -> dict:
+    async def get_thread_messages(self, thread_id: str, start: int = 0) -> dict:
         """
-        Fetch only the role and content of a thread
+        Fetch only the role and content of a thread, from message ``start`` on
         """
-        if not self.redis.exists(f"thread:{thread_id}"):
+        thread_messages = await self.get_thread(thread_id=thread_id, start=start)
+        if thread_messages is None:
             return None
-        thread_messages = self.get_thread(thread_id=thread_id)
         return [
             {"role": i["role"], "content": i["content"]}
             for i in thread_messages.get("messages")
         ]
+
+    async def get_thread_summary(self, thread_id: str) -> Optional[Dict]:
+        """Get the rolling summary of a thread's older messages.
+
+        Returns:
+            Dictionary with the summary ``text`` and ``message_count`` (the
+            number of leading messages it covers), or None if not summarized
+        """
+        summary = await self.redis.hgetall(f"thread:{thread_id}:summary")
+        if not summary:
+            return None
+        summary["message_count"] = int(summary.get("message_count", 0))
+        return summary
+
+    async def set_thread_summary(self, thread_id: str, text: str, message_count: int) -> None:
+        """Store the rolling summary covering the first ``message_count`` messages."""
+        await self.redis.hset(
+            f"thread:{thread_id}:summary",
+            mapping={
+                "text": text,
+                "message_count": message_count,
+                "updated_at": _utc_now(),
+            },
+        )
@@ -1,6 +1,8 @@
 from typing import Optional, List, Tuple
 from uuid import uuid4
 
+from redis.exceptions import WatchError
+
 from app.models.user import User
 from app.models.thread import ChatThread
 from app.services.data_access.redis_service import RedisService
@@ -12,6 +14,10 @@ class UserService:
         self.redis_service = RedisService[User](User)
         self.thread_service = ThreadService()
 
+    def _email_key(self, email: str) -> str:
+        # Secondary index: normalized email -> wallet address
+        return f"user_email:{email.strip().lower()}"
+
     async def handle_user_prompt(
         self,
         wallet_address: str,
@@ -42,7 +48,7 @@ class UserService:
         # Handle thread
         if not thread_id:
             # Create new thread
-            thread_id = self.thread_service.create_thread(
+            thread_id = await self.thread_service.create_thread(
                 user_id=wallet_address, initial_message=prompt
             )
             # Create ChatThread object and update user
@@ -51,7 +57,7 @@ class UserService:
             await self.update_user(user)
         else:
             # Add message to existing thread
-            self.thread_service.add_message(thread_id, "user", prompt)
+            await self.thread_service.add_message(thread_id, "user", prompt)
 
         return user, thread_id
 
@@ -99,7 +105,7 @@ class UserService:
             email=email,
             thread=thread,
         )
-        await self.redis_service.create(wallet_address, user)
+        await self._save_user(user)
         return user
 
     async def add_message_to_thread(
@@ -108,7 +114,7 @@ class UserService:
         """Add a message to an existing thread."""
         user = await self.get_user(wallet_address)
         if user and user.thread and user.thread.thread_id == thread_id:
-            self.thread_service.add_message(thread_id, role, content)
+            await self.thread_service.add_message(thread_id, role, content)
             return user
         return None
 
@@ -133,7 +139,72 @@ class UserService:
         """
         if not user.wallet_address:
             raise ValueError("User must have a wallet address")
-        await self.redis_service.update(user.wallet_address, user)
+        await self._save_user(user)
+
+    async def _save_user(self, user: User) -> None:
+        """Write a user and keep the email index in step, atomically.
+
+        The user record is watched so the stored email, and therefore the
+        index entry to retire, cannot change between reading and writing.
+        """
+        # Binary client: the stored record is read back inside the WATCH
+        redis_client = self.redis_service.binary_client
+        user_key = self.redis_service._get_key(user.wallet_address)
+        wallet = user.wallet_address.encode()
+        async with redis_client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(user_key)
+                    stored = await pipe.get(user_key)
+                    old_email = self.redis_service.decode(stored).email if stored else None
+                    stale_key = None
+                    if old_email and (
+                        not user.email
+                        or self._email_key(old_email) != self._email_key(user.email)
+                    ):
+                        stale_key = self._email_key(old_email)
+                        await pipe.watch(stale_key)
+                        if await pipe.get(stale_key) != wallet:
+                            stale_key = None
+
+                    pipe.multi()
+                    pipe.set(user_key, self.redis_service.encode(user))
+                    if stale_key:
+                        pipe.delete(stale_key)
+                    if user.email:
+                        pipe.set(self._email_key(user.email), user.wallet_address)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    async def save_user_thread(self, user: User) -> None:
+        """Write ``user.thread`` without overwriting the rest of the stored user.
+
+        The stored record is watched and only its thread replaced, so fields
+        changed by a concurrent request, such as the email, are kept. If the
+        user does not exist yet it is created with its email index entry.
+        """
+        redis_client = self.redis_service.binary_client
+        user_key = self.redis_service._get_key(user.wallet_address)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(user_key)
+                    stored = await pipe.get(user_key)
+                    pipe.multi()
+                    if stored:
+                        current = self.redis_service.decode(stored)
+                        current.thread = user.thread
+                        pipe.set(user_key, self.redis_service.encode(current))
+                    else:
+                        pipe.set(user_key, self.redis_service.encode(user))
+                        if user.email:
+                            pipe.set(self._email_key(user.email), user.wallet_address)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
 
     async def delete_user(self, wallet_address: str) -> bool:
         """
@@ -145,7 +216,13 @@ class UserService:
         Returns:
             bool: True if the user was deleted, False otherwise
         """
-        return await self.redis_service.delete(wallet_address)
+        user = await self.get_user(wallet_address)
+        deleted = await self.redis_service.delete(wallet_address)
+        if user and user.email:
+            email_key = self._email_key(user.email)
+            if await self.redis_service.redis_client.get(email_key) == wallet_address:
+                await self.redis_service.redis_client.delete(email_key)
+        return deleted
 
     async def user_exists(self, wallet_address: str) -> bool:
         """
@@ -199,8 +276,7 @@ class UserService:
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
         """
-        Retrieve a user by their email address.
-        Note: This is less efficient as it requires scanning all users.
+        Retrieve a user by their email address using the email index.
 
         Args:
             email: The user's email address
@@ -208,17 +284,61 @@ class UserService:
         Returns:
             Optional[User]: The user object if found, None otherwise
         """
-        # Note: This is a simplified implementation. In a production environment,
-        # you might want to maintain a separate index for email lookups
-        all_keys = self.redis_service.redis_client.keys(
-            f"{self.redis_service.prefix}:*"
+        wallet_address = await self.redis_service.redis_client.get(
+            self._email_key(email)
         )
-        for key in all_keys:
-            user = await self.redis_service.get(key.split(":")[-1])
-            if user and user.email == email:
-                return user
+        if not wallet_address:
+            return None
+        user = await self.get_user(wallet_address)
+        if user and user.email and self._email_key(user.email) == self._email_key(email):
+            return user
         return None
 
+    async def backfill_email_index(self, batch_size: int = 500) -> int:
+        """
+        Index the emails of users stored before the email index existed.
+
+        Walks user records with SCAN (not KEYS) so Redis is not blocked, and
+        never overwrites an index entry written since.
+
+        Args:
+            batch_size: Number of keys fetched per SCAN/MGET batch
+
+        Returns:
+            int: Number of index entries created
+        """
+        redis_client = self.redis_service.redis_client
+        prefix = f"{self.redis_service.prefix}:"
+        created = 0
+        batch: List[str] = []
+
+        async def index_batch(keys: List[str]) -> int:
+            entries = {}
+            for raw in await self.redis_service.binary_client.mget(keys):
+                if not raw:
+                    continue
+                user = self.redis_service.decode(raw)
+                if user.email and user.wallet_address:
+                    entries[self._email_key(user.email)] = user.wallet_address
+            if not entries:
+                return 0
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for email_key, wallet_address in entries.items():
+                    pipe.set(email_key, wallet_address, nx=True)
+                return sum(1 for result in await pipe.execute() if result)
+
+        async for key in redis_client.scan_iter(match=f"{prefix}*", count=batch_size):
+            # Skip other records sharing the prefix, e.g. user:{id}:threads
+            if ":" in key[len(prefix):]:
+                continue
+            batch.append(key)
+            if len(batch) >= batch_size:
+                created += await index_batch(batch)
+                batch = []
+        if batch:
+            created += await index_batch(batch)
+        return created
+
     async def get_user_thread(
         self, wallet_address: str, thread_id: str
     ) -> Optional[ChatThread]:
@@ -0,0 +1,162 @@
+import asyncio
+import uuid
+from typing import Any, List, Optional, Tuple
+
+from app.models.thread import ChatThread
+from app.models.user import User
+from app.services.thread_service import ThreadService
+from app.services.user_service import UserService
+from app.services.write_behind_queue import WriteBehindQueue
+
+
+class UserThreadUnitOfWork:
+    """Request-scoped view of a user and their current thread.
+
+    The user is read from Redis once when the unit of work is entered; thread
+    creation and new messages are tracked in memory and written together in
+    one MULTI/EXEC when it exits, followed by the user's current thread
+    (only that field of the user is written, see
+    ``UserService.save_user_thread``). Use one instance per request:
+
+        async with UserThreadUnitOfWork(wallet_address, session_id) as uow:
+            thread_id = uow.open_thread(prompt, thread_id)
+            ...
+            uow.add_message(thread_id, "assistant", content)
+
+    Pending writes are flushed however the block exits, so the user's prompt
+    is kept even if the agent fails or the request is cancelled by its
+    deadline. While the ``WriteBehindQueue`` is running (and not full) the
+    flush is handed to it instead of being awaited.
+    """
+
+    def __init__(self, wallet_address: str, session_id: str, email: Optional[str] = None):
+        self.wallet_address = wallet_address
+        self.session_id = session_id
+        self.email = email
+        self.user_service = UserService()
+        self.thread_service = ThreadService()
+        self.user: Optional[User] = None
+        self._user_dirty = False
+        self._new_threads: List[Tuple[str, str]] = []
+        # (thread ID, role, content, message ID); the ID is fixed here so a
+        # retried commit does not append the message twice
+        self._messages: List[Tuple[str, str, Any, str]] = []
+        self._first_message = 0
+
+    async def __aenter__(self) -> "UserThreadUnitOfWork":
+        await self.load()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        write_behind = WriteBehindQueue()
+        if write_behind.running and write_behind.submit(self):
+            return
+        # Shielded so a cancelled request still stores its prompt
+        await asyncio.shield(self._commit_after_queued())
+
+    async def _commit_after_queued(self) -> None:
+        # Earlier writes for this user may still be queued; don't overtake them
+        await WriteBehindQueue().wait_for(self.wallet_address)
+        await self.commit()
+
+    async def load(self) -> User:
+        """Load the user, creating it in memory if it does not exist yet.
+
+        Waits for this user's earlier writes still in the write-behind queue,
+        so a request never starts from state older than the previous reply.
+        """
+        await WriteBehindQueue().wait_for(self.wallet_address)
+        self.user = await self.user_service.get_user(self.wallet_address)
+        if self.user is None:
+            self.user = User(
+                session_id=self.session_id,
+                wallet_address=self.wallet_address,
+                email=self.email,
+            )
+            self._user_dirty = True
+        return self.user
+
+    def open_thread(self, prompt: str, thread_id: Optional[str] = None) -> str:
+        """Record the user's prompt, starting a new thread if none is given.
+
+        Returns:
+            The thread ID
+        """
+        if not thread_id:
+            thread_id = str(uuid.uuid4())
+            self._new_threads.append((thread_id, prompt))
+            self.user.thread = ChatThread(thread_id=thread_id, last_response_id=None)
+            self._user_dirty = True
+        else:
+            self._messages.append((thread_id, "user", prompt, str(uuid.uuid4())))
+        return thread_id
+
+    def get_thread(self, thread_id: str) -> Optional[ChatThread]:
+        """The user's ChatThread if it is ``thread_id``."""
+        if self.user and self.user.thread and self.user.thread.thread_id == thread_id:
+            return self.user.thread
+        return None
+
+    def record_response(self, thread_id: str, response_id: str) -> None:
+        """Remember the model response ID to continue the thread from."""
+        chat_thread = self.get_thread(thread_id)
+        if chat_thread:
+            chat_thread.last_response_id = response_id
+            self._user_dirty = True
+
+    def add_message(self, thread_id: str, role: str, content: Any) -> bool:
+        """Queue a message for the user's current thread.
+
+        Returns:
+            False (and queues nothing) if ``thread_id`` is not the user's thread
+        """
+        if not self.get_thread(thread_id):
+            return False
+        self._messages.append((thread_id, role, content, str(uuid.uuid4())))
+        return True
+
+    def has_changes(self) -> bool:
+        return bool(self._user_dirty or self._new_threads or self._messages)
+
+    async def commit(self) -> None:
+        """Write all pending changes in one transaction."""
+        if not self.has_changes():
+            return
+
+        async with self.thread_service.redis.pipeline(transaction=True) as pipe:
+            await self.queue_writes(pipe)
+            results = await pipe.execute()
+        await self.apply_results(results)
+
+    async def queue_writes(self, pipe) -> None:
+        """Queue the pending writes on a MULTI pipeline.
+
+        Several units of work can share one pipeline; each must be passed
+        the pipeline's results through ``apply_results`` afterwards. The
+        writes are idempotent, so they may be queued again after a failure.
+        """
+        for thread_id, prompt in self._new_threads:
+            await self.thread_service.queue_create_thread(
+                pipe, thread_id, self.wallet_address, initial_message=prompt
+            )
+        self._first_message = len(pipe.command_stack)
+        for thread_id, role, content, message_id in self._messages:
+            await self.thread_service.queue_add_message(
+                pipe, thread_id, role, content, message_id
+            )
+
+    async def apply_results(self, results: List[Any]) -> None:
+        """Finish a commit from the results of the pipeline it was queued on."""
+        appended = results[self._first_message : self._first_message + len(self._messages)]
+        for (thread_id, role, content, _), ok in zip(self._messages, appended):
+            if not ok:
+                # Archived threads refuse appends; this restores them first
+                await self.thread_service.add_message(thread_id, role, content)
+        if self._user_dirty:
+            # Not part of the transaction: merged into the stored user under
+            # WATCH, so concurrent changes to other fields are kept
+            await self.user_service.save_user_thread(self.user)
+
+        self._user_dirty = False
+        self._new_threads = []
+        self._messages = []
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.singleton import Singleton
+from app.services.thread_service import ThreadService
+
+
+class WriteBehindQueue(metaclass=Singleton):
+    """Persists request state after the response has been sent.
+
+    Units of work are submitted when a request finishes and written by a
+    background task, up to ``WRITE_BEHIND_BATCH_SIZE`` of them per MULTI/EXEC.
+    ``close`` drains what is left on shutdown.
+
+    A batch that fails to reach Redis stays at the head of the queue and is
+    retried with exponential backoff, up to ``WRITE_BEHIND_MAX_RETRIES``
+    times. Writes are idempotent, so a retry after an EXEC whose reply was
+    lost does not duplicate them. A unit of work whose commands Redis
+    rejects (e.g. a corrupt key) is dropped without holding up the others;
+    if Redis rejects the whole transaction, its units are retried one at a
+    time to find the bad one. Dropped writes are logged and counted in
+    ``write_behind.lost``.
+
+    At most ``WRITE_BEHIND_MAX_BACKLOG`` units of work are queued; beyond
+    that ``submit`` refuses them and requests commit inline. The
+    ``write_behind.backlog`` gauge is the number of units of work not yet
+    written.
+    """
+
+    def __init__(self):
+        self.thread_service = ThreadService()
+        self.batch_size = settings.WRITE_BEHIND_BATCH_SIZE
+        self.max_backoff = settings.WRITE_BEHIND_MAX_BACKOFF_SECONDS
+        self.max_retries = settings.WRITE_BEHIND_MAX_RETRIES
+        self.max_backlog = settings.WRITE_BEHIND_MAX_BACKLOG
+        self.logger = logging.getLogger(__name__)
+        self._pending: Deque[Tuple[Any, asyncio.Future]] = deque()
+        # Wallet address -> future of its most recently submitted write
+        self._last_write: Dict[str, asyncio.Future] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        """Whether submitted writes will be picked up by the worker."""
+        return self._worker is not None and not self._worker.done() and not self._closing
+
+    def start(self) -> None:
+        """Start the background worker on the running event loop."""
+        if self.running:
+            return
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    def submit(self, unit_of_work: Any) -> bool:
+        """Queue a unit of work to be committed in the background.
+
+        Returns:
+            False if the backlog is full and the caller must commit itself
+        """
+        if len(self._pending) >= self.max_backlog:
+            metrics.increment("write_behind.rejected")
+            return False
+        future = asyncio.get_running_loop().create_future()
+        wallet_address = unit_of_work.wallet_address
+        self._pending.append((unit_of_work, future))
+        self._last_write[wallet_address] = future
+        future.add_done_callback(lambda f: self._forget(wallet_address, f))
+        self._update_backlog()
+        self._wakeup.set()
+        return True
+
+    async def wait_for(self, wallet_address: str) -> None:
+        """Wait until every write submitted for ``wallet_address`` is done."""
+        future = self._last_write.get(wallet_address)
+        if future is not None:
+            await asyncio.shield(future)
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting writes and flush the backlog.
+
+        Args:
+            timeout: Seconds to wait for the backlog to drain; writes still
+                pending after it are logged and counted as lost
+        """
+        if self._worker is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        done, _ = await asyncio.wait({self._worker}, timeout=timeout)
+        if not done:
+            self._worker.cancel()
+            lost = len(self._pending)
+            metrics.increment("write_behind.lost", lost)
+            self.logger.error(f"Write-behind queue closed with {lost} unwritten updates")
+            while self._pending:
+                _, future = self._pending.popleft()
+                future.set_result(None)
+            self._update_backlog()
+        self._worker = None
+
+    async def _run(self) -> None:
+        backoff = 0.0
+        attempts = 0
+        # Units of work left to write one at a time, to isolate a bad one
+        isolate = 0
+        while True:
+            if not self._pending:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            size = 1 if isolate else self.batch_size
+            batch = [self._pending[i] for i in range(min(size, len(self._pending)))]
+            try:
+                results, spans = await self._execute([uow for uow, _ in batch])
+            except (redis.ConnectionError, redis.TimeoutError, OSError) as e:
+                attempts += 1
+                if attempts <= self.max_retries:
+                    metrics.increment("write_behind.retries")
+                    backoff = min(max(backoff * 2, 0.5), self.max_backoff)
+                    self.logger.warning(
+                        f"Write-behind batch failed, retrying in {backoff}s: {str(e)}"
+                    )
+                    await asyncio.sleep(backoff)
+                    continue
+                self._drop(batch, f"still failing after {self.max_retries} retries: {str(e)}")
+            except Exception as e:
+                # Redis rejected the transaction as a whole
+                if len(batch) > 1:
+                    self.logger.warning(f"Write-behind batch rejected, isolating: {str(e)}")
+                    isolate = len(batch)
+                    continue
+                self._drop(batch, f"rejected: {str(e)}")
+            else:
+                await self._finish(batch, results, spans)
+            backoff = 0.0
+            attempts = 0
+            isolate = max(isolate - len(batch), 0)
+            self._update_backlog()
+
+    async def _execute(self, units_of_work: List[Any]) -> Tuple[List[Any], List[slice]]:
+        """Write units of work in one transaction.
+
+        Returns:
+            The transaction's results, command errors included, and the
+            slice of them belonging to each unit of work
+        """
+        spans = []
+        async with self.thread_service.redis.pipeline(transaction=True) as pipe:
+            for uow in units_of_work:
+                start = len(pipe.command_stack)
+                await uow.queue_writes(pipe)
+                spans.append(slice(start, len(pipe.command_stack)))
+            return await pipe.execute(raise_on_error=False), spans
+
+    async def _finish(self, batch: List[Tuple[Any, asyncio.Future]], results, spans) -> None:
+        written = 0
+        for (uow, future), span in zip(batch, spans):
+            self._pending.popleft()
+            errors = [result for result in results[span] if isinstance(result, Exception)]
+            if errors:
+                # Other units' commands are applied regardless, since
+                # MULTI/EXEC does not roll back; only this one is dropped
+                self._report_lost(uow, f"rejected: {str(errors[0])}")
+            else:
+                try:
+                    await uow.apply_results(results)
+                    written += 1
+                except Exception as e:
+                    # The batch itself is written; only the follow-up writes
+                    # (archived-thread fallback, user record) failed
+                    self._report_lost(uow, f"follow-up failed: {str(e)}")
+            future.set_result(None)
+        metrics.increment("write_behind.flushed", written)
+
+    def _drop(self, batch: List[Tuple[Any, asyncio.Future]], reason: str) -> None:
+        for uow, future in batch:
+            self._pending.popleft()
+            self._report_lost(uow, reason)
+            future.set_result(None)
+
+    def _report_lost(self, unit_of_work: Any, reason: str) -> None:
+        metrics.increment("write_behind.lost")
+        self.logger.error(
+            f"Dropped write-behind update for {unit_of_work.wallet_address}: {reason}"
+        )
+
+    def _forget(self, wallet_address: str, future: asyncio.Future) -> None:
+        if self._last_write.get(wallet_address) is future:
+            del self._last_write[wallet_address]
+
+    def _update_backlog(self) -> None:
+        metrics.set_gauge("write_behind.backlog", len(self._pending))
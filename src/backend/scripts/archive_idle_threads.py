@@ -0,0 +1,43 @@
+"""Archive idle thread history from Redis to Postgres once.
+
+Usage (from src/backend, with the app's environment variables set):
+
+    PYTHONPATH=. python scripts/archive_idle_threads.py [--backfill]
+
+--backfill first adds threads created before the activity index existed,
+so they become eligible for archiving.
+"""
+
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.services.data_access.postgres_connection_manager import (
+    PostgresConnectionManager,
+)
+from app.services.data_access.redis_connection_manager import RedisConnectionManager
+from app.services.thread_service import ThreadService
+
+
+async def main(backfill: bool):
+    thread_service = ThreadService()
+    try:
+        if backfill:
+            added = await thread_service.backfill_activity_index()
+            print(f"Indexed {added} existing threads")
+        total = 0
+        while True:
+            archived = await thread_service.archive_idle_threads()
+            total += archived
+            if archived < settings.THREAD_ARCHIVE_BATCH_SIZE:
+                break
+        print(f"Archived {total} idle threads")
+    finally:
+        await PostgresConnectionManager().close()
+        await RedisConnectionManager().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backfill", action="store_true")
+    asyncio.run(main(parser.parse_args().backfill))
@@ -0,0 +1,25 @@
+"""Build the email -> wallet index for users created before it existed.
+
+Usage (from src/backend, with the app's environment variables set):
+
+    PYTHONPATH=. python scripts/backfill_user_email_index.py
+
+Safe to re-run: existing index entries are left untouched.
+"""
+
+import asyncio
+
+from app.services.data_access.redis_connection_manager import RedisConnectionManager
+from app.services.user_service import UserService
+
+
+async def main():
+    try:
+        created = await UserService().backfill_email_index()
+        print(f"Indexed {created} user emails")
+    finally:
+        await RedisConnectionManager().close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
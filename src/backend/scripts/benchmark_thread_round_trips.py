@@ -0,0 +1,115 @@
+"""Count Redis round trips made by ThreadService for one user prompt.
+
+Runs the thread operations of a v3 prompt (store the user message, load the
+history and summary for the model, store the reply) on the in-memory storage
+engine (``STORAGE_BACKEND=memory``) and counts commands sent, with a pipeline
+or script call counted as one round trip. Time spent in storage calls is
+reported too; with no network involved it is the client and serialization
+cost alone.
+
+Usage (from src/backend, with the app's environment variables set):
+
+    PYTHONPATH=. python scripts/benchmark_thread_round_trips.py
+
+Before pipelining, the first prompt of a thread took 12 round trips, each
+follow-up prompt 10, and deleting a thread 5.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from redis.asyncio.client import Pipeline, Redis
+
+from app.core.config import settings
+from app.services.thread_service import ThreadService
+
+FOLLOW_UP_PROMPTS = 5
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.counts = Counter()
+        self.seconds = Counter()
+        self.operation = None
+
+    @contextmanager
+    def measure(self, operation: str):
+        self.operation = operation
+        try:
+            yield
+        finally:
+            self.operation = None
+
+    @contextmanager
+    def install(self):
+        execute_command = Redis.execute_command
+        execute_pipeline = Pipeline.execute
+        counter = self
+
+        async def timed(operation, call):
+            counter.counts[operation] += 1
+            start = time.perf_counter()
+            try:
+                return await call
+            finally:
+                counter.seconds[operation] += time.perf_counter() - start
+
+        async def counted_command(client, *args, **options):
+            return await timed(counter.operation, execute_command(client, *args, **options))
+
+        async def counted_pipeline(pipe, *args, **options):
+            return await timed(counter.operation, execute_pipeline(pipe, *args, **options))
+
+        Redis.execute_command = counted_command
+        Pipeline.execute = counted_pipeline
+        try:
+            yield self
+        finally:
+            Redis.execute_command = execute_command
+            Pipeline.execute = execute_pipeline
+
+
+async def run_prompt(service: ThreadService, thread_id: str, prompt: str) -> str:
+    if thread_id is None:
+        thread_id = await service.create_thread(user_id="0xbenchmark", initial_message=prompt)
+    else:
+        await service.add_message(thread_id, "user", prompt)
+    await service.get_thread_messages(thread_id)
+    await service.get_thread_summary(thread_id)
+    await service.add_message(thread_id, "assistant", f"Answer to: {prompt}")
+    return thread_id
+
+
+async def main():
+    settings.STORAGE_BACKEND = "memory"
+    service = ThreadService()
+    # Load the Lua scripts once, so EVALSHA misses are not counted below
+    for name in ("_add_message_script", "_delete_thread_script"):
+        await service.redis.script_load(getattr(service, name).script)
+
+    counter = RoundTripCounter()
+    with counter.install():
+        with counter.measure("first prompt"):
+            thread_id = await run_prompt(service, None, "What is ETH doing today?")
+        with counter.measure("follow-up prompts"):
+            for i in range(FOLLOW_UP_PROMPTS):
+                await run_prompt(service, thread_id, f"And after {i} hours?")
+        with counter.measure("delete thread"):
+            await service.delete_thread(thread_id)
+
+    print(f"{'operation':<20} {'round trips':>12} {'storage ms':>12}")
+    for operation, label, runs in (
+        ("first prompt", "first prompt", 1),
+        ("follow-up prompts", "follow-up prompt", FOLLOW_UP_PROMPTS),
+        ("delete thread", "delete thread", 1),
+    ):
+        print(
+            f"{label:<20} {counter.counts[operation] / runs:>12g} "
+            f"{counter.seconds[operation] * 1000 / runs:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,26 @@
+"""Build the shared token catalog file from Mobula.
+
+Run it before starting the workers (for example in the deploy step) so the
+first requests find the catalog in place; the workers keep it fresh after
+that.
+
+Usage (from src/backend, with the app's environment variables set):
+
+    PYTHONPATH=. python scripts/build_token_catalog.py
+"""
+
+import asyncio
+
+from app.services.data_access.token_catalog import TokenCatalog
+
+
+async def main():
+    catalog = TokenCatalog()
+    if await catalog.refresh(force=True):
+        print(f"Wrote {len(catalog.catalog)} symbols to {catalog.path}")
+    else:
+        print("Another process is rebuilding the catalog")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
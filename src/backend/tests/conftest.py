@@ -9,12 +9,26 @@ from datetime import datetime
 from app.main import app
 from app.services.auth_service import WalletAuthService
 from app.services.session_service import SessionService
+from app.services.thread_service import ThreadService
+from app.services.user_service import UserService
+from app.services.user_thread_unit_of_work import UserThreadUnitOfWork
 from app.services.utils.constants import AUTH_SIGNATURE_TEXT
 
 
 @pytest.fixture
-def mock_redis():
-    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+def fake_redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def mock_redis(fake_redis_server):
+    return fakeredis.aioredis.FakeRedis(server=fake_redis_server, decode_responses=True)
+
+
+@pytest.fixture
+def mock_binary_redis(fake_redis_server):
+    """Same data as ``mock_redis``, with values returned as bytes."""
+    return fakeredis.aioredis.FakeRedis(server=fake_redis_server)
 
 
 @pytest.fixture
@@ -23,15 +37,20 @@ def mock_rate_limiter(mock_redis):
 
     rate_limiter = RateLimiter()
     rate_limiter.redis = mock_redis
+    rate_limiter._sliding_window_script = mock_redis.register_script(
+        rate_limiter._sliding_window_script.script
+    )
     return rate_limiter
 
 
 @pytest.fixture
-def mock_session_service(mock_redis):
+def mock_session_service(mock_redis, mock_binary_redis):
     from app.services.session_service import SessionService
 
     session_service = SessionService()
     session_service.redis = mock_redis
+    session_service.binary_redis = mock_binary_redis
+    session_service.invalidation_bus.redis = mock_redis
     return session_service
 
 
@@ -46,12 +65,63 @@ def auth_service(mock_rate_limiter, mock_session_service):
 
 
 @pytest.fixture
-def session_service(mock_redis):
+def session_service(mock_redis, mock_binary_redis):
     service = SessionService()
     service.redis = mock_redis
+    service.binary_redis = mock_binary_redis
+    service.invalidation_bus.redis = mock_redis
     return service
 
 
+@pytest.fixture
+def thread_service(mock_redis, mock_binary_redis):
+    service = ThreadService()
+    original = dict(vars(service))
+    service.redis = mock_redis
+    service.binary_redis = mock_binary_redis
+    # Rebind the service's Lua scripts to the fake client
+    for name, script in original.items():
+        if name.endswith("_script"):
+            setattr(service, name, mock_redis.register_script(script.script))
+    yield service
+    vars(service).update(original)
+
+
+class InMemoryArchiveStore:
+    def __init__(self):
+        self.rows = {}
+
+    async def save_threads(self, rows):
+        for thread_id, user_id, updated_at, payload in rows:
+            self.rows[thread_id] = payload
+
+    async def load_thread(self, thread_id):
+        return self.rows.get(thread_id)
+
+    async def delete_thread(self, thread_id):
+        self.rows.pop(thread_id, None)
+
+
+@pytest.fixture
+def archive_store(thread_service):
+    thread_service.archive_store = InMemoryArchiveStore()
+    return thread_service.archive_store
+
+
+@pytest.fixture
+def unit_of_work(mock_redis, mock_binary_redis, thread_service):
+    user_service = UserService()
+    user_service.redis_service.redis_client = mock_redis
+    user_service.redis_service.binary_client = mock_binary_redis
+
+    def create(wallet_address="0xabc", session_id="s1"):
+        uow = UserThreadUnitOfWork(wallet_address, session_id)
+        uow.user_service = user_service
+        return uow
+
+    return create
+
+
 @pytest.fixture
 def mock_device_info():
     return {
@@ -8,3 +8,8 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": True}
+
+
+def test_metrics_require_authentication():
+    response = client.get("/metrics")
+    assert response.status_code in (401, 403)
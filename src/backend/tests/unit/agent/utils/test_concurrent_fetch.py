@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+
+from app.agent.utils.concurrent_fetch import fetch_with_timeout
+from app.core.deadline import Deadline, deadline_scope
+
+
+def _slow(value, delay):
+    time.sleep(delay)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_fetches_run_concurrently():
+    started = time.monotonic()
+    results = await asyncio.gather(
+        fetch_with_timeout("metadata", _slow, 1, value="m", delay=0.2),
+        fetch_with_timeout("sentiment", _slow, 1, value="s", delay=0.2),
+        fetch_with_timeout("ohlcv", _slow, 1, value="o", delay=0.2),
+    )
+
+    assert results == ["m", "s", "o"]
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_timeout_yields_partial_result():
+    results = await asyncio.gather(
+        fetch_with_timeout("metadata", _slow, 1, value="m", delay=0),
+        fetch_with_timeout("sentiment", _slow, 0.05, value="s", delay=0.3),
+    )
+
+    assert results == ["m", None]
+
+
+@pytest.mark.asyncio
+async def test_error_yields_none():
+    def failing():
+        raise ValueError("boom")
+
+    assert await fetch_with_timeout("ohlcv", failing, 1) is None
+
+
+@pytest.mark.asyncio
+async def test_timeout_is_capped_by_request_deadline():
+    with deadline_scope(Deadline(0.05)):
+        assert await fetch_with_timeout("ohlcv", _slow, 5, value="o", delay=0.3) is None
@@ -70,3 +70,14 @@ class TestMetacoreClient:
             # Test connection error handling
             with pytest.raises(requests.exceptions.ConnectionError):
                 metacore_client.get_all_cryptocurrencies()
+
+    def test_iter_all_cryptocurrencies_streams_tokens(self, mock_crypto_response):
+        with requests_mock.Mocker() as m:
+            expected_url = f"{settings.MOBULA_PRODUCTION_API_ENDPOINT}/api/1/all"
+            m.get(expected_url, json=mock_crypto_response)
+
+            tokens = list(MetacoreClient().iter_all_cryptocurrencies(fields="contracts"))
+
+            assert [token.symbol for token in tokens] == ["LYS", "SAFU", "FLD"]
+            assert tokens[0].contracts == []
+            assert m.last_request.qs == {"fields": ["contracts"]}
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.core.cancellation import (
+    CancellationReason,
+    RequestCancelled,
+    run_cancellable,
+)
+from app.core.metrics import metrics
+
+
+async def _slow_work(started: asyncio.Event, cancelled: asyncio.Event):
+    started.set()
+    try:
+        await asyncio.sleep(10)
+    except asyncio.CancelledError:
+        cancelled.set()
+        raise
+    return "finished"
+
+
+@pytest.mark.asyncio
+async def test_run_cancellable_returns_result():
+    async def work():
+        return 42
+
+    assert await run_cancellable(work(), timeout=1) == 42
+
+
+@pytest.mark.asyncio
+async def test_run_cancellable_cancels_on_disconnect():
+    started, cancelled, disconnected = asyncio.Event(), asyncio.Event(), asyncio.Event()
+    before = metrics.get("requests.cancelled.disconnect")
+
+    async def disconnect_later():
+        await started.wait()
+        disconnected.set()
+
+    asyncio.create_task(disconnect_later())
+    with pytest.raises(RequestCancelled) as exc_info:
+        await run_cancellable(
+            _slow_work(started, cancelled), timeout=5, cancel_event=disconnected
+        )
+
+    assert exc_info.value.reason == CancellationReason.DISCONNECT
+    assert cancelled.is_set()
+    assert metrics.get("requests.cancelled.disconnect") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_run_cancellable_cancels_on_deadline():
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    with pytest.raises(RequestCancelled) as exc_info:
+        await run_cancellable(_slow_work(started, cancelled), timeout=0.05)
+
+    assert exc_info.value.reason == CancellationReason.DEADLINE
+    assert cancelled.is_set()
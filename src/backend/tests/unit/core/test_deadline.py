@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from app.core.deadline import Deadline, current_deadline, deadline_scope
+
+
+def test_deadline_remaining_and_allows():
+    deadline = Deadline(10)
+    assert 9 < deadline.remaining() <= 10
+    assert deadline.allows(5)
+    assert not deadline.allows(11)
+    assert deadline.timeout_for(reserve_seconds=4) <= 6
+    assert not deadline.expired()
+
+
+def test_expired_deadline():
+    deadline = Deadline(0)
+    assert deadline.expired()
+    assert deadline.remaining() == 0
+    assert deadline.timeout_for(reserve_seconds=1) == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_scope_propagates_to_threads():
+    deadline = Deadline(5)
+    assert current_deadline() is None
+    with deadline_scope(deadline):
+        assert await asyncio.to_thread(current_deadline) is deadline
+    assert current_deadline() is None
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.lib import codec
+from app.lib.codec import decode_record, encode_record
+
+
+def test_round_trip_is_smaller_than_json():
+    record = {"role": "assistant", "content": {"price": 1.5, "tags": ["a", "b"]}, "id": b"\x01" * 16}
+
+    encoded = encode_record(record)
+
+    assert decode_record(encoded) == record
+    legacy = json.dumps({**record, "id": "01" * 16}).encode()
+    assert len(encoded) < len(legacy)
+
+
+def test_large_records_are_compressed():
+    record = {"content": "token analysis " * 500}
+
+    encoded = encode_record(record)
+
+    assert encoded[2] != codec.COMPRESSION_NONE
+    assert len(encoded) < settings.STORAGE_COMPRESSION_THRESHOLD_BYTES
+    assert decode_record(encoded) == record
+
+
+def test_zlib_is_used_without_zstandard(monkeypatch):
+    monkeypatch.setattr(codec, "zstandard", None)
+    record = {"content": "x" * 5000}
+
+    encoded = encode_record(record)
+
+    assert encoded[2] == codec.COMPRESSION_ZLIB
+    assert decode_record(encoded) == record
+
+
+@pytest.mark.parametrize("legacy", ['{"a": 1}', b'{"a": 1}'])
+def test_legacy_json_is_decoded(legacy):
+    assert decode_record(legacy) == {"a": 1}
+
+
+def test_none_passes_through():
+    assert decode_record(None) is None
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from app.lib.json_stream import iter_json_array
+
+PAYLOAD = {
+    "status": 200,
+    "meta": {"count": 3, "tags": ["a", "b"]},
+    "data": [
+        {"id": 1, "name": "Ethereum", "symbol": "ETH"},
+        {"id": 12345678, "name": "Café ☕", "symbol": "CAFE", "price": 0.000123},
+        {"id": 3, "name": "Tricky \"[]{},\" name", "symbol": "TRK", "contracts": []},
+    ],
+    "trailing": True,
+}
+
+
+def chunked(data: bytes, size: int):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 1 << 20])
+def test_items_survive_any_chunking(size):
+    data = json.dumps(PAYLOAD, ensure_ascii=False, indent=2).encode()
+
+    assert list(iter_json_array(chunked(data, size), "data")) == PAYLOAD["data"]
+
+
+def test_numbers_split_across_chunks():
+    chunks = [b'{"data": [12', b"34, 5", b".5e", b"1]}"]
+
+    assert list(iter_json_array(chunks, "data")) == [1234, 55.0]
+
+
+def test_items_are_yielded_before_the_stream_ends():
+    def chunks():
+        yield b'{"data": [{"id": 1}, '
+        raise AssertionError("read past the first item")
+
+    assert next(iter_json_array(chunks(), "data")) == {"id": 1}
+
+
+def test_empty_array():
+    assert list(iter_json_array([b'{"data": [] }'], "data")) == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b'{"data": [{"id": 1}', b'{"other": []}', b"{}", b'[{"id": 1}]', b'{"data": [1 2]}'],
+)
+def test_malformed_stream_raises(data):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(chunked(data, 3), "data"))
@@ -0,0 +1,49 @@
+import os
+
+from app.lib.shared_catalog import SharedCatalog, write_catalog
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    records = {f"TOKEN{i}": [{"id": i, "name": f"Token {i}"}] for i in range(500)}
+    write_catalog(path, records)
+
+    catalog = SharedCatalog(path)
+
+    assert len(catalog) == 500
+    assert catalog.get("TOKEN42") == [{"id": 42, "name": "Token 42"}]
+    assert catalog.get("MISSING") is None
+    assert "TOKEN0" in catalog
+    assert dict(catalog.items()) == records
+
+
+def test_missing_file_is_empty(tmp_path):
+    catalog = SharedCatalog(str(tmp_path / "missing.bin"))
+
+    assert not catalog.available
+    assert catalog.get("ETH") is None
+    assert len(catalog) == 0
+
+
+def test_replaced_file_is_picked_up(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    write_catalog(path, {"ETH": "old"})
+    catalog = SharedCatalog(path, check_interval=0)
+    assert catalog.get("ETH") == "old"
+
+    write_catalog(path, {"ETH": "new", "BTC": "added"})
+
+    assert catalog.get("ETH") == "new"
+    assert catalog.get("BTC") == "added"
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_readers_keep_their_mapping_until_they_check(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    write_catalog(path, {"ETH": "old"})
+    catalog = SharedCatalog(path, check_interval=3600)
+    assert catalog.get("ETH") == "old"
+
+    write_catalog(path, {"ETH": "new"})
+
+    assert catalog.get("ETH") == "old"
@@ -0,0 +1,27 @@
+from app.lib.tokens import count_message_tokens, count_tokens, fit_messages_to_budget
+
+
+def _message(role: str, words: int) -> dict:
+    return {"role": role, "content": " ".join(["token"] * words)}
+
+
+def test_count_tokens_handles_empty_text():
+    assert count_tokens("") == 0
+    assert count_tokens("hello world") > 0
+
+
+def test_count_message_tokens_accepts_structured_content():
+    assert count_message_tokens({"role": "assistant", "content": {"a": 1}}) > 0
+
+
+def test_fit_messages_keeps_newest_in_order():
+    messages = [_message("user", 50), _message("assistant", 50), _message("user", 5)]
+    budget = count_message_tokens(messages[1]) + count_message_tokens(messages[2])
+
+    assert fit_messages_to_budget(messages, budget) == messages[1:]
+
+
+def test_fit_messages_always_keeps_latest_message():
+    messages = [_message("user", 10), _message("user", 500)]
+
+    assert fit_messages_to_budget(messages, 5) == messages[-1:]
@@ -172,4 +172,56 @@ class TestDataAccessService:
         mock_instance.get_metadata.return_value = {"data": None}
 
         result = service.fetch_metadata(token_symbol="TEST")
-        assert result is None 
\ No newline at end of file
+        assert result is None 
+
+def test_fetch_metadata_by_catalog_id(service_with_mocked_client, mocker):
+    service, mock_instance = service_with_mocked_client
+    mocker.patch.object(
+        service.token_catalog,
+        "resolve",
+        return_value={"id": 1, "name": "Test Token", "symbol": "TEST", "contracts": {}},
+    )
+
+    result = service.fetch_metadata(token_query="test token")
+
+    assert result.data.symbol == "TEST"
+    mock_instance.get_metadata.assert_called_once_with({"id": 1})
+
+
+def test_fetch_metadata_by_fuzzy_match(service_with_mocked_client, mocker):
+    service, mock_instance = service_with_mocked_client
+    mocker.patch.object(service.token_catalog, "resolve", return_value=None)
+    search = mocker.patch.object(
+        service.token_catalog,
+        "search",
+        return_value=[{"id": 1, "name": "Test Token", "symbol": "TEST", "contracts": {}}],
+    )
+
+    result = service.fetch_metadata(token_query="tset token")
+
+    assert result.data.symbol == "TEST"
+    search.assert_called_once_with("tset token", limit=1, chain=None)
+    mock_instance.get_metadata.assert_called_once_with({"id": 1})
+
+
+def test_fetch_metadata_does_not_fuzzy_match_symbols(service_with_mocked_client, mocker):
+    service, mock_instance = service_with_mocked_client
+    mocker.patch.object(service.token_catalog, "resolve", return_value=None)
+    search = mocker.patch.object(service.token_catalog, "search")
+
+    service.fetch_metadata(token_symbol="TESTW")
+
+    search.assert_not_called()
+    mock_instance.get_metadata.assert_called_once_with({"symbol": "TESTW"})
+
+
+def test_fetch_metadata_fuzzy_match_keeps_symbol_check(service_with_mocked_client, mocker):
+    service, mock_instance = service_with_mocked_client
+    mocker.patch.object(service.token_catalog, "resolve", return_value=None)
+    mocker.patch.object(
+        service.token_catalog,
+        "search",
+        return_value=[{"id": 1, "name": "Test Token", "symbol": "TEST", "contracts": {}}],
+    )
+
+    assert service.fetch_metadata(token_query="tset token", token_symbol="TESTW") is None
@@ -0,0 +1,77 @@
+import pytest
+
+from app.core.config import settings
+from app.services.data_access.redis_connection_manager import (
+    RedisConnectionManager,
+    get_redis,
+)
+from app.services.message_service import MessageService
+from app.services.thread_service import ThreadService
+
+
+def test_clients_share_one_pool_per_decode_mode():
+    text_client = get_redis()
+    other_text_client = get_redis()
+    binary_client = get_redis(decode_responses=False)
+
+    assert text_client.connection_pool is other_text_client.connection_pool
+    assert binary_client.connection_pool is not text_client.connection_pool
+
+
+def test_pool_is_sized_and_configured_from_settings():
+    pool = get_redis().connection_pool
+
+    assert pool.max_connections == settings.REDIS_MAX_CONNECTIONS_PER_WORKER
+    assert (
+        pool.connection_kwargs["socket_timeout"]
+        == settings.REDIS_SOCKET_TIMEOUT_SECONDS
+    )
+    assert (
+        pool.connection_kwargs["health_check_interval"]
+        == settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS
+    )
+
+
+def test_storage_services_use_the_shared_pool():
+    pool = get_redis().connection_pool
+
+    assert ThreadService().redis.connection_pool is pool
+    assert MessageService().redis.connection_pool is pool
+
+
+@pytest.mark.asyncio
+async def test_health_check_reports_unreachable_redis(monkeypatch):
+    manager = RedisConnectionManager()
+
+    class UnreachableClient:
+        async def ping(self):
+            import redis.asyncio as redis
+
+            raise redis.ConnectionError("unreachable")
+
+    monkeypatch.setattr(manager, "get_client", lambda: UnreachableClient())
+
+    assert await manager.health_check() is False
+
+
+def new_manager():
+    # Bypass the singleton to build a manager from the current settings
+    return type.__call__(RedisConnectionManager)
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_shares_one_in_process_store(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "memory")
+    manager = new_manager()
+
+    await manager.get_client().set("key", "value")
+
+    assert await manager.get_client(decode_responses=False).get("key") == b"value"
+    assert await manager.health_check() is True
+
+
+def test_unknown_storage_backend_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "sqlite")
+
+    with pytest.raises(ValueError):
+        new_manager()
@@ -0,0 +1,130 @@
+import fcntl
+
+import pytest
+
+from app.models.token_symbols import CryptocurrencySymbol_Mobula
+from app.services.data_access.token_catalog import TokenCatalog
+
+MOBULA_RESPONSE = {
+    "data": [
+        {
+            "id": 1,
+            "name": "Ethereum",
+            "symbol": "ETH",
+            "market_cap": 4e11,
+            "blockchains": ["Ethereum", "Base"],
+            "contracts": ["0xeeee", "0x4200"],
+        },
+        {"id": 2, "name": "Bitcoin", "symbol": "BTC"},
+        {
+            "id": 3,
+            "name": "Ether Fork",
+            "symbol": "eth",
+            "blockchains": ["BNB Smart Chain (BEP20)"],
+            "contracts": ["0xbsc"],
+        },
+        {"id": 4, "name": "USD Coin", "symbol": "USDC"},
+        {"id": 5, "name": "Chainlink", "symbol": "LINK", "market_cap": 9e9},
+        {"id": 6, "name": "Etherium", "symbol": "ETHM", "market_cap": 1e4},
+    ]
+}
+
+
+@pytest.fixture
+def token_catalog(tmp_path, mocker):
+    catalog = type.__call__(TokenCatalog)
+    catalog.path = str(tmp_path / "catalog" / "tokens.bin")
+    catalog.catalog.path = catalog.path
+    catalog.catalog.check_interval = 0
+    catalog.mobula_client = mocker.Mock()
+    catalog.mobula_client.iter_all_cryptocurrencies.side_effect = lambda fields=None: (
+        CryptocurrencySymbol_Mobula.model_validate(token) for token in MOBULA_RESPONSE["data"]
+    )
+    return catalog
+
+
+@pytest.mark.asyncio
+async def test_refresh_builds_catalog(token_catalog):
+    assert token_catalog.get("ETH") == []
+
+    assert await token_catalog.refresh() is True
+
+    assert [token["name"] for token in token_catalog.get("eth")] == ["Ethereum", "Ether Fork"]
+    assert token_catalog.get("$BTC") == [
+        {"id": 2, "name": "Bitcoin", "symbol": "BTC", "contracts": {}, "market_cap": None}
+    ]
+    assert token_catalog.get_token(1)["contracts"] == {"Ethereum": "0xeeee", "Base": "0x4200"}
+    token_catalog.mobula_client.iter_all_cryptocurrencies.assert_called_once_with(
+        fields="contracts,blockchains,market_cap"
+    )
+
+
+@pytest.mark.asyncio
+async def test_fresh_catalog_is_not_rebuilt(token_catalog):
+    await token_catalog.refresh()
+
+    assert await token_catalog.refresh() is False
+    assert token_catalog.mobula_client.iter_all_cryptocurrencies.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_skipped_while_another_process_builds(token_catalog, tmp_path):
+    (tmp_path / "catalog").mkdir()
+    with open(f"{token_catalog.path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        # flock locks are per open file, so a second open contends like
+        # another process would
+        assert await token_catalog.refresh() is False
+
+    token_catalog.mobula_client.iter_all_cryptocurrencies.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_by_symbol_or_name(token_catalog):
+    await token_catalog.refresh()
+
+    assert token_catalog.resolve(symbol="btc")["id"] == 2
+    assert token_catalog.resolve(name="usd coin")["id"] == 4
+    assert token_catalog.resolve(name="USDCoin")["id"] == 4
+    # Models sometimes swap the two fields
+    assert token_catalog.resolve(symbol="Bitcoin")["id"] == 2
+    assert token_catalog.resolve(name="BTC")["id"] == 2
+    assert token_catalog.resolve(symbol="NOPE", name="Nope") is None
+
+
+@pytest.mark.asyncio
+async def test_resolve_narrows_shared_symbols(token_catalog):
+    await token_catalog.refresh()
+
+    # Neither name nor chain given: the largest market cap wins
+    assert token_catalog.resolve(symbol="ETH")["id"] == 1
+    assert token_catalog.resolve(symbol="ETH", name="Ethereum")["id"] == 1
+    assert token_catalog.resolve(symbol="ETH", chain="bnb smart chain (bep20)")["id"] == 3
+
+
+@pytest.mark.asyncio
+async def test_search_tolerates_misspellings(token_catalog):
+    await token_catalog.refresh()
+
+    assert token_catalog.search("chain link")[0]["id"] == 5
+    assert token_catalog.search("chainlnk")[0]["id"] == 5
+    assert token_catalog.search("bitcoinn")[0]["id"] == 2
+    assert token_catalog.search("zzzz") == []
+
+
+@pytest.mark.asyncio
+async def test_search_prefers_larger_market_cap(token_catalog):
+    await token_catalog.refresh()
+
+    # An obscure token spelled exactly like the typo loses to Ethereum
+    assert [token["id"] for token in token_catalog.search("etherium", limit=2)] == [1, 6]
+
+
+@pytest.mark.asyncio
+async def test_search_does_not_match_close_symbols(token_catalog):
+    await token_catalog.refresh()
+
+    # One character away from ETH or BTC is usually another token
+    assert token_catalog.search("ETHW") == []
+    assert token_catalog.search("BTCB") == []
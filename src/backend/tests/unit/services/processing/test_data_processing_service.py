@@ -0,0 +1,62 @@
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.core.deadline import Deadline, deadline_scope
+from app.services.processing.data_processing_service import DataProcessingService
+
+
+@pytest.fixture
+def data_processing_service():
+    with patch(
+        "app.services.processing.data_processing_service.DataAccessService"
+    ) as MockDataAccess:
+        das = MockDataAccess.return_value
+        metadata = Mock()
+        metadata.data.blockchains = ["Ethereum"]
+        metadata.model_dump.return_value = {"symbol": "ETH"}
+        das.fetch_metadata.return_value = metadata
+        das.fetch_ohlcv_data.return_value = {"ohlcv": [], "indicators": {"rsi": 50}}
+        das.fetch_sentiment_for_token.return_value = {"overall": "neutral"}
+        service = DataProcessingService()
+        yield service, das
+
+
+def test_fetch_without_deadline_returns_everything(data_processing_service):
+    service, _ = data_processing_service
+
+    result = service.fetch_token_data_and_process(token_symbol="ETH")
+
+    assert result["indicators"] == {"rsi": 50}
+    assert result["sentiments"] == {"overall": "neutral"}
+    assert result["degraded"] == []
+
+
+def test_fetch_skips_optional_sources_when_budget_is_low(data_processing_service):
+    service, das = data_processing_service
+
+    with deadline_scope(Deadline(0.5)):
+        result = service.fetch_token_data_and_process(token_symbol="ETH")
+
+    assert result["metadata"] == {"symbol": "ETH"}
+    assert result["indicators"] is None
+    assert result["sentiments"] is None
+    assert sorted(result["degraded"]) == ["ohlcv", "sentiment"]
+    das.fetch_ohlcv_data.assert_not_called()
+
+
+def test_fetch_truncates_slow_source_at_deadline(data_processing_service):
+    service, das = data_processing_service
+    das.fetch_sentiment_for_token.side_effect = lambda **_: time.sleep(1)
+
+    with patch(
+        "app.services.processing.data_processing_service.settings"
+    ) as mock_settings:
+        mock_settings.OHLCV_MIN_BUDGET_SECONDS = 0
+        mock_settings.SENTIMENT_MIN_BUDGET_SECONDS = 0
+        with deadline_scope(Deadline(0.2)):
+            result = service.fetch_token_data_and_process(token_symbol="ETH")
+
+    assert result["indicators"] == {"rsi": 50}
+    assert result["degraded"] == ["sentiment"]
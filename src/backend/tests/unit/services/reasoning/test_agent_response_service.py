@@ -0,0 +1,95 @@
+import json
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from openai.types.responses import ResponseFunctionToolCall
+
+from app.services.reasoning.agent_response_service import AgentResponseService
+from app.services.reasoning.constants import FUNCTION_CALL_TYPE, MAX_TOOL_ITERATIONS
+
+
+def _function_call(call_id: str, assets: list) -> ResponseFunctionToolCall:
+    return ResponseFunctionToolCall(
+        type=FUNCTION_CALL_TYPE,
+        name="get_crypto_data_market_indicators_sentiments",
+        arguments=json.dumps({"assets": assets}),
+        call_id=call_id,
+    )
+
+
+def _response(*items):
+    return Mock(output=list(items), output_text="final answer")
+
+
+@pytest.fixture
+def service():
+    module = "app.services.reasoning.agent_response_service"
+    with patch(f"{module}.OpenAiAPIClient"), patch(f"{module}.DataAccessService"), patch(
+        f"{module}.DataProcessingService"
+    ), patch(f"{module}.TechnicalAnalysisService"), patch(f"{module}.ToolsService"):
+        yield AgentResponseService()
+
+
+@pytest.mark.asyncio
+async def test_respond_runs_tool_calls_concurrently(service):
+    service.client.generate_tool_response.side_effect = [
+        _response(_function_call("a", ["BTC"]), _function_call("b", ["ETH"])),
+        _response(),
+    ]
+
+    def slow_tool(function_call):
+        time.sleep(0.3)
+        return [{"asset": json.loads(function_call.arguments)["assets"][0]}]
+
+    service.tools_service.run_tool.side_effect = slow_tool
+
+    started = time.monotonic()
+    response, messages, asset_data = await service.respond([])
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.55
+    assert response.output_text == "final answer"
+    assert service.client.generate_tool_response.call_count == 2
+    assert [m["call_id"] for m in messages if isinstance(m, dict)] == ["a", "b"]
+    assert asset_data == [{"asset": "ETH"}]
+
+
+@pytest.mark.asyncio
+async def test_respond_reports_tool_errors_to_the_model(service):
+    service.client.generate_tool_response.side_effect = [
+        _response(_function_call("a", ["BTC"])),
+        _response(),
+    ]
+    service.tools_service.run_tool.side_effect = ValueError("upstream down")
+
+    _, messages, asset_data = await service.respond([])
+
+    assert json.loads(messages[-1]["output"]) == {"error": "upstream down"}
+    assert asset_data is None
+
+
+@pytest.mark.asyncio
+async def test_respond_bounds_tool_iterations(service):
+    service.client.generate_tool_response.side_effect = lambda **_: _response(
+        _function_call("a", ["BTC"])
+    )
+    service.tools_service.run_tool.return_value = []
+
+    await service.respond([])
+
+    assert service.client.generate_tool_response.call_count == MAX_TOOL_ITERATIONS + 1
+    service.client.generate_response.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_respond_keeps_model_messages_from_tool_turns(service):
+    note = Mock(type="message")
+    call = _function_call("a", ["BTC"])
+    service.client.generate_tool_response.side_effect = [_response(note, call), _response()]
+    service.tools_service.run_tool.return_value = []
+
+    _, messages, _ = await service.respond([])
+
+    assert messages[:2] == [note, call]
+    assert messages[2]["call_id"] == "a"
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+import redis.asyncio as redis
+
+from app.core.metrics import metrics
+from app.services.cache_invalidation_bus import CacheInvalidationBus
+
+
+def new_bus(client):
+    # Each bus stands in for one worker process
+    bus = type.__call__(CacheInvalidationBus)
+    bus.redis = client
+    return bus
+
+
+async def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def listening_bus(mock_redis):
+    bus = new_bus(mock_redis)
+    task = asyncio.create_task(bus.run(poll_interval=0.01))
+    await wait_until(lambda: bus.listening)
+    yield bus
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_invalidation_reaches_other_workers(mock_redis, listening_bus):
+    other = new_bus(mock_redis)
+    other.cache("sessions", fallback_ttl=30)
+    cache = listening_bus.cache("sessions", fallback_ttl=30)
+    cache.set("s1", {"wallet": "0xabc"})
+    cache.set("s2", {"wallet": "0xdef"})
+
+    await other.invalidate("sessions", "s1")
+
+    await wait_until(lambda: "s1" not in cache)
+    assert cache.get("s2") == {"wallet": "0xdef"}
+
+
+@pytest.mark.asyncio
+async def test_entries_live_longer_while_listening(mock_redis, listening_bus):
+    cache = listening_bus.cache("sessions", fallback_ttl=30, ttl=300)
+    idle = new_bus(mock_redis).cache("sessions", fallback_ttl=30, ttl=300)
+
+    cache.set("s1", "data")
+    idle.set("s1", "data")
+
+    assert cache._entries["s1"][1] - time.monotonic() > 200
+    assert idle._entries["s1"][1] - time.monotonic() <= 30
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_not_cached(mock_redis):
+    bus = new_bus(mock_redis)
+    cache = bus.cache("sessions", fallback_ttl=30)
+
+    version = cache.version()
+    await bus.invalidate("sessions", "s1")
+
+    assert cache.set("s1", "stale", version) is False
+    assert cache.get("s1") is None
+    assert cache.set("s1", "fresh", cache.version()) is True
+
+
+@pytest.mark.asyncio
+async def test_publish_failure_still_evicts_locally(mock_redis):
+    class UnreachableClient:
+        async def publish(self, channel, message):
+            raise redis.ConnectionError("unreachable")
+
+    bus = new_bus(UnreachableClient())
+    cache = bus.cache("sessions", fallback_ttl=30)
+    cache.set("s1", "data")
+    failures = metrics.get("cache_invalidation.publish_failed")
+
+    await bus.invalidate("sessions", "s1")
+
+    assert cache.get("s1") is None
+    assert metrics.get("cache_invalidation.publish_failed") == failures + 1
+
+
+def test_cache_is_bounded(mock_redis):
+    cache = new_bus(mock_redis).cache("sessions", fallback_ttl=30, max_entries=2)
+
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+
+    assert "a" not in cache
+    assert cache.get("b") == "b" and cache.get("c") == "c"
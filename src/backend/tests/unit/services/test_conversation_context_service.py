@@ -0,0 +1,87 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.lib.tokens import count_message_tokens
+from app.services.conversation_context_service import ConversationContextService
+
+
+@pytest.fixture
+def context_service(thread_service):
+    with patch(
+        "app.services.conversation_context_service.OpenAiAPIClient"
+    ) as MockClient:
+        MockClient.return_value.query.return_value = Mock(content="user asked about ETH")
+        ConversationContextService._instances.pop(ConversationContextService, None)
+        service = ConversationContextService()
+        service.thread_service = thread_service
+        yield service
+    ConversationContextService._instances.pop(ConversationContextService, None)
+
+
+async def _fill_thread(thread_service, turns: int) -> str:
+    thread_id = await thread_service.create_thread(
+        user_id="0xabc", initial_message="hi"
+    )
+    for i in range(turns):
+        await thread_service.add_message(thread_id, "assistant", "word " * 40)
+        await thread_service.add_message(thread_id, "user", f"question {i} " * 10)
+    return thread_id
+
+
+@pytest.mark.asyncio
+async def test_short_thread_is_sent_verbatim(context_service, thread_service):
+    thread_id = await _fill_thread(thread_service, 1)
+
+    context = await context_service.build_thread_context(thread_id)
+
+    assert context == await thread_service.get_thread_messages(thread_id)
+    context_service.client.query.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_long_thread_is_compacted_within_budget(context_service, thread_service):
+    context_service.token_budget = 300
+    thread_id = await _fill_thread(thread_service, 20)
+
+    context = await context_service.build_thread_context(thread_id)
+
+    assert context[0]["role"] == "system"
+    assert "user asked about ETH" in context[0]["content"]
+    assert sum(count_message_tokens(m) for m in context) <= 300
+    assert context[-1] == (await thread_service.get_thread_messages(thread_id))[-1]
+    summary = await thread_service.get_thread_summary(thread_id)
+    assert summary["message_count"] > 0
+
+
+@pytest.mark.asyncio
+async def test_summary_is_reused_until_budget_is_exceeded_again(
+    context_service, thread_service
+):
+    context_service.token_budget = 300
+    thread_id = await _fill_thread(thread_service, 20)
+    await context_service.build_thread_context(thread_id)
+    context_service.client.query.reset_mock()
+
+    await thread_service.add_message(thread_id, "user", "and BTC?")
+    await context_service.build_thread_context(thread_id)
+
+    context_service.client.query.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_summarized_messages_are_not_read(context_service, thread_service, mocker):
+    context_service.token_budget = 300
+    thread_id = await _fill_thread(thread_service, 20)
+    await context_service.build_thread_context(thread_id)
+    summarized_count = (await thread_service.get_thread_summary(thread_id))["message_count"]
+    decode = mocker.spy(thread_service, "_decode_message")
+
+    await context_service.build_thread_context(thread_id)
+
+    assert decode.call_count == 41 - summarized_count
+
+
+@pytest.mark.asyncio
+async def test_missing_thread_returns_none(context_service):
+    assert await context_service.build_thread_context("missing") is None
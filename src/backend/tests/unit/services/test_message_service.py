@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.message_service import MessageService
+
+
+@pytest.fixture
+def message_service(mock_redis, mock_binary_redis):
+    service = MessageService()
+    original = dict(vars(service))
+    service.redis = mock_redis
+    service.binary_redis = mock_binary_redis
+    yield service
+    vars(service).update(original)
+
+
+@pytest.mark.asyncio
+async def test_save_message_appends_and_updates_context(message_service):
+    await message_service.save_message("0xabc", "s1", "price of ETH?", "user")
+    await message_service.save_message(
+        "0xabc",
+        "s1",
+        "ETH is up",
+        "assistant",
+        metadata={"token_symbol": "ETH", "chain": "ethereum"},
+    )
+
+    history = await message_service.get_session_history("s1")
+    assert [m["content"] for m in history] == ["price of ETH?", "ETH is up"]
+    context = await message_service.get_session_context("s1")
+    assert context["last_token"] == "ETH"
+    assert context["last_chain"] == "ethereum"
+    assert context["last_contract_address"] is None
+    assert await message_service.get_wallet_sessions("0xabc") == ["s1"]
+
+
+@pytest.mark.asyncio
+async def test_history_is_trimmed_server_side(message_service):
+    message_service.max_context_messages = 3
+    try:
+        for i in range(5):
+            await message_service.save_message("0xabc", "s1", f"m{i}", "user")
+    finally:
+        message_service.max_context_messages = 20
+
+    assert await message_service.redis.llen("messages:session:s1:messages") == 3
+    history = await message_service.get_session_history("s1")
+    assert [m["content"] for m in history] == ["m2", "m3", "m4"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_are_not_lost(message_service):
+    await asyncio.gather(
+        *(
+            message_service.save_message("0xabc", "s1", f"m{i}", "user")
+            for i in range(10)
+        )
+    )
+
+    assert len(await message_service.get_session_history("s1")) == 10
+
+
+@pytest.mark.asyncio
+async def test_legacy_blob_is_migrated_on_read(message_service):
+    legacy = {
+        "wallet_address": "0xabc",
+        "session_id": "s1",
+        "messages": [{"content": "old", "role": "user", "metadata": {}}],
+        "last_updated": "2025-01-01T00:00:00",
+        "context": {"last_token": "SOL", "last_chain": "solana"},
+    }
+    await message_service.redis.set("messages:session:s1", json.dumps(legacy))
+    await message_service.save_message("0xabc", "s1", "new", "user")
+
+    history = await message_service.get_session_history("s1")
+
+    assert [m["content"] for m in history] == ["old", "new"]
+    assert (await message_service.get_session_context("s1"))["last_token"] == "SOL"
+    assert not await message_service.redis.exists("messages:session:s1")
+    assert [m["content"] for m in await message_service.get_session_history("s1")] == [
+        "old",
+        "new",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_clear_session_history(message_service):
+    await message_service.save_message("0xabc", "s1", "hi", "user")
+
+    await message_service.clear_session_history("s1")
+
+    assert await message_service.get_session_history("s1") == []
+    assert await message_service.get_session_context("s1") == {}
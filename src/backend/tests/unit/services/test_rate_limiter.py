@@ -0,0 +1,65 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def rate_limiter(mock_rate_limiter):
+    original = (dict(mock_rate_limiter.rate_limits), mock_rate_limiter.local_chunk_size)
+    mock_rate_limiter._local_quota.clear()
+    yield mock_rate_limiter
+    mock_rate_limiter.rate_limits, mock_rate_limiter.local_chunk_size = original
+    mock_rate_limiter._local_quota.clear()
+
+
+@pytest.mark.asyncio
+async def test_rejects_requests_over_the_limit(rate_limiter):
+    for _ in range(5):
+        await rate_limiter.check_rate_limit("0xabc", "auth")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await rate_limiter.check_rate_limit("0xabc", "auth")
+
+    assert exc_info.value.status_code == 429
+    await rate_limiter.check_rate_limit("0xdef", "auth")
+
+
+@pytest.mark.asyncio
+async def test_check_is_one_round_trip(rate_limiter, mocker):
+    await rate_limiter.check_rate_limit("0xabc", "api")
+    execute_command = mocker.spy(rate_limiter.redis, "execute_command")
+
+    await rate_limiter.check_rate_limit("0xabc", "api")
+
+    assert execute_command.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_local_quota_serves_checks_in_process(rate_limiter, mocker):
+    rate_limiter.local_chunk_size = 10
+    execute_command = mocker.spy(rate_limiter.redis, "execute_command")
+
+    for _ in range(10):
+        await rate_limiter.check_rate_limit("0xabc", "api")
+
+    # One reservation (EVALSHA miss, SCRIPT LOAD, EVALSHA) covers ten checks
+    assert execute_command.call_count <= 3
+    assert await rate_limiter.redis.zcard("rate_limit:api:0xabc") == 10
+
+
+@pytest.mark.asyncio
+async def test_local_quota_respects_the_global_limit(rate_limiter):
+    rate_limiter.local_chunk_size = 10
+    other_worker = RateLimiter.__new__(RateLimiter)
+    vars(other_worker).update(vars(rate_limiter), _local_quota={})
+
+    allowed = 0
+    for limiter in [rate_limiter, other_worker] * 60:
+        try:
+            await limiter.check_rate_limit("0xabc", "api")
+            allowed += 1
+        except HTTPException:
+            pass
+
+    assert allowed == 100
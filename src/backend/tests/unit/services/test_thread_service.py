@@ -0,0 +1,385 @@
+import json
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_create_thread_stores_thread_and_initial_message(thread_service):
+    thread_id = await thread_service.create_thread("0xabc", initial_message="hello")
+
+    thread = await thread_service.get_thread(thread_id)
+    assert thread["user_id"] == "0xabc"
+    assert thread["message_count"] == "1"
+    assert [m["content"] for m in thread["messages"]] == ["hello"]
+    assert await thread_service.redis.sismember("user:0xabc:threads", thread_id)
+
+
+@pytest.mark.asyncio
+async def test_add_message_appends_and_updates_metadata(thread_service):
+    thread_id = await thread_service.create_thread("0xabc")
+
+    await thread_service.add_message(thread_id, "user", "hi")
+    await thread_service.add_message(thread_id, "assistant", "hello")
+
+    thread = await thread_service.get_thread(thread_id)
+    assert thread["message_count"] == "2"
+    assert await thread_service.get_thread_messages(thread_id) == [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
+    thread = await thread_service.get_thread(thread_id)
+    assert thread["messages"][0]["thread_id"] == thread_id
+    assert len(thread["messages"][0]["id"]) == 36
+
+
+@pytest.mark.asyncio
+async def test_add_message_is_a_single_round_trip(thread_service, mocker):
+    thread_id = await thread_service.create_thread("0xabc")
+    await thread_service.add_message(thread_id, "user", "loads the script")
+    execute_command = mocker.spy(thread_service.redis, "execute_command")
+
+    await thread_service.add_message(thread_id, "user", "hi")
+
+    assert execute_command.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_thread_removes_all_keys(thread_service):
+    thread_id = await thread_service.create_thread("0xabc", initial_message="hello")
+    await thread_service.set_thread_summary(thread_id, "summary", 1)
+
+    assert await thread_service.delete_thread(thread_id) is True
+
+    assert await thread_service.redis.keys("thread:*") == []
+    assert not await thread_service.redis.sismember("user:0xabc:threads", thread_id)
+    assert await thread_service.get_thread_messages(thread_id) is None
+
+
+@pytest.mark.asyncio
+async def test_delete_missing_thread(thread_service):
+    assert await thread_service.delete_thread("missing") is False
+
+
+async def _thread_with_messages(thread_service, count):
+    thread_id = await thread_service.create_thread("0xabc")
+    for i in range(count):
+        await thread_service.add_message(thread_id, "user", f"m{i}")
+    return thread_id
+
+
+@pytest.mark.asyncio
+async def test_get_thread_page_newest_first(thread_service):
+    thread_id = await _thread_with_messages(thread_service, 5)
+
+    page = await thread_service.get_thread_page(thread_id, limit=2)
+    assert [m["content"] for m in page["messages"]] == ["m4", "m3"]
+    assert page["total"] == 5
+
+    page = await thread_service.get_thread_page(
+        thread_id, limit=2, cursor=page["next_cursor"]
+    )
+    assert [m["content"] for m in page["messages"]] == ["m2", "m1"]
+
+    page = await thread_service.get_thread_page(
+        thread_id, limit=2, cursor=page["next_cursor"]
+    )
+    assert [m["content"] for m in page["messages"]] == ["m0"]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_thread_page_cursor_is_stable_across_appends(thread_service):
+    thread_id = await _thread_with_messages(thread_service, 4)
+    first = await thread_service.get_thread_page(thread_id, limit=2)
+
+    await thread_service.add_message(thread_id, "assistant", "new")
+    page = await thread_service.get_thread_page(
+        thread_id, limit=2, cursor=first["next_cursor"]
+    )
+
+    assert [m["content"] for m in page["messages"]] == ["m1", "m0"]
+
+
+@pytest.mark.asyncio
+async def test_get_thread_page_oldest_first(thread_service):
+    thread_id = await _thread_with_messages(thread_service, 3)
+
+    page = await thread_service.get_thread_page(thread_id, limit=2, newest_first=False)
+    assert [m["content"] for m in page["messages"]] == ["m0", "m1"]
+
+    page = await thread_service.get_thread_page(
+        thread_id, limit=2, cursor=page["next_cursor"], newest_first=False
+    )
+    assert [m["content"] for m in page["messages"]] == ["m2"]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_thread_page_missing_thread(thread_service):
+    assert await thread_service.get_thread_page("missing", limit=10) is None
+
+
+@pytest.mark.asyncio
+async def test_get_user_threads_pages_by_recent_activity(thread_service):
+    first = await thread_service.create_thread("0xabc", initial_message="first")
+    second = await thread_service.create_thread("0xabc", initial_message="second")
+    third = await thread_service.create_thread("0xabc", initial_message="third")
+    await thread_service.add_message(first, "user", "bump")
+
+    page = await thread_service.get_user_threads("0xabc", limit=2)
+    assert [t["id"] for t in page["threads"]] == [first, third]
+
+    page = await thread_service.get_user_threads(
+        "0xabc", limit=2, cursor=page["next_cursor"]
+    )
+    assert [t["id"] for t in page["threads"]] == [second]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_user_threads_pages_through_tied_scores(thread_service):
+    thread_ids = [await thread_service.create_thread("0xabc") for _ in range(5)]
+    # Threads updated within the same clock tick share a score
+    await thread_service.redis.zadd(
+        "user:0xabc:threads:by_updated", {thread_id: 1000 for thread_id in thread_ids}
+    )
+
+    listed = []
+    page = await thread_service.get_user_threads("0xabc", limit=2)
+    listed += [t["id"] for t in page["threads"]]
+    while page["next_cursor"]:
+        page = await thread_service.get_user_threads(
+            "0xabc", limit=2, cursor=page["next_cursor"]
+        )
+        listed += [t["id"] for t in page["threads"]]
+
+    assert listed == sorted(thread_ids, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_get_user_threads_backfills_index(thread_service):
+    for thread_id, updated_at in [("old", "2025-01-01T00:00:00"), ("new", "2025-02-01T00:00:00")]:
+        await thread_service.redis.hset(
+            f"thread:{thread_id}",
+            mapping={"id": thread_id, "user_id": "0xabc", "updated_at": updated_at},
+        )
+        await thread_service.redis.sadd("user:0xabc:threads", thread_id)
+
+    page = await thread_service.get_user_threads("0xabc")
+
+    assert [t["id"] for t in page["threads"]] == ["new", "old"]
+    assert await thread_service.redis.zcard("user:0xabc:threads:by_updated") == 2
+
+
+@pytest.mark.asyncio
+async def test_legacy_threads_are_listed_next_to_new_ones(thread_service, mocker):
+    for i in range(3):
+        await thread_service.redis.hset(
+            f"thread:legacy{i}",
+            mapping={
+                "id": f"legacy{i}",
+                "user_id": "0xabc",
+                "updated_at": f"2025-01-0{i + 1}T00:00:00",
+            },
+        )
+        await thread_service.redis.sadd("user:0xabc:threads", f"legacy{i}")
+    thread_id = await thread_service.create_thread("0xabc")
+    backfill = mocker.spy(thread_service, "_backfill_threads_index")
+
+    page = await thread_service.get_user_threads("0xabc")
+    await thread_service.get_user_threads("0xabc")
+
+    assert [t["id"] for t in page["threads"]] == [thread_id, "legacy2", "legacy1", "legacy0"]
+    assert backfill.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_deleted_threads_leave_the_index(thread_service):
+    thread_id = await thread_service.create_thread("0xabc")
+
+    await thread_service.delete_thread(thread_id)
+
+    assert await thread_service.get_user_threads("0xabc") == {
+        "threads": [],
+        "next_cursor": None,
+    }
+    assert await thread_service.redis.keys("*") == []
+
+
+@pytest.mark.asyncio
+async def test_legacy_json_messages_are_readable(thread_service):
+    thread_id = await thread_service.create_thread("0xabc")
+    legacy = {"id": "1", "thread_id": thread_id, "role": "user", "content": "old"}
+    await thread_service.redis.rpush(f"thread:{thread_id}:messages", json.dumps(legacy))
+    await thread_service.add_message(thread_id, "assistant", {"report": "new"})
+
+    assert await thread_service.get_thread_messages(thread_id) == [
+        {"role": "user", "content": "old"},
+        {"role": "assistant", "content": {"report": "new"}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_idle_threads_are_archived_and_evicted(thread_service, archive_store):
+    thread_id = await thread_service.create_thread("0xabc", initial_message="hello")
+    await thread_service.set_thread_summary(thread_id, "greeting", 1)
+
+    assert await thread_service.archive_idle_threads(idle_seconds=0) == 1
+
+    assert thread_id in archive_store.rows
+    assert not await thread_service.redis.exists(f"thread:{thread_id}:messages")
+    assert not await thread_service.redis.exists(f"thread:{thread_id}:summary")
+    assert await thread_service.redis.hget(f"thread:{thread_id}", "archived") == "1"
+    page = await thread_service.get_user_threads("0xabc")
+    assert [t["id"] for t in page["threads"]] == [thread_id]
+
+
+@pytest.mark.asyncio
+async def test_legacy_thread_without_updated_at_is_skipped(thread_service, archive_store):
+    legacy = await thread_service.create_thread("0xabc", initial_message="old")
+    await thread_service.redis.hdel(f"thread:{legacy}", "updated_at")
+    thread_id = await thread_service.create_thread("0xabc", initial_message="hello")
+
+    assert await thread_service.archive_idle_threads(idle_seconds=0) == 1
+
+    assert list(archive_store.rows) == [thread_id]
+    assert await thread_service.redis.exists(f"thread:{legacy}:messages")
+    assert await thread_service.redis.zscore("threads:by_updated", legacy) is None
+
+
+@pytest.mark.asyncio
+async def test_recent_threads_are_not_archived(thread_service, archive_store):
+    await thread_service.create_thread("0xabc", initial_message="hello")
+
+    assert await thread_service.archive_idle_threads(idle_seconds=3600) == 0
+    assert archive_store.rows == {}
+
+
+@pytest.mark.asyncio
+async def test_archived_thread_rehydrates_on_read(thread_service, archive_store):
+    thread_id = await thread_service.create_thread("0xabc", initial_message="hello")
+    await thread_service.set_thread_summary(thread_id, "greeting", 1)
+    await thread_service.archive_idle_threads(idle_seconds=0)
+
+    assert await thread_service.get_thread_messages(thread_id) == [
+        {"role": "user", "content": "hello"}
+    ]
+    assert (await thread_service.get_thread_summary(thread_id))["text"] == "greeting"
+    assert await thread_service.redis.hget(f"thread:{thread_id}", "archived") is None
+
+
+@pytest.mark.asyncio
+async def test_rehydrated_thread_is_not_archived_again_right_away(thread_service, archive_store):
+    thread_id = await thread_service.create_thread("0xabc", initial_message="hello")
+    # Last updated long ago
+    await thread_service.redis.hset(f"thread:{thread_id}", "updated_at", "2025-01-01T00:00:00")
+    await thread_service.redis.zadd("threads:by_updated", {thread_id: 0})
+    assert await thread_service.archive_idle_threads(idle_seconds=3600) == 1
+
+    await thread_service.get_thread(thread_id)
+
+    assert await thread_service.archive_idle_threads(idle_seconds=3600) == 0
+    assert await thread_service.redis.hget(f"thread:{thread_id}", "archived") is None
+    assert await thread_service.archive_idle_threads(idle_seconds=0) == 1
+
+
+@pytest.mark.asyncio
+async def test_add_message_to_archived_thread_keeps_order(thread_service, archive_store):
+    thread_id = await thread_service.create_thread("0xabc", initial_message="first")
+    await thread_service.archive_idle_threads(idle_seconds=0)
+
+    await thread_service.add_message(thread_id, "assistant", "second")
+
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert [m["content"] for m in messages] == ["first", "second"]
+    thread = await thread_service.get_thread(thread_id)
+    assert thread["message_count"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_delete_archived_thread_drops_archive(thread_service, archive_store):
+    thread_id = await thread_service.create_thread("0xabc", initial_message="hello")
+    await thread_service.archive_idle_threads(idle_seconds=0)
+
+    assert await thread_service.delete_thread(thread_id) is True
+    assert archive_store.rows == {}
+
+
+def _answer(symbol, price):
+    return {
+        "query": f"What about {symbol}?",
+        "metadata": {"symbol": symbol, "investors": ["a16z", "Paradigm"], "price": price},
+        "insight": {"report": f"{symbol} report"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_repeated_metadata_is_stored_once(thread_service):
+    thread_id = await thread_service.create_thread("0xabc")
+    for _ in range(10):
+        await thread_service.add_message(thread_id, "assistant", _answer("ETH", 3000))
+    await thread_service.add_message(thread_id, "assistant", _answer("BTC", 60000))
+
+    assert len(await thread_service.redis.keys("snapshot:*")) == 2
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert [m["content"] for m in messages] == [_answer("ETH", 3000)] * 10 + [
+        _answer("BTC", 60000)
+    ]
+    page = await thread_service.get_thread_page(thread_id, limit=1)
+    assert page["messages"][0]["content"] == _answer("BTC", 60000)
+
+
+@pytest.mark.asyncio
+async def test_missing_snapshot_reads_as_none(thread_service):
+    thread_id = await thread_service.create_thread("0xabc")
+    await thread_service.add_message(thread_id, "assistant", _answer("ETH", 3000))
+    await thread_service.redis.delete(*await thread_service.redis.keys("snapshot:*"))
+
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert messages[0]["content"]["metadata"] is None
+    assert messages[0]["content"]["insight"] == {"report": "ETH report"}
+
+
+@pytest.mark.asyncio
+async def test_archived_thread_keeps_its_snapshots(thread_service, archive_store):
+    thread_id = await thread_service.create_thread("0xabc", initial_message="hello")
+    await thread_service.add_message(thread_id, "assistant", _answer("ETH", 3000))
+    await thread_service.archive_idle_threads(idle_seconds=0)
+    # No live thread references the snapshot any more
+    assert await thread_service.redis.keys("snapshot*") == []
+
+    messages = await thread_service.get_thread_messages(thread_id)
+
+    assert messages[1]["content"] == _answer("ETH", 3000)
+    await thread_service.delete_thread(thread_id)
+    assert await thread_service.redis.keys("snapshot*") == []
+
+
+@pytest.mark.asyncio
+async def test_snapshots_do_not_expire(thread_service):
+    thread_id = await thread_service.create_thread("0xabc")
+    await thread_service.add_message(thread_id, "assistant", _answer("ETH", 3000))
+
+    (key,) = await thread_service.redis.keys("snapshot:*")
+    assert await thread_service.redis.ttl(key) == -1
+
+
+@pytest.mark.asyncio
+async def test_shared_snapshot_outlives_one_thread(thread_service, archive_store):
+    kept = await thread_service.create_thread("0xabc")
+    deleted = await thread_service.create_thread("0xabc")
+    archived = await thread_service.create_thread("0xdef")
+    for thread_id in (kept, deleted, archived):
+        await thread_service.add_message(thread_id, "assistant", _answer("ETH", 3000))
+    await thread_service.add_message(kept, "assistant", _answer("ETH", 3000))
+
+    await thread_service.delete_thread(deleted)
+    await thread_service.redis.zrem("threads:by_updated", kept)
+    await thread_service.archive_idle_threads(idle_seconds=0)
+
+    messages = await thread_service.get_thread_messages(kept)
+    assert [m["content"] for m in messages] == [_answer("ETH", 3000)] * 2
+    await thread_service.delete_thread(kept)
+    assert await thread_service.redis.keys("snapshot*") == []
+    messages = await thread_service.get_thread_messages(archived)
+    assert messages[0]["content"] == _answer("ETH", 3000)
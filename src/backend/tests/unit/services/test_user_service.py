@@ -0,0 +1,67 @@
+import pytest
+
+from app.models.user import User
+from app.services.user_service import UserService
+
+
+@pytest.fixture
+def user_service(mock_redis, mock_binary_redis):
+    service = UserService()
+    service.redis_service.redis_client = mock_redis
+    service.redis_service.binary_client = mock_binary_redis
+    return service
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_email_uses_index(user_service):
+    await user_service.create_user("0xabc", "s1", email="Alice@Example.com")
+
+    user = await user_service.get_user_by_email("alice@example.com")
+
+    assert user.wallet_address == "0xabc"
+    assert await user_service.redis_service.redis_client.get(
+        "user_email:alice@example.com"
+    ) == "0xabc"
+
+
+@pytest.mark.asyncio
+async def test_update_user_email_moves_index_entry(user_service):
+    await user_service.create_user("0xabc", "s1", email="old@example.com")
+
+    await user_service.update_user_email("0xabc", "new@example.com")
+
+    assert await user_service.get_user_by_email("old@example.com") is None
+    assert (await user_service.get_user_by_email("new@example.com")).wallet_address == "0xabc"
+
+
+@pytest.mark.asyncio
+async def test_email_taken_over_by_another_user_is_not_removed(user_service):
+    await user_service.create_user("0xabc", "s1", email="shared@example.com")
+    await user_service.create_user("0xdef", "s2", email="shared@example.com")
+
+    await user_service.update_user_email("0xabc", "mine@example.com")
+
+    assert (await user_service.get_user_by_email("shared@example.com")).wallet_address == "0xdef"
+
+
+@pytest.mark.asyncio
+async def test_delete_user_removes_index_entry(user_service):
+    await user_service.create_user("0xabc", "s1", email="alice@example.com")
+
+    await user_service.delete_user("0xabc")
+
+    assert await user_service.redis_service.redis_client.keys("user_email:*") == []
+
+
+@pytest.mark.asyncio
+async def test_backfill_email_index(user_service):
+    redis_client = user_service.redis_service.redis_client
+    for wallet, email in [("0xabc", "a@example.com"), ("0xdef", None)]:
+        user = User(wallet_address=wallet, email=email, session_id="s")
+        await redis_client.set(f"user:{wallet}", user.model_dump_json())
+    await redis_client.sadd("user:0xabc:threads", "t1")
+
+    assert await user_service.backfill_email_index(batch_size=1) == 1
+    assert await user_service.backfill_email_index() == 0
+
+    assert (await user_service.get_user_by_email("a@example.com")).wallet_address == "0xabc"
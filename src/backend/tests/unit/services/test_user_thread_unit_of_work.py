@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def user_service(unit_of_work):
+    return unit_of_work().user_service
+
+
+def contents(messages):
+    return [(m["role"], m["content"]) for m in messages]
+
+
+@pytest.mark.asyncio
+async def test_new_thread_is_written_on_exit(unit_of_work, user_service, thread_service):
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("What is ETH doing?")
+        assert await thread_service.get_thread(thread_id) is None
+        uow.record_response(thread_id, "resp_1")
+        assert uow.add_message(thread_id, "assistant", {"report": "up"})
+
+    user = await user_service.get_user("0xabc")
+    assert user.thread.thread_id == thread_id
+    assert user.thread.last_response_id == "resp_1"
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert contents(messages) == [
+        ("user", "What is ETH doing?"),
+        ("assistant", {"report": "up"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_existing_thread_appends_in_order(unit_of_work, user_service, thread_service):
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("first")
+        uow.add_message(thread_id, "assistant", "one")
+
+    async with unit_of_work() as uow:
+        assert uow.open_thread("second", thread_id) == thread_id
+        uow.add_message(thread_id, "assistant", "two")
+
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert contents(messages) == [
+        ("user", "first"),
+        ("assistant", "one"),
+        ("user", "second"),
+        ("assistant", "two"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_messages_for_other_threads_are_ignored(unit_of_work, user_service, thread_service):
+    async with unit_of_work() as uow:
+        uow.open_thread("first")
+        assert not uow.add_message("someone-elses-thread", "assistant", "no")
+
+    assert await thread_service.get_thread("someone-elses-thread") is None
+
+
+@pytest.mark.asyncio
+async def test_archived_thread_is_restored_before_append(
+    unit_of_work, user_service, thread_service, archive_store
+):
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("first")
+    assert await thread_service.archive_idle_threads(idle_seconds=0) == 1
+
+    async with unit_of_work() as uow:
+        uow.open_thread("second", thread_id)
+        uow.add_message(thread_id, "assistant", "answer")
+
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert contents(messages) == [
+        ("user", "first"),
+        ("user", "second"),
+        ("assistant", "answer"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_keeps_prompt(unit_of_work, user_service, thread_service):
+    with pytest.raises(asyncio.CancelledError):
+        async with unit_of_work() as uow:
+            thread_id = uow.open_thread("hello")
+            raise asyncio.CancelledError()
+
+    assert (await user_service.get_user("0xabc")).thread.thread_id == thread_id
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert contents(messages) == [("user", "hello")]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_email_change_is_kept(unit_of_work, user_service, thread_service):
+    async with unit_of_work() as uow:
+        uow.open_thread("first")
+    user = await user_service.get_user("0xabc")
+    user.email = "old@example.com"
+    await user_service.update_user(user)
+
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("second")
+        # Another request changes the email while this one runs
+        user = await user_service.get_user("0xabc")
+        user.email = "new@example.com"
+        await user_service.update_user(user)
+
+    stored = await user_service.get_user("0xabc")
+    assert stored.email == "new@example.com"
+    assert stored.thread.thread_id == thread_id
+    assert await thread_service.redis.get("user_email:old@example.com") is None
+    assert await thread_service.redis.get("user_email:new@example.com") == "0xabc"
+
+
+@pytest.mark.asyncio
+async def test_failed_request_keeps_prompt(unit_of_work, user_service, thread_service):
+    with pytest.raises(RuntimeError):
+        async with unit_of_work() as uow:
+            thread_id = uow.open_thread("hello")
+            raise RuntimeError("agent failed")
+
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert contents(messages) == [("user", "hello")]
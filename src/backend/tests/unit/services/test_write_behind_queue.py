@@ -0,0 +1,221 @@
+import asyncio
+
+import pytest
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.write_behind_queue import WriteBehindQueue
+
+
+@pytest.fixture
+async def write_behind(thread_service):
+    queue = WriteBehindQueue()
+    queue.max_backoff = 0.01
+    queue.start()
+    yield queue
+    await queue.close(timeout=1)
+    queue.max_retries = settings.WRITE_BEHIND_MAX_RETRIES
+    queue.max_backlog = settings.WRITE_BEHIND_MAX_BACKLOG
+
+
+@pytest.mark.asyncio
+async def test_writes_are_persisted_in_background(write_behind, unit_of_work, thread_service):
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("hello")
+        uow.add_message(thread_id, "assistant", "hi")
+
+    assert metrics.get("write_behind.backlog") == 1
+    await write_behind.wait_for("0xabc")
+
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert [m["content"] for m in messages] == ["hello", "hi"]
+    assert metrics.get("write_behind.backlog") == 0
+
+
+@pytest.mark.asyncio
+async def test_next_request_sees_pending_writes(write_behind, unit_of_work):
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("hello")
+
+    async with unit_of_work() as uow:
+        assert uow.get_thread(thread_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried(write_behind, unit_of_work, thread_service, monkeypatch):
+    execute = write_behind._execute
+    attempts = []
+
+    async def flaky_execute(units_of_work):
+        attempts.append(len(units_of_work))
+        if len(attempts) == 1:
+            raise ConnectionError("Redis unavailable")
+        return await execute(units_of_work)
+
+    monkeypatch.setattr(write_behind, "_execute", flaky_execute)
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("hello")
+    await write_behind.wait_for("0xabc")
+
+    assert attempts == [1, 1]
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert [m["content"] for m in messages] == ["hello"]
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_backlog(write_behind, unit_of_work, thread_service):
+    thread_ids = []
+    for wallet in ("0xabc", "0xdef"):
+        async with unit_of_work(wallet) as uow:
+            thread_ids.append(uow.open_thread(f"hello from {wallet}"))
+
+    await write_behind.close(timeout=1)
+
+    assert not write_behind.running
+    for thread_id in thread_ids:
+        assert await thread_service.get_thread(thread_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_closed_queue_commits_inline(write_behind, unit_of_work, thread_service):
+    await write_behind.close()
+
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("hello")
+
+    assert await thread_service.get_thread(thread_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_close_timeout_counts_lost_writes(write_behind, unit_of_work, monkeypatch):
+    async def stuck_execute(units_of_work):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(write_behind, "_execute", stuck_execute)
+    lost = metrics.get("write_behind.lost")
+    async with unit_of_work() as uow:
+        uow.open_thread("hello")
+
+    await write_behind.close(timeout=0.05)
+
+    assert metrics.get("write_behind.lost") == lost + 1
+    assert metrics.get("write_behind.backlog") == 0
+    await asyncio.wait_for(write_behind.wait_for("0xabc"), 1)
+
+
+@pytest.mark.asyncio
+async def test_poisoned_unit_is_dropped_without_blocking_others(
+    write_behind, unit_of_work, thread_service
+):
+    healthy = unit_of_work("0xabc")
+    await healthy.load()
+    thread_id = healthy.open_thread("hello")
+    healthy.add_message(thread_id, "assistant", "hi")
+    poisoned = unit_of_work("0xbad")
+    await poisoned.load()
+    poisoned.open_thread("hello?", "corrupt")
+    await thread_service.redis.set("thread:corrupt", "not a hash")
+    lost = metrics.get("write_behind.lost")
+
+    # Submitted back to back, so they are written in one batch
+    assert write_behind.submit(poisoned) and write_behind.submit(healthy)
+    await asyncio.wait_for(write_behind.wait_for("0xbad"), 1)
+    await asyncio.wait_for(write_behind.wait_for("0xabc"), 1)
+
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert [m["content"] for m in messages] == ["hello", "hi"]
+    assert metrics.get("write_behind.lost") == lost + 1
+    assert metrics.get("write_behind.backlog") == 0
+    async with unit_of_work("0xbad") as uow:
+        assert uow.user is not None
+
+
+@pytest.mark.asyncio
+async def test_rejected_transaction_is_isolated(write_behind, unit_of_work, thread_service, monkeypatch):
+    execute = write_behind._execute
+    batches = []
+
+    async def rejecting_execute(units_of_work):
+        batches.append([uow.wallet_address for uow in units_of_work])
+        if any(uow.wallet_address == "0xbad" for uow in units_of_work):
+            raise redis.ResponseError("EXECABORT Transaction discarded")
+        return await execute(units_of_work)
+
+    monkeypatch.setattr(write_behind, "_execute", rejecting_execute)
+    units = []
+    for wallet in ("0xabc", "0xbad", "0xdef"):
+        uow = unit_of_work(wallet)
+        await uow.load()
+        uow.open_thread(f"hello from {wallet}")
+        units.append(uow)
+    for uow in units:
+        write_behind.submit(uow)
+    await asyncio.wait_for(write_behind.wait_for("0xdef"), 1)
+
+    assert batches == [["0xabc", "0xbad", "0xdef"], ["0xabc"], ["0xbad"], ["0xdef"]]
+    for uow in (units[0], units[2]):
+        assert await thread_service.get_thread(uow.user.thread.thread_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_retry_after_lost_reply_does_not_duplicate(
+    write_behind, unit_of_work, thread_service, monkeypatch
+):
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("hello")
+    await write_behind.wait_for("0xabc")
+
+    execute = write_behind._execute
+    attempts = []
+
+    async def reply_lost_execute(units_of_work):
+        attempts.append(len(units_of_work))
+        result = await execute(units_of_work)
+        if len(attempts) == 1:
+            raise redis.ConnectionError("Connection closed by server")
+        return result
+
+    monkeypatch.setattr(write_behind, "_execute", reply_lost_execute)
+    async with unit_of_work() as uow:
+        uow.open_thread("again", thread_id)
+        uow.add_message(thread_id, "assistant", "answer")
+    await write_behind.wait_for("0xabc")
+
+    assert attempts == [1, 1]
+    messages = await thread_service.get_thread_messages(thread_id)
+    assert [m["content"] for m in messages] == ["hello", "again", "answer"]
+    thread = await thread_service.get_thread(thread_id)
+    assert thread["message_count"] == "3"
+    # Applied IDs live in one short-lived set per thread, not a key each
+    assert await thread_service.redis.keys("message:*") == []
+    applied = f"thread:{thread_id}:applied"
+    assert await thread_service.redis.scard(applied) == 2
+    assert 0 < await thread_service.redis.ttl(applied) <= 600
+
+
+@pytest.mark.asyncio
+async def test_retries_are_capped(write_behind, unit_of_work, monkeypatch):
+    async def failing_execute(units_of_work):
+        raise redis.ConnectionError("Redis unavailable")
+
+    monkeypatch.setattr(write_behind, "_execute", failing_execute)
+    write_behind.max_retries = 2
+    lost = metrics.get("write_behind.lost")
+    async with unit_of_work() as uow:
+        uow.open_thread("hello")
+
+    await asyncio.wait_for(write_behind.wait_for("0xabc"), 1)
+
+    assert metrics.get("write_behind.lost") == lost + 1
+    assert metrics.get("write_behind.backlog") == 0
+
+
+@pytest.mark.asyncio
+async def test_full_backlog_commits_inline(write_behind, unit_of_work, thread_service):
+    write_behind.max_backlog = 0
+
+    async with unit_of_work() as uow:
+        thread_id = uow.open_thread("hello")
+
+    assert await thread_service.get_thread(thread_id) is not None
@@ -99,6 +99,127 @@ async def test_get_user_sessions(session_service, test_wallet, mock_device_info)
     assert all(s["wallet_address"] == test_wallet["address"] for s in sessions)
 
 
+@pytest.mark.asyncio
+async def test_get_user_sessions_prunes_dead_entries(
+    session_service, test_wallet, mock_device_info
+):
+    wallet = test_wallet["address"]
+    live_id = await session_service.create_session(wallet, "live", mock_device_info)
+    deleted_id = await session_service.create_session(wallet, "gone", mock_device_info)
+    await session_service.redis.delete(deleted_id)
+    await session_service.redis.zadd(f"sessions:{wallet}", {"session:expired": 1})
+
+    sessions = await session_service.get_user_sessions(wallet)
+
+    assert [s["session_id"] for s in sessions] == [live_id]
+    assert await session_service.redis.zrange(f"sessions:{wallet}", 0, -1) == [live_id]
+
+
+@pytest.mark.asyncio
+async def test_get_user_sessions_migrates_legacy_set(
+    session_service, test_wallet, sample_session_data
+):
+    wallet = test_wallet["address"]
+    session_id = f"session:{wallet}:{datetime.now().timestamp()}"
+    await session_service.redis.setex(
+        session_id, timedelta(days=7), json.dumps(sample_session_data)
+    )
+    await session_service.redis.sadd(wallet, session_id, "session:long-expired")
+
+    sessions = await session_service.get_user_sessions(wallet)
+
+    assert [s["session_id"] for s in sessions] == [session_id]
+    assert not await session_service.redis.exists(wallet)
+    assert await session_service.redis.zrange(f"sessions:{wallet}", 0, -1) == [
+        session_id
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_sessions(session_service, test_wallet, mock_device_info):
+    wallet = test_wallet["address"]
+    session_ids = [
+        await session_service.create_session(wallet, f"token_{i}", mock_device_info)
+        for i in range(3)
+    ]
+
+    assert await session_service.invalidate_user_sessions(wallet) == 3
+
+    assert await session_service.get_user_sessions(wallet) == []
+    for session_id in session_ids:
+        assert await session_service.get_session(session_id) is None
+
+
+@pytest.fixture
+def cached_session_service(session_service):
+    session_service._cache.clear()
+    session_service._last_activity_write.clear()
+    yield session_service
+    session_service._cache.clear()
+    session_service._last_activity_write.clear()
+
+
+@pytest.mark.asyncio
+async def test_cached_session_skips_redis(
+    cached_session_service, test_wallet, mock_device_info, mocker
+):
+    session_id = await cached_session_service.create_session(
+        test_wallet["address"], "token", mock_device_info
+    )
+    await cached_session_service.get_cached_session(session_id)
+    get = mocker.spy(cached_session_service.redis, "get")
+
+    session = await cached_session_service.get_cached_session(session_id)
+
+    assert session["token"] == "token"
+    get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_session_evicts_cache(
+    cached_session_service, test_wallet, mock_device_info
+):
+    session_id = await cached_session_service.create_session(
+        test_wallet["address"], "token", mock_device_info
+    )
+    await cached_session_service.get_cached_session(session_id)
+
+    await cached_session_service.invalidate_session(session_id)
+
+    assert await cached_session_service.get_cached_session(session_id) is None
+
+
+@pytest.mark.asyncio
+async def test_record_activity_is_debounced(
+    cached_session_service, test_wallet, mock_device_info, mocker
+):
+    session_id = await cached_session_service.create_session(
+        test_wallet["address"], "token", mock_device_info
+    )
+    session = await cached_session_service.get_cached_session(session_id)
+    update = mocker.spy(cached_session_service, "update_session_activity")
+
+    for _ in range(5):
+        await cached_session_service.record_activity(session_id, session)
+
+    assert update.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_activity_update_does_not_resurrect_deleted_session(
+    cached_session_service, test_wallet, mock_device_info
+):
+    session_id = await cached_session_service.create_session(
+        test_wallet["address"], "token", mock_device_info
+    )
+    session = await cached_session_service.get_session(session_id)
+    await cached_session_service.redis.delete(session_id)
+
+    await cached_session_service.update_session_activity(session_id, session)
+
+    assert await cached_session_service.get_session(session_id) is None
+
+
 @pytest.mark.asyncio
 async def test_tokenmetrics_success(async_client, mock_fetch_metadata, mock_metadata):
     mock_fetch_metadata.return_value = mock_metadata